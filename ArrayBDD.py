@@ -0,0 +1,747 @@
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+# ---------------------------------------------------------
+# ARRAY-BACKED BDD ENGINE
+# ---------------------------------------------------------
+# Drop-in alternative to dd.autoref.BDD for the operations this project uses
+# (see BDDBackend.py). Instead of one Python object per node, nodes live in
+# three int32 numpy arrays (level, low, high), indexed by node id:
+#   node 0 = FALSE, node 1 = TRUE, node >= 2 = internal node.
+# No complement edges: ~u is an ordinary (cached) operation.
+#
+#   unique table:   open addressing (linear probing) over an int32 array of
+#                   node ids, -1 = empty slot. Doubles at load 1/2.
+#   computed table: fixed-size direct-mapped cache (op, a, b) -> result; a
+#                   colliding entry simply overwrites the old one (lossy).
+#   GC:             mark-and-sweep from the nodes referenced by live Function
+#                   objects. It only runs between top-level operations (never
+#                   inside a recursion, where intermediate results are not
+#                   rooted), when the number of allocated nodes passes a
+#                   threshold. Freed ids go to a free list; the unique table is
+#                   rebuilt and the computed table cleared.
+#
+# Scalar access in the recursive algorithms goes through memoryviews of the
+# numpy arrays, which return plain Python ints.
+
+_AND, _OR, _XOR, _NOT = 0, 1, 2, 3
+_LEAF = np.iinfo(np.int32).max     # level stored for the two terminals
+_FREE = -1                         # level stored for a freed node slot
+
+
+class Function:
+    """Reference to a node of an ArrayBDD (mirrors dd.autoref.Function)."""
+
+    __slots__ = ('bdd', 'node', '__weakref__')
+
+    def __init__(self, node: int, bdd: "ArrayBDD"):
+        self.bdd = bdd
+        self.node = node
+        refs = bdd._refs
+        refs[node] = refs.get(node, 0) + 1
+
+    def __del__(self):
+        refs = self.bdd._refs
+        count = refs.get(self.node, 0) - 1
+        if count > 0:
+            refs[self.node] = count
+        else:
+            refs.pop(self.node, None)
+
+    # ---------- structure ----------
+
+    @property
+    def level(self) -> int:
+        return self.bdd._level_of_node(self.node)
+
+    @property
+    def var(self) -> Optional[str]:
+        if self.node < 2:
+            return None
+        return self.bdd._level_to_var[self.bdd._L[self.node]]
+
+    @property
+    def low(self) -> Optional["Function"]:
+        if self.node < 2:
+            return None
+        return self.bdd._wrap(self.bdd._LO[self.node])
+
+    @property
+    def high(self) -> Optional["Function"]:
+        if self.node < 2:
+            return None
+        return self.bdd._wrap(self.bdd._HI[self.node])
+
+    @property
+    def negated(self) -> bool:
+        return False
+
+    @property
+    def dag_size(self) -> int:
+        return self.bdd._dag_size(self.node)
+
+    @property
+    def support(self) -> Set[str]:
+        return self.bdd.support(self)
+
+    def __int__(self) -> int:
+        return self.node
+
+    def __len__(self) -> int:
+        return self.dag_size
+
+    # ---------- boolean operators ----------
+
+    def _other(self, other: "Function") -> int:
+        if not isinstance(other, Function) or other.bdd is not self.bdd:
+            raise ValueError("Operands must be Functions of the same ArrayBDD.")
+        return other.node
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Function):
+            return NotImplemented
+        return self.bdd is other.bdd and self.node == other.node
+
+    def __ne__(self, other) -> bool:
+        if not isinstance(other, Function):
+            return NotImplemented
+        return not (self.bdd is other.bdd and self.node == other.node)
+
+    def __hash__(self) -> int:
+        return hash((id(self.bdd), self.node))
+
+    def __invert__(self) -> "Function":
+        return self.bdd._top(self.bdd._not, self.node)
+
+    def __and__(self, other: "Function") -> "Function":
+        return self.bdd._top(self.bdd._and, self.node, self._other(other))
+
+    def __or__(self, other: "Function") -> "Function":
+        return self.bdd._top(self.bdd._or, self.node, self._other(other))
+
+    def __xor__(self, other: "Function") -> "Function":
+        return self.bdd._top(self.bdd._xor, self.node, self._other(other))
+
+    def implies(self, other: "Function") -> "Function":
+        return ~self | other
+
+    def equiv(self, other: "Function") -> "Function":
+        return ~(self ^ other)
+
+    def __repr__(self) -> str:
+        return f"<ArrayBDD Function node={self.node}>"
+
+
+class ArrayBDD:
+    """
+    BDD manager with numpy node storage.
+
+    Args:
+        capacity:       initial number of node slots (grows by doubling).
+        cache_size:     computed-table entries (rounded up to a power of two).
+        gc_threshold:   allocated nodes before the first garbage collection;
+                        afterwards the threshold follows twice the live count.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, cache_size: int = 1 << 18,
+                 gc_threshold: int = 1 << 20):
+        capacity = max(4, capacity)
+        self._level = np.full(capacity, _FREE, dtype=np.int32)
+        self._low = np.zeros(capacity, dtype=np.int32)
+        self._high = np.zeros(capacity, dtype=np.int32)
+        self._level[:2] = _LEAF
+        self._low[1] = self._high[1] = 1
+        self._next = 2              # bump pointer
+        self._free: List[int] = []
+        self._views()
+
+        self._table = np.full(2 * capacity, -1, dtype=np.int32)
+        self._T = memoryview(self._table)
+        self._tmask = len(self._table) - 1
+        self._tcount = 0
+
+        cache_size = 1 << max(4, (cache_size - 1).bit_length())
+        self._cop = np.full(cache_size, -1, dtype=np.int8)
+        self._ca = np.zeros(cache_size, dtype=np.int32)
+        self._cb = np.zeros(cache_size, dtype=np.int32)
+        self._cr = np.zeros(cache_size, dtype=np.int32)
+        self._COP, self._CA = memoryview(self._cop), memoryview(self._ca)
+        self._CB, self._CR = memoryview(self._cb), memoryview(self._cr)
+        self._cmask = cache_size - 1
+
+        self._refs: Dict[int, int] = {}
+        self._gc_min = gc_threshold
+        self._gc_threshold = gc_threshold
+        self.gc_runs = 0
+
+        self._var_to_level: Dict[str, int] = {}
+        self._level_to_var: List[str] = []
+        self._var_funcs: List[Function] = []   # keeps variable nodes alive
+
+        self.false = Function(0, self)
+        self.true = Function(1, self)
+
+    # ---------- storage ----------
+
+    def _views(self) -> None:
+        self._L = memoryview(self._level)
+        self._LO = memoryview(self._low)
+        self._HI = memoryview(self._high)
+
+    def _grow_nodes(self) -> None:
+        old = len(self._level)
+        for name in ('_level', '_low', '_high'):
+            arr = getattr(self, name)
+            new = np.full(2 * old, _FREE, dtype=np.int32) if name == '_level' \
+                else np.zeros(2 * old, dtype=np.int32)
+            new[:old] = arr
+            setattr(self, name, new)
+        self._views()
+
+    def _table_insert(self, n: int, level: int, lo: int, hi: int) -> None:
+        T, mask = self._T, self._tmask
+        i = hash((level, lo, hi)) & mask
+        while T[i] >= 0:
+            i = (i + 1) & mask
+        T[i] = n
+
+    def _rebuild_table(self, size: int) -> None:
+        self._table = np.full(size, -1, dtype=np.int32)
+        self._T = memoryview(self._table)
+        self._tmask = size - 1
+        L, LO, HI = self._L, self._LO, self._HI
+        count = 0
+        for n in np.flatnonzero(self._level[2:self._next] != _FREE).tolist():
+            n += 2
+            self._table_insert(n, L[n], LO[n], HI[n])
+            count += 1
+        self._tcount = count
+
+    def _mk(self, level: int, lo: int, hi: int) -> int:
+        """Unique-table lookup / insert of node (level, lo, hi)."""
+        if lo == hi:
+            return lo
+        T, mask = self._T, self._tmask
+        L, LO, HI = self._L, self._LO, self._HI
+        i = hash((level, lo, hi)) & mask
+        n = T[i]
+        while n >= 0:
+            if L[n] == level and LO[n] == lo and HI[n] == hi:
+                return n
+            i = (i + 1) & mask
+            n = T[i]
+
+        if self._free:
+            n = self._free.pop()
+        else:
+            if self._next == len(self._level):
+                self._grow_nodes()
+            n = self._next
+            self._next += 1
+        self._L[n] = level
+        self._LO[n] = lo
+        self._HI[n] = hi
+        T[i] = n
+        self._tcount += 1
+        if 2 * self._tcount > len(self._table):
+            self._rebuild_table(2 * len(self._table))
+        return n
+
+    def _wrap(self, node: int) -> Function:
+        return Function(node, self)
+
+    def _level_of_node(self, u: int) -> int:
+        return len(self._level_to_var) if u < 2 else self._L[u]
+
+    # ---------- garbage collection ----------
+
+    def _top(self, op, *args) -> Function:
+        """Run a top-level operation (GC is only safe here) and wrap the result."""
+        if self._next - len(self._free) > self._gc_threshold:
+            self.collect_garbage()
+        return Function(op(*args), self)
+
+    def collect_garbage(self) -> int:
+        """Mark-and-sweep from all referenced nodes. Returns the number of freed nodes."""
+        L, LO, HI = self._L, self._LO, self._HI
+        marked = np.zeros(self._next, dtype=bool)
+        marked[:2] = True
+        M = memoryview(marked)
+        stack = [n for n in self._refs if n >= 2]
+        while stack:
+            n = stack.pop()
+            if M[n]:
+                continue
+            M[n] = True
+            lo, hi = LO[n], HI[n]
+            if lo >= 2 and not M[lo]:
+                stack.append(lo)
+            if hi >= 2 and not M[hi]:
+                stack.append(hi)
+
+        dead = np.flatnonzero(~marked & (self._level[:self._next] != _FREE))
+        self._level[dead] = _FREE
+        self._free = (np.flatnonzero(self._level[2:self._next] == _FREE) + 2).tolist()
+        self._rebuild_table(len(self._table))
+        self._cop.fill(-1)
+
+        live = self._next - len(self._free)
+        self._gc_threshold = max(self._gc_min, 2 * live)
+        self.gc_runs += 1
+        return len(dead)
+
+    def __len__(self) -> int:
+        """Number of allocated (not yet collected) nodes, terminals included."""
+        return self._next - len(self._free)
+
+    # ---------- computed table ----------
+
+    def _cache_get(self, op: int, a: int, b: int) -> int:
+        i = hash((op, a, b)) & self._cmask
+        if self._COP[i] == op and self._CA[i] == a and self._CB[i] == b:
+            return self._CR[i]
+        return -1
+
+    def _cache_put(self, op: int, a: int, b: int, r: int) -> None:
+        i = hash((op, a, b)) & self._cmask
+        self._COP[i] = op
+        self._CA[i] = a
+        self._CB[i] = b
+        self._CR[i] = r
+
+    # ---------- core recursions (on node ids) ----------
+
+    def _not(self, u: int) -> int:
+        if u < 2:
+            return 1 - u
+        r = self._cache_get(_NOT, u, 0)
+        if r >= 0:
+            return r
+        level, lo, hi = self._L[u], self._LO[u], self._HI[u]
+        r = self._mk(level, self._not(lo), self._not(hi))
+        self._cache_put(_NOT, u, 0, r)
+        return r
+
+    def _cofactors(self, u: int, v: int):
+        L = self._L
+        lu = L[u]
+        lv = L[v]
+        if lu == lv:
+            return lu, self._LO[u], self._HI[u], self._LO[v], self._HI[v]
+        if lu < lv:
+            return lu, self._LO[u], self._HI[u], v, v
+        return lv, u, u, self._LO[v], self._HI[v]
+
+    def _and(self, u: int, v: int) -> int:
+        if u == 0 or v == 0:
+            return 0
+        if u == 1 or u == v:
+            return v
+        if v == 1:
+            return u
+        if u > v:
+            u, v = v, u
+        r = self._cache_get(_AND, u, v)
+        if r >= 0:
+            return r
+        level, u0, u1, v0, v1 = self._cofactors(u, v)
+        r = self._mk(level, self._and(u0, v0), self._and(u1, v1))
+        self._cache_put(_AND, u, v, r)
+        return r
+
+    def _or(self, u: int, v: int) -> int:
+        if u == 1 or v == 1:
+            return 1
+        if u == 0 or u == v:
+            return v
+        if v == 0:
+            return u
+        if u > v:
+            u, v = v, u
+        r = self._cache_get(_OR, u, v)
+        if r >= 0:
+            return r
+        level, u0, u1, v0, v1 = self._cofactors(u, v)
+        r = self._mk(level, self._or(u0, v0), self._or(u1, v1))
+        self._cache_put(_OR, u, v, r)
+        return r
+
+    def _xor(self, u: int, v: int) -> int:
+        if u == v:
+            return 0
+        if u == 0:
+            return v
+        if v == 0:
+            return u
+        if u == 1:
+            return self._not(v)
+        if v == 1:
+            return self._not(u)
+        if u > v:
+            u, v = v, u
+        r = self._cache_get(_XOR, u, v)
+        if r >= 0:
+            return r
+        level, u0, u1, v0, v1 = self._cofactors(u, v)
+        r = self._mk(level, self._xor(u0, v0), self._xor(u1, v1))
+        self._cache_put(_XOR, u, v, r)
+        return r
+
+    def _ite(self, g: int, h: int, e: int) -> int:
+        return self._or(self._and(g, h), self._and(self._not(g), e))
+
+    def _exist(self, u: int, qlevels: Set[int], last: int, memo: Dict[int, int]) -> int:
+        if u < 2 or self._L[u] > last:
+            return u
+        r = memo.get(u)
+        if r is not None:
+            return r
+        level = self._L[u]
+        lo = self._exist(self._LO[u], qlevels, last, memo)
+        hi = self._exist(self._HI[u], qlevels, last, memo)
+        r = self._or(lo, hi) if level in qlevels else self._mk(level, lo, hi)
+        memo[u] = r
+        return r
+
+    def _restrict(self, u: int, values: Dict[int, int], last: int, memo: Dict[int, int]) -> int:
+        if u < 2 or self._L[u] > last:
+            return u
+        r = memo.get(u)
+        if r is not None:
+            return r
+        level = self._L[u]
+        value = values.get(level)
+        if value is None:
+            r = self._mk(level, self._restrict(self._LO[u], values, last, memo),
+                         self._restrict(self._HI[u], values, last, memo))
+        else:
+            r = self._restrict(self._HI[u] if value else self._LO[u], values, last, memo)
+        memo[u] = r
+        return r
+
+    def _compose(self, u: int, subst: Dict[int, int], last: int, memo: Dict[int, int]) -> int:
+        if u < 2 or self._L[u] > last:
+            return u
+        r = memo.get(u)
+        if r is not None:
+            return r
+        level = self._L[u]
+        lo = self._compose(self._LO[u], subst, last, memo)
+        hi = self._compose(self._HI[u], subst, last, memo)
+        g = subst.get(level)
+        if g is None:
+            g = self._mk(level, 0, 1)
+        r = self._ite(g, hi, lo)
+        memo[u] = r
+        return r
+
+    def _dag_size(self, u: int) -> int:
+        seen = set()
+        stack = [u]
+        while stack:
+            n = stack.pop()
+            if n in seen:
+                continue
+            seen.add(n)
+            if n >= 2:
+                stack.append(self._LO[n])
+                stack.append(self._HI[n])
+        return len(seen)
+
+    def _support_levels(self, u: int) -> Set[int]:
+        levels: Set[int] = set()
+        seen = set()
+        stack = [u]
+        while stack:
+            n = stack.pop()
+            if n < 2 or n in seen:
+                continue
+            seen.add(n)
+            levels.add(self._L[n])
+            stack.append(self._LO[n])
+            stack.append(self._HI[n])
+        return levels
+
+    # ---------- variables ----------
+
+    def declare(self, *variables: str) -> None:
+        for name in variables:
+            if name in self._var_to_level:
+                continue
+            level = len(self._level_to_var)
+            self._var_to_level[name] = level
+            self._level_to_var.append(name)
+            self._var_funcs.append(Function(self._mk(level, 0, 1), self))
+        # Recursions go one frame per level (a few for ite/compose)
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * len(self._level_to_var) + 1000))
+
+    @property
+    def vars(self) -> Dict[str, int]:
+        return dict(self._var_to_level)
+
+    @property
+    def var_levels(self) -> Dict[str, int]:
+        return dict(self._var_to_level)
+
+    def level_of_var(self, var: str) -> int:
+        return self._var_to_level[var]
+
+    def var_at_level(self, level: int) -> str:
+        return self._level_to_var[level]
+
+    def var(self, name: str) -> Function:
+        return self._var_funcs[self._var_to_level[name]]
+
+    def configure(self, **kw) -> Dict:
+        """Only for API compatibility: dynamic reordering is not implemented."""
+        if kw.get('reordering'):
+            raise ValueError("ArrayBDD does not support dynamic variable reordering.")
+        return {'reordering': False}
+
+    def _node(self, u: Function) -> int:
+        if not isinstance(u, Function) or u.bdd is not self:
+            raise ValueError("Function belongs to another manager.")
+        return u.node
+
+    # ---------- operations (dd.autoref-compatible signatures) ----------
+
+    def apply(self, op: str, u: Function, v: Optional[Function] = None) -> Function:
+        if op in ('not', '!', '~'):
+            return ~u
+        ops = {'and': '__and__', '/\\': '__and__', '&': '__and__',
+               'or': '__or__', '\\/': '__or__', '|': '__or__',
+               'xor': '__xor__', '^': '__xor__',
+               'implies': 'implies', '=>': 'implies', '->': 'implies',
+               'equiv': 'equiv', '<=>': 'equiv', '<->': 'equiv'}
+        if op not in ops:
+            raise ValueError(f"Unknown operator {op!r}")
+        return getattr(u, ops[op])(v)
+
+    def ite(self, g: Function, u: Function, v: Function) -> Function:
+        return self._top(self._ite, self._node(g), self._node(u), self._node(v))
+
+    def find_or_add(self, var: str, low: Function, high: Function) -> Function:
+        level = self._var_to_level[var]
+        lo, hi = self._node(low), self._node(high)
+        if level >= min(self._level_of_node(lo), self._level_of_node(hi)):
+            raise ValueError("find_or_add: children must lie below the variable's level.")
+        return self._top(self._mk, level, lo, hi)
+
+    def quantify(self, u: Function, qvars: Iterable[str], forall: bool = False) -> Function:
+        qlevels = {self._var_to_level[v] for v in qvars}
+        if not qlevels:
+            return u
+        last = max(qlevels)
+        node = self._node(u)
+        if forall:
+            return self._top(lambda n: self._not(self._exist(self._not(n), qlevels, last, {})), node)
+        return self._top(self._exist, node, qlevels, last, {})
+
+    def exist(self, qvars: Iterable[str], u: Function) -> Function:
+        return self.quantify(u, qvars, forall=False)
+
+    def forall(self, qvars: Iterable[str], u: Function) -> Function:
+        return self.quantify(u, qvars, forall=True)
+
+    def let(self, definitions: Dict, u: Function) -> Function:
+        """
+        Substitute variables in u. Values may be bools (cofactor), variable
+        names (rename) or Functions (composition), as in dd.
+        """
+        node = self._node(u)
+        if not definitions:
+            return u
+        levels = [self._var_to_level[v] for v in definitions]
+        last = max(levels)
+        values = list(definitions.values())
+        if all(isinstance(x, (bool, int)) and not isinstance(x, Function) for x in values):
+            fixed = {lvl: int(bool(x)) for lvl, x in zip(levels, values)}
+            return self._top(self._restrict, node, fixed, last, {})
+        subst = {}
+        for lvl, x in zip(levels, values):
+            if isinstance(x, str):
+                subst[lvl] = self._mk(self._var_to_level[x], 0, 1)
+            elif isinstance(x, Function):
+                subst[lvl] = self._node(x)
+            else:
+                subst[lvl] = int(bool(x))
+        return self._top(self._compose, node, subst, last, {})
+
+    def support(self, u: Function, as_levels: bool = False) -> Set:
+        levels = self._support_levels(self._node(u))
+        if as_levels:
+            return levels
+        return {self._level_to_var[lvl] for lvl in levels}
+
+    def count(self, u: Function, nvars: Optional[int] = None) -> int:
+        """Number of satisfying assignments over nvars variables (default: the support)."""
+        root = self._node(u)
+        n = len(self._level_to_var)
+        if nvars is None:
+            nvars = len(self._support_levels(root))
+        memo: Dict[int, int] = {0: 0, 1: 1}
+        L, LO, HI = self._L, self._LO, self._HI
+
+        def level(x):
+            return n if x < 2 else L[x]
+
+        # Iterative post-order, the reachable sets can be deep
+        stack = [root]
+        while stack:
+            x = stack[-1]
+            if x in memo:
+                stack.pop()
+                continue
+            lo, hi = LO[x], HI[x]
+            if lo not in memo:
+                stack.append(lo)
+                continue
+            if hi not in memo:
+                stack.append(hi)
+                continue
+            lx = L[x]
+            memo[x] = (memo[lo] << (level(lo) - lx - 1)) + (memo[hi] << (level(hi) - lx - 1))
+            stack.pop()
+        total = memo[root] << level(root)
+        # total counts over all n declared variables
+        return total << (nvars - n) if nvars >= n else total >> (n - nvars)
+
+    def pick_iter(self, u: Function, care_vars: Optional[Iterable[str]] = None) -> Iterator[Dict[str, bool]]:
+        """All satisfying assignments over support(u) | care_vars."""
+        root = self._node(u)
+        levels = sorted(self._support_levels(root) |
+                        {self._var_to_level[v] for v in (care_vars or ())})
+        names = self._level_to_var
+
+        def paths(x, i):
+            # i indexes `levels`; yields partial dicts level -> value
+            if x == 0:
+                return
+            if i == len(levels):
+                yield {}
+                return
+            lvl = levels[i]
+            if x >= 2 and self._L[x] == lvl:
+                for value, child in ((False, self._LO[x]), (True, self._HI[x])):
+                    for rest in paths(child, i + 1):
+                        rest[lvl] = value
+                        yield rest
+            else:
+                for value in (False, True):
+                    for rest in paths(x, i + 1):
+                        rest[lvl] = value
+                        yield rest
+
+        for assignment in paths(root, 0):
+            yield {names[lvl]: value for lvl, value in assignment.items()}
+
+    def pick(self, u: Function, care_vars: Optional[Iterable[str]] = None) -> Optional[Dict[str, bool]]:
+        """One satisfying assignment, or None if u is FALSE."""
+        root = self._node(u)
+        if root == 0:
+            return None
+        assignment = {self._level_to_var[lvl]: False for lvl in self._support_levels(root)}
+        for v in care_vars or ():
+            assignment[v] = False
+        x = root
+        while x >= 2:
+            name = self._level_to_var[self._L[x]]
+            if self._HI[x] != 0:
+                assignment[name] = True
+                x = self._HI[x]
+            else:
+                x = self._LO[x]
+        return assignment
+
+    # ---------- serialization (dd's JSON layout) ----------
+
+    def dump(self, filename: str, roots: Dict[str, Function], filetype: Optional[str] = None) -> None:
+        """Write roots in the JSON format of dd.BDD.dump, so either backend can load it."""
+        if filetype not in (None, 'json') or (filetype is None and not filename.endswith('.json')):
+            raise ValueError("ArrayBDD only dumps JSON.")
+        # dd uses complement edges and expects every stored node to have a
+        # regular high edge, so nodes are converted on the way out: refs maps
+        # our node id to a signed file id (1 = TRUE, -1 = FALSE), and a node
+        # whose high child is negative is written as the negation of its dual.
+        refs: Dict[int, int] = {0: -1, 1: 1}
+        canonical: Dict[Tuple[int, int, int], int] = {}
+        lines = []
+
+        def child(r: int):
+            return 'T' if r == 1 else 'F' if r == -1 else r
+
+        for root in roots.values():
+            stack = [self._node(root)]
+            while stack:
+                x = stack[-1]
+                if x in refs:
+                    stack.pop()
+                    continue
+                lo, hi = self._LO[x], self._HI[x]
+                if lo not in refs:
+                    stack.append(lo)
+                    continue
+                if hi not in refs:
+                    stack.append(hi)
+                    continue
+                level, lo, hi, sign = self._L[x], refs[lo], refs[hi], 1
+                if hi < 0:
+                    lo, hi, sign = -lo, -hi, -1
+                k = canonical.get((level, lo, hi))
+                if k is None:
+                    k = len(canonical) + 2
+                    canonical[(level, lo, hi)] = k
+                    lines.append(f'"{k}": {json.dumps([level, child(lo), child(hi)])}')
+                refs[x] = sign * k
+                stack.pop()
+        header = [f'"level_of_var": {json.dumps(self._var_to_level)}',
+                  f'"roots": {json.dumps({k: refs[self._node(r)] for k, r in roots.items()})}']
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('{\n' + ',\n'.join(header + lines) + '\n}\n')
+
+    def load(self, filename: str) -> Dict[str, Function]:
+        """Load a JSON dump (from either backend). Existing variables keep their levels."""
+        with open(filename, encoding='utf-8') as f:
+            data = json.load(f)
+        file_levels = data.pop('level_of_var')
+        roots = data.pop('roots')
+        self.declare(*sorted(file_levels, key=file_levels.get))
+        var_of_level = {lvl: name for name, lvl in file_levels.items()}
+        built: Dict[str, int] = {}
+
+        def resolve(ref) -> int:
+            ref = int(ref)
+            if abs(ref) == 1:
+                return 1 if ref > 0 else 0
+            key = str(abs(ref))
+            if key not in built:
+                # Iterative post-order over the file's nodes
+                stack = [key]
+                while stack:
+                    k = stack[-1]
+                    if k in built:
+                        stack.pop()
+                        continue
+                    level, lo, hi = data[k]
+                    pending = [str(abs(int(c))) for c in (lo, hi)
+                               if c not in ('T', 'F') and str(abs(int(c))) not in built]
+                    if pending:
+                        stack.extend(pending)
+                        continue
+                    lo_n, hi_n = ref_node(lo), ref_node(hi)
+                    var_node = self._mk(self._var_to_level[var_of_level[level]], 0, 1)
+                    built[k] = self._ite(var_node, hi_n, lo_n)
+                    stack.pop()
+            node = built[key]
+            return self._not(node) if ref < 0 else node
+
+        def ref_node(c) -> int:
+            if c in ('T', 'F'):
+                return 1 if c == 'T' else 0
+            node = built[str(abs(int(c)))]
+            return self._not(node) if int(c) < 0 else node
+
+        return {name: Function(resolve(ref), self) for name, ref in roots.items()}
@@ -0,0 +1,45 @@
+# ---------------------------------------------------------
+# BDD BACKENDS
+# ---------------------------------------------------------
+# bdd_reachable, DeadlockDetecting and Optimization only talk to a BDD manager
+# through the part of the dd.autoref API listed below, so any manager that
+# implements it can be used:
+#
+#   manager:  declare(*names), var(name), true, false, vars, level_of_var(name),
+#             var_at_level(level), configure(reordering=...),
+#             quantify(u, names, forall=False), exist(names, u),
+#             let({name: bool | name | Function}, u), count(u, nvars),
+#             pick(u, care_vars), pick_iter(u, care_vars), support(u),
+#             dump(path, roots), load(path), len(manager)
+#   Function: & | ~ ^ == !=, .bdd, .var, .level, .low, .high, .negated,
+#             .dag_size
+#
+# Backends:
+#   'dd'    dd.autoref.BDD (default; supports dynamic reordering)
+#   'array' ArrayBDD.ArrayBDD (numpy node arrays, no complement edges)
+
+BACKENDS = ('dd', 'array')
+
+
+def new_bdd(backend: str = 'dd', **options):
+    """
+    Create an empty BDD manager.
+
+    Args:
+        backend: one of BACKENDS.
+        options: passed to the manager constructor (e.g. ArrayBDD capacity,
+                 cache_size, gc_threshold).
+    """
+    if backend == 'dd':
+        from dd.autoref import BDD
+        return BDD(**options)
+    if backend == 'array':
+        from ArrayBDD import ArrayBDD
+        return ArrayBDD(**options)
+    raise ValueError(f"Unknown BDD backend {backend!r}; expected one of {BACKENDS}")
+
+
+def backend_of(u) -> str:
+    """Name of the backend a Function belongs to."""
+    from ArrayBDD import ArrayBDD
+    return 'array' if isinstance(u.bdd, ArrayBDD) else 'dd'
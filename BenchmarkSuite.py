@@ -0,0 +1,282 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from PetriNetReading import PetriNet
+from ExplicitComputation import bfs_reachable, dfs_reachable, bfs_reachable_safe
+from SymbolicComputation import bdd_reachable
+from DeadlockDetecting import deadlock_bdd2, deadlock_incremental_ilp_bdd, deadlock_explicit
+from Optimization import max_reachable_marking
+from NetFamilies import FAMILIES, generate
+from Measurement import MODES, measure as measure_once
+
+# ---------------------------------------------------------
+# NON-INTERACTIVE BENCHMARK SUITE
+# ---------------------------------------------------------
+# Generates every instance of the chosen families, runs every engine on it
+# with warm-up and repeated trials, and writes one JSON report:
+#   {"meta": {...}, "results": [{family, params, instance, engine, result,
+#                                time_ms: {median, min, max, ...}, peak_kb}]}
+# A report can be stored as a baseline; a later run compared against it fails
+# (exit code 1) when an engine got slower or bigger than the threshold allows,
+# or when its result (state count, deadlock found, optimum) changed.
+
+SIZES = {
+    'small': [('parallel', (3, 5)), ('philo', (5,)), ('lbs', (2, 2)), ('ring', (6,)), ('tokens', (10, 4))],
+    'medium': [('parallel', (3, 12)), ('philo', (8,)), ('lbs', (3, 2)), ('ring', (9,)), ('tokens', (16, 6))],
+    'large': [('parallel', (3, 30)), ('philo', (10,)), ('lbs', (3, 3)), ('ring', (12,)), ('tokens', (22, 8))],
+}
+
+
+class _Instance:
+    """A generated net plus the reachable-set BDD shared by the BDD-based engines."""
+
+    def __init__(self, family: str, params: Sequence[int], directory: str):
+        self.family = family
+        self.params = list(params)
+        self.path = generate(family, params, directory)
+        self.name = os.path.splitext(os.path.basename(self.path))[0]
+        self.pn = PetriNet.from_pnml(self.path, use_cache=False)
+        self._reached = None
+
+    def reached(self):
+        if self._reached is None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self._reached = bdd_reachable(self.pn)
+        return self._reached
+
+
+def _deadlock(func):
+    def run(inst):
+        Reached, n = inst.reached()
+        mark, _ = func(inst.pn, Reached, n)
+        return mark is not None
+    return run
+
+
+# engines that reuse the instance's reachable-set BDD (built before timing)
+NEEDS_REACHED = ('deadlock_incremental', 'deadlock_bdd2', 'optimization')
+
+# engine name -> function(instance) returning a small comparable result
+ENGINES: Dict[str, Callable[[_Instance], object]] = {
+    'bfs': lambda inst: len(bfs_reachable(inst.pn)),
+    'dfs': lambda inst: len(dfs_reachable(inst.pn)),
+    'bfs_safe': lambda inst: len(bfs_reachable_safe(inst.pn)),
+    'bdd': lambda inst: int(bdd_reachable(inst.pn)[1]),
+    'bdd_array': lambda inst: int(bdd_reachable(inst.pn, backend='array')[1]),
+    'deadlock_incremental': _deadlock(deadlock_incremental_ilp_bdd),
+    'deadlock_bdd2': _deadlock(deadlock_bdd2),
+    'deadlock_explicit': lambda inst: deadlock_explicit(inst.pn)[0] is not None,
+    'optimization': lambda inst: max_reachable_marking(inst.pn.place_ids, inst.reached()[0],
+                                                       np.ones(len(inst.pn.place_ids)))[1],
+}
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Median and spread of a list of measurements."""
+    s = sorted(samples)
+    q1, q3 = (np.percentile(s, [25, 75]).tolist() if len(s) > 1 else (s[0], s[0]))
+    return {
+        'median': statistics.median(s),
+        'min': s[0],
+        'max': s[-1],
+        'mean': statistics.fmean(s),
+        'stdev': statistics.stdev(s) if len(s) > 1 else 0.0,
+        'iqr': q3 - q1,
+        'n': len(s),
+        'samples': list(samples),
+    }
+
+
+def _identity(result):
+    return result
+
+
+def measure(engine: Callable, inst: _Instance, trials: int = 5, warmup: int = 1,
+            memory_mode: str = 'rss', isolate: bool = True) -> dict:
+    """
+    Run one engine: `warmup` untimed runs in this process, `trials` runs in
+    'time' mode, then one separate run in `memory_mode` ('rss',
+    'tracemalloc' or None to skip) for the peak memory, so memory tracking
+    never inflates the reported times. With isolate=True every trial and the
+    memory run get their own process (see Measurement.py).
+    """
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        for _ in range(warmup):
+            engine(inst)
+        wall, cpu = [], []
+        result = None
+        for _ in range(trials):
+            m = measure_once(engine, inst, mode='time', isolate=isolate, summary=_identity)
+            result = m.result
+            wall.append(m.wall_ms)
+            cpu.append(m.cpu_ms)
+        peak_kb = None
+        if memory_mode is not None:
+            peak_kb = measure_once(engine, inst, mode=memory_mode, isolate=isolate,
+                                   summary=_identity).peak_kb
+    return {
+        'result': result,
+        'time_ms': dict(summarize(wall), mode='time'),
+        'cpu_ms': dict(summarize(cpu), mode='time'),
+        'peak_kb': peak_kb,
+        'memory_mode': memory_mode,
+        'isolated': isolate,
+    }
+
+
+def run_suite(families: Sequence[str] = FAMILIES, engines: Sequence[str] = tuple(ENGINES),
+              size: str = 'small', trials: int = 5, warmup: int = 1,
+              workdir: str = '.bench_nets', memory_mode: Optional[str] = 'rss',
+              isolate: bool = True, verbose: bool = True) -> dict:
+    """
+    Benchmark every (instance, engine) pair of a size preset.
+
+    Args:
+        families: subset of NetFamilies.FAMILIES.
+        engines:  subset of ENGINES.
+        size:     key of SIZES.
+        trials, warmup: timed / untimed runs per pair.
+        workdir:  where the generated PNML files are written.
+        memory_mode, isolate: see measure().
+
+    Returns:
+        the report dict (see the module header).
+    """
+    for name in engines:
+        if name not in ENGINES:
+            raise ValueError(f"Unknown engine {name!r}; expected one of {tuple(ENGINES)}")
+    report = {
+        'meta': {
+            'size': size,
+            'trials': trials,
+            'warmup': warmup,
+            'memory_mode': memory_mode,
+            'isolated': isolate,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': [],
+    }
+    for family, params in SIZES[size]:
+        if family not in families:
+            continue
+        inst = _Instance(family, params, workdir)
+        if any(name in NEEDS_REACHED for name in engines):
+            inst.reached()
+        for name in engines:
+            rec = {
+                'family': family,
+                'params': inst.params,
+                'instance': inst.name,
+                'places': len(inst.pn.place_ids),
+                'transitions': len(inst.pn.trans_ids),
+                'engine': name,
+            }
+            rec.update(measure(ENGINES[name], inst, trials, warmup, memory_mode, isolate))
+            report['results'].append(rec)
+            if verbose:
+                t = rec['time_ms']
+                mem = (f"{rec['peak_kb']:12.1f} KB [{memory_mode}]" if rec['peak_kb'] is not None
+                       else f"{'n/a':>15}")
+                print(f"{inst.name:<16} {name:<22} {str(rec['result']):>10} "
+                      f"{t['median']:10.2f} ms (±{t['iqr']:.2f}) {mem}")
+    return report
+
+
+def compare(report: dict, baseline: dict, time_threshold: float = 0.25,
+            mem_threshold: float = 0.25, min_delta_ms: float = 5.0) -> List[str]:
+    """
+    Regressions of `report` against `baseline` (pairs missing from either are
+    ignored). A time regression needs both a relative slowdown above
+    time_threshold and an absolute one above min_delta_ms, so that
+    sub-millisecond noise does not fail the run. Memory is only compared
+    when both reports measured it in the same mode.
+
+    Returns:
+        list of human-readable messages, empty when nothing regressed.
+    """
+    base = {(r['instance'], r['engine']): r for r in baseline.get('results', [])}
+    problems = []
+    for r in report['results']:
+        b = base.get((r['instance'], r['engine']))
+        if b is None:
+            continue
+        label = f"{r['instance']}/{r['engine']}"
+        if r['result'] != b['result']:
+            problems.append(f"{label}: result changed {b['result']!r} -> {r['result']!r}")
+        t, bt = r['time_ms']['median'], b['time_ms']['median']
+        if t > bt * (1 + time_threshold) and t - bt > min_delta_ms:
+            problems.append(f"{label}: time {bt:.2f} -> {t:.2f} ms (+{(t / bt - 1) * 100:.0f}%)")
+        m, bm = r.get('peak_kb'), b.get('peak_kb')
+        if r.get('memory_mode') != b.get('memory_mode') or m is None or bm is None:
+            continue
+        if bm > 0 and m > bm * (1 + mem_threshold):
+            problems.append(f"{label}: peak memory {bm:.1f} -> {m:.1f} KB (+{(m / bm - 1) * 100:.0f}%)")
+    return problems
+
+
+def _load(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save(path: str, report: dict) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+
+
+# -------------------------------------------------------------
+# Command line interface
+# -------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark all engines on generated net families.")
+    ap.add_argument('--size', choices=sorted(SIZES), default='small')
+    ap.add_argument('--families', default=','.join(FAMILIES), help="comma-separated subset of " + ','.join(FAMILIES))
+    ap.add_argument('--engines', default=','.join(ENGINES), help="comma-separated subset of " + ','.join(ENGINES))
+    ap.add_argument('--trials', type=int, default=5)
+    ap.add_argument('--warmup', type=int, default=1)
+    ap.add_argument('--memory-mode', choices=[m for m in MODES if m != 'time'] + ['none'], default='rss',
+                    help="how peak memory is measured (separately from the timed trials)")
+    ap.add_argument('--no-isolate', action='store_true', help="run trials in this process instead of a child each")
+    ap.add_argument('--workdir', default='.bench_nets', help="directory for the generated PNML files")
+    ap.add_argument('--out', default='benchmark_results.json', help="JSON report to write")
+    ap.add_argument('--baseline', help="compare against this report and exit 1 on regression")
+    ap.add_argument('--save-baseline', help="also write the report to this path")
+    ap.add_argument('--threshold', type=float, default=0.25, help="allowed relative time regression")
+    ap.add_argument('--mem-threshold', type=float, default=0.25, help="allowed relative memory regression")
+    ap.add_argument('--min-delta-ms', type=float, default=5.0, help="ignore slowdowns smaller than this")
+    args = ap.parse_args(argv)
+
+    report = run_suite(families=args.families.split(','), engines=args.engines.split(','),
+                       size=args.size, trials=args.trials, warmup=args.warmup, workdir=args.workdir,
+                       memory_mode=None if args.memory_mode == 'none' else args.memory_mode,
+                       isolate=not args.no_isolate)
+    _save(args.out, report)
+    print(f"Report written to {args.out}")
+    if args.save_baseline:
+        _save(args.save_baseline, report)
+        print(f"Baseline written to {args.save_baseline}")
+    if args.baseline:
+        problems = compare(report, _load(args.baseline), args.threshold, args.mem_threshold, args.min_delta_ms)
+        for msg in problems:
+            print("REGRESSION " + msg)
+        if problems:
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+import hashlib
+import itertools
+import json
+import os
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from Measurement import current_rss_kb
+from Observers import CHECK_EVERY, visited_bytes
+
+# ---------------------------------------------------------
+# BUDGETS AND CHECKPOINTS FOR LONG EXPLICIT RUNS
+# ---------------------------------------------------------
+# The explicit engines (bfs/dfs_reachable, their *_safe variants, the disk
+# BFS) accept
+#   budget=Budget(...)          stop gracefully once a time, state-count or
+#                               memory limit is hit; the engine returns the
+#                               partial visited set and the Budget records
+#                               complete=False and which limit stopped it
+#   checkpoint=Checkpoint(path) write visited set + frontier to `path` every
+#                               `every_seconds`, when a budget stops the run
+#                               and when it finishes
+#   resume=path                 start from such a file instead of M0
+# Limits are checked in the pop of the main loop, between two expansions, so
+# the saved frontier is exact: a resumed run visits precisely the states the
+# uninterrupted run would have visited, in the same order.
+#
+# File layout (numpy .npz, no pickles):
+#   meta      UTF-8 JSON: version, engine, net hash, counts, elapsed_s, ...
+#   visited   (N x W) uint8 rows: one byte per place (or int32 when a place
+#             holds more than 255 tokens); ceil(P/8) bytes of bitset for *_safe
+#   frontier  same encoding, in queue order
+#   enabled   (F x ceil(T/8)) uint8 enabled-transition bitmasks of the frontier
+#             (tuple engines only)
+
+_FORMAT_VERSION = 1
+SAFE_ENGINES = ('bfs_safe', 'dfs_safe')
+ENGINES = ('bfs', 'dfs') + SAFE_ENGINES
+
+
+class Budget:
+    """
+    Resource limits for one explicit run. After the run it also says how the
+    run ended: complete is True only if the whole state space was explored,
+    otherwise stopped_by names the limit ('time', 'states' or 'memory'), or is
+    None when the caller stopped consuming a generator early.
+
+    Limits are checked every check_every expansions, so a run can overshoot
+    max_states by that many expansions' successors. max_seconds counts this
+    call only (not the time spent before a checkpoint was resumed).
+    max_memory_mb is compared with the current process RSS. Where only the
+    lifetime peak RSS is available (no /proc), it is compared with how much
+    that peak grew since this run started, so an earlier peak in the same
+    process does not count against it. Where neither can be read, it is
+    compared with the estimated size of the visited set.
+    """
+
+    def __init__(self, max_seconds: Optional[float] = None, max_states: Optional[int] = None,
+                 max_memory_mb: Optional[float] = None, check_every: int = 256):
+        self.max_seconds = max_seconds
+        self.max_states = max_states
+        self.max_memory_mb = max_memory_mb
+        self.check_every = max(1, int(check_every))
+        self.complete = False
+        self.stopped_by: Optional[str] = None
+        self.states = 0
+        self.frontier = 0
+        self.elapsed_s = 0.0
+
+    def start(self) -> None:
+        self.t0 = time.perf_counter()
+        self.complete = False
+        self.stopped_by = None
+        self._peak0 = None
+        if self.max_memory_mb is not None and current_rss_kb(peak_fallback=False) is None:
+            self._peak0 = current_rss_kb()
+
+    def _memory_bytes(self, visited, num_places: int) -> Optional[float]:
+        rss = current_rss_kb(peak_fallback=False)
+        if rss is not None:
+            return rss * 1024
+        if self._peak0 is not None:
+            peak = current_rss_kb()
+            if peak is not None:
+                return (peak - self._peak0) * 1024
+        return visited_bytes(visited, num_places)
+
+    def exceeded(self, states: int, visited, num_places: int) -> Optional[str]:
+        """Name of the first limit that is exceeded, or None."""
+        if self.max_states is not None and states >= self.max_states:
+            return 'states'
+        if self.max_seconds is not None and time.perf_counter() - self.t0 >= self.max_seconds:
+            return 'time'
+        if self.max_memory_mb is not None:
+            used = self._memory_bytes(visited, num_places)
+            if used is not None and used >= self.max_memory_mb * 2 ** 20:
+                return 'memory'
+        return None
+
+    def __repr__(self) -> str:
+        status = 'complete' if self.complete else f"stopped by {self.stopped_by}"
+        return f"Budget({status}, states={self.states}, frontier={self.frontier}, {self.elapsed_s:.1f}s)"
+
+
+class Checkpoint:
+    """Where and how often an explicit run saves its state (see the module header)."""
+
+    def __init__(self, path: str, every_seconds: Optional[float] = 300.0):
+        self.path = path
+        self.every_seconds = every_seconds
+        self.saves = 0
+        self.last = time.perf_counter()
+
+    def due(self) -> bool:
+        return (self.every_seconds is not None
+                and time.perf_counter() - self.last >= self.every_seconds)
+
+
+# ---------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------
+
+def net_hash(pn) -> str:
+    return hashlib.sha256(pn.fingerprint().encode()).hexdigest()
+
+
+def _marking_rows(markings: Iterable[Tuple[int, ...]], count: int, num_places: int) -> np.ndarray:
+    flat = np.fromiter(itertools.chain.from_iterable(markings), dtype=np.int64,
+                       count=count * num_places)
+    rows = flat.reshape(count, num_places)
+    if rows.size == 0 or (rows.min() >= 0 and rows.max() <= 255):
+        return rows.astype(np.uint8)
+    return rows.astype(np.int32)
+
+
+def _code_rows(codes: Iterable[int], count: int, width: int) -> np.ndarray:
+    buf = b''.join(code.to_bytes(width, 'little') for code in codes)
+    return np.frombuffer(buf, dtype=np.uint8).reshape(count, width)
+
+
+def _safe_codes(visited) -> Iterator[int]:
+    """Int bitsets of a visited store (PackedMarkingSet, MMapMarkingSet or set)."""
+    items = visited.codes() if hasattr(visited, 'codes') else iter(visited)
+    for m in items:
+        if isinstance(m, int):
+            yield m
+        else:
+            code = 0
+            for p, tokens in enumerate(m):
+                if tokens:
+                    code |= 1 << p
+            yield code
+
+
+def save_checkpoint(path: str, pn, engine: str, visited, frontier: List, complete: bool = False,
+                    stopped_by: Optional[str] = None, elapsed_s: float = 0.0) -> str:
+    """
+    Write the state of an explicit run to `path` (atomically: temp file + rename).
+
+    Args:
+        engine:   one of ENGINES.
+        visited:  the visited store of the run.
+        frontier: queue items in pop order: (marking, enabled mask) pairs for
+                  'bfs' / 'dfs', int bitsets for the *_safe engines.
+        complete, stopped_by, elapsed_s: recorded in the header.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}")
+    P, T = len(pn.place_ids), len(pn.trans_ids)
+    if engine in SAFE_ENGINES:
+        width = max(1, (P + 7) // 8)
+        records = getattr(visited, '_records', None)        # PackedMarkingSet: already packed
+        if records is not None and len(records) == len(visited) * width:
+            visited_rows = np.frombuffer(bytes(records), dtype=np.uint8).reshape(len(visited), width)
+        else:
+            visited_rows = _code_rows(_safe_codes(visited), len(visited), width)
+        frontier_rows = _code_rows(frontier, len(frontier), width)
+        arrays = {}
+    else:
+        visited_rows = _marking_rows(visited, len(visited), P)
+        frontier_rows = _marking_rows((m for m, _ in frontier), len(frontier), P)
+        arrays = {'enabled': _code_rows((e for _, e in frontier), len(frontier), max(1, (T + 7) // 8))}
+    meta = {
+        'version': _FORMAT_VERSION,
+        'engine': engine,
+        'net': net_hash(pn),
+        'num_places': P,
+        'num_transitions': T,
+        'states': len(visited),
+        'frontier': len(frontier),
+        'complete': complete,
+        'stopped_by': stopped_by,
+        'elapsed_s': elapsed_s,
+        'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8)
+    arrays['visited'] = visited_rows
+    arrays['frontier'] = frontier_rows
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+def read_checkpoint_meta(path: str) -> dict:
+    """Header of a checkpoint file (see the module header)."""
+    with np.load(path, allow_pickle=False) as data:
+        return json.loads(data['meta'].tobytes().decode('utf-8'))
+
+
+def load_checkpoint(path: str, pn, engine: str) -> Tuple[dict, List, List]:
+    """
+    Read a checkpoint written by `engine` for the net `pn`.
+
+    Returns:
+        (meta, visited, frontier): visited markings and frontier items in the
+        engine's own representation (tuples and (tuple, mask) pairs, or int
+        bitsets for the *_safe engines).
+
+    Raises ValueError if the file belongs to another net or engine.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data['meta'].tobytes().decode('utf-8'))
+        if meta.get('version') != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {meta.get('version')!r} in {path}")
+        if meta['net'] != net_hash(pn):
+            raise ValueError(f"Checkpoint {path} was written for a different net")
+        if meta['engine'] != engine:
+            raise ValueError(f"Checkpoint {path} was written by {meta['engine']!r}, not {engine!r}")
+        visited_rows, frontier_rows = data['visited'], data['frontier']
+        if engine in SAFE_ENGINES:
+            visited = [int.from_bytes(r.tobytes(), 'little') for r in visited_rows]
+            frontier = [int.from_bytes(r.tobytes(), 'little') for r in frontier_rows]
+        else:
+            visited = list(map(tuple, visited_rows.tolist()))
+            masks = [int.from_bytes(r.tobytes(), 'little') for r in data['enabled']]
+            frontier = list(zip(map(tuple, frontier_rows.tolist()), masks))
+    return meta, visited, frontier
+
+
+# ---------------------------------------------------------
+# Helpers used by the engines
+# ---------------------------------------------------------
+
+class StopExploration(Exception):
+    """Raised by a controlled pop when a budget limit is hit (caught by the engine)."""
+
+
+class ExplorationControl:
+    """
+    Budget and checkpoint handling for a pop-driven exploration loop, in the
+    style of Observers.ExplicitProgress: wrap(pop) returns a pop that, every
+    budget.check_every calls and before taking the next item, checks the
+    limits and the checkpoint timer. On a limit it saves a checkpoint and
+    raises StopExploration with the queue untouched.
+    """
+
+    def __init__(self, pn, engine: str, visited, queue, budget: Optional[Budget] = None,
+                 checkpoint: Optional[Checkpoint] = None, elapsed_before: float = 0.0):
+        self.pn = pn
+        self.engine = engine
+        self.visited = visited
+        self.queue = queue
+        self.budget = budget
+        self.checkpoint = checkpoint
+        self.elapsed_before = elapsed_before
+        self.num_places = len(pn.place_ids)
+        self.every = budget.check_every if budget is not None else CHECK_EVERY
+        self.expanded = 0
+        self.t0 = time.perf_counter()
+        if budget is not None:
+            budget.start()
+        if checkpoint is not None:
+            checkpoint.last = self.t0
+
+    def save(self, complete: bool, stopped_by: Optional[str] = None) -> None:
+        elapsed = self.elapsed_before + time.perf_counter() - self.t0
+        save_checkpoint(self.checkpoint.path, self.pn, self.engine, self.visited, list(self.queue),
+                        complete, stopped_by, elapsed)
+        self.checkpoint.saves += 1
+        self.checkpoint.last = time.perf_counter()
+
+    def _record(self, complete: bool, stopped_by: Optional[str]) -> None:
+        budget = self.budget
+        if budget is not None:
+            budget.complete = complete
+            budget.stopped_by = stopped_by
+            budget.states = len(self.visited)
+            budget.frontier = len(self.queue)
+            budget.elapsed_s = time.perf_counter() - self.t0
+
+    def check(self) -> None:
+        if self.budget is not None:
+            reason = self.budget.exceeded(len(self.visited), self.visited, self.num_places)
+            if reason is not None:
+                if self.checkpoint is not None:
+                    self.save(False, reason)
+                self._record(False, reason)
+                raise StopExploration(reason)
+        if self.checkpoint is not None and self.checkpoint.due():
+            self.save(False)
+
+    def wrap(self, pop):
+        every = self.every
+
+        def controlled_pop():
+            if self.expanded % every == 0:
+                self.check()
+            self.expanded += 1
+            return pop()
+        return controlled_pop
+
+    def finish(self) -> None:
+        """The queue ran empty: record completion and write the final checkpoint."""
+        if self.checkpoint is not None:
+            self.save(True)
+        self._record(True, None)
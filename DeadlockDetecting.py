@@ -1,11 +1,21 @@
 from PetriNetReading import PetriNet
-from SymbolicComputation import bdd_reachable 
+from SymbolicComputation import bdd_reachable, PartitionedReachability
+from ReachabilityCache import cached_bdd_reachable
+from StructuralAnalysis import incidence_matrix, p_invariant_basis, maximal_trap
+from ExplicitComputation import explicit_deadlock_search
+import time
 import numpy as np
 import pulp
 
-def build_deadmark_ilp_model(pn: PetriNet):
+def build_deadmark_ilp_model(pn: PetriNet, state_equation=False, invariants=False):
     """
     Tạo ILP model cho bài toán tìm dead marking (1-safe).
+
+    Ràng buộc tuỳ chọn (over-approximation của tập reachable, loại bớt
+    dead marking không thể reachable ngay trong solver):
+        state_equation: M = M0 + C^T x, x nguyên >= 0 (x_t = số lần bắn t).
+        invariants:     y^T M = y^T M0 cho mỗi vector của cơ sở P-invariant.
+                        (Đã được state equation bao hàm; hữu ích khi tắt nó.)
     """
     P = len(pn.place_ids)
     T = len(pn.trans_ids)
@@ -17,7 +27,7 @@ def build_deadmark_ilp_model(pn: PetriNet):
 
     # Deadness constraints: sum_{p in preset(t)} M_p <= |preset(t)| - 1
     for t in range(T):
-        inputs = np.where(pn.I[t, :] > 0)[0].tolist()
+        inputs = pn.preset(t)[0].tolist()
 
         if not inputs:
             # Transition không có input → luôn enable → không có dead marking.
@@ -29,12 +39,50 @@ def build_deadmark_ilp_model(pn: PetriNet):
 
         model += pulp.lpSum([M[p] for p in inputs]) <= len(inputs) - 1
 
+    if state_equation:
+        C = incidence_matrix(pn)
+        X = pulp.LpVariable.dicts("X", range(T), lowBound=0, cat="Integer")
+        for p in range(P):
+            ts = np.flatnonzero(C[:, p]).tolist()
+            model += M[p] == int(pn.M0[p]) + pulp.lpSum([int(C[t, p]) * X[t] for t in ts])
+
+    if invariants:
+        for y in p_invariant_basis(pn):
+            ps = np.flatnonzero(y).tolist()
+            model += pulp.lpSum([int(y[p]) * M[p] for p in ps]) == int(y @ pn.M0)
+
     # Không quan tâm objective, đặt 0 cho gọn
     model += 0
 
     return model, M
 
 
+def _ilp_marking(Mvars, P):
+    """
+    Đọc nghiệm ILP thành marking 0/1.
+    pulp.value() trả về None cho biến không xuất hiện trong ràng buộc nào
+    (place không thuộc preset của transition nào) -> coi là 0.
+    """
+    return tuple(int(round(pulp.value(Mvars[p]) or 0)) for p in range(P))
+
+
+def unmarked_trap(pn, marking):
+    """
+    Trap cut cho một dead marking ứng viên: tập place rỗng của marking chứa
+    trap lớn nhất Q; nếu Q có token ở M0 thì marking không reachable (trap đã
+    có token thì luôn có token). Trả về Q (list) hoặc None.
+    """
+    Q = maximal_trap(pn, [p for p, bit in enumerate(marking) if bit == 0])
+    if Q and any(pn.M0[p] > 0 for p in Q):
+        return sorted(Q)
+    return None
+
+
+def add_trap_cut(model, Mvars, Q):
+    # Trap Q được đánh dấu ở M0: mọi marking reachable có ít nhất 1 token trong Q
+    model += pulp.lpSum([Mvars[p] for p in Q]) >= 1
+
+
 def marking_to_bdd(marking, pn, bdd):
     """
     Convert một marking (tuple 0/1, độ dài = số place)
@@ -49,15 +97,36 @@ def marking_to_bdd(marking, pn, bdd):
             node &= ~var
     return node
 
-def deadlock_iterative_ilp_bdd(pn, ReachSet_BDD, num_reach, max_iter=1000):
+def _ilp_progress(observer, engine):
+    """Callback emit(event, **counters) cho vòng lặp ILP, hoặc None khi không có observer."""
+    if observer is None:
+        return None
+    t0 = time.perf_counter()
+
+    def emit(event, **counters):
+        counters.update(engine=engine, elapsed_s=time.perf_counter() - t0)
+        observer(event, counters)
+    return emit
+
+
+def deadlock_iterative_ilp_bdd(pn, ReachSet_BDD, num_reach, max_iter=1000, observer=None):
     """
-    Version dùng dd.autoref.BDD:
+    Version dùng BDD manager (dd.autoref hoặc ArrayBDD):
       - Input:
           pn            : PetriNet
           ReachSet_BDD  : node BDD trả về từ bdd_algo.bdd_reachable(pn)
           num_reach     : số trạng thái reachable (chỉ để report)
+          observer      : callback tuỳ chọn (ilp.round / ilp.done, xem Observers.py)
       - Output: (deadlock_marking or None, message)
     """
+    emit = _ilp_progress(observer, 'iterative_ilp_bdd')
+    result = _deadlock_iterative_ilp_bdd(pn, ReachSet_BDD, max_iter, emit)
+    if emit is not None:
+        emit('ilp.done', found=result[0] is not None, message=result[1])
+    return result
+
+
+def _deadlock_iterative_ilp_bdd(pn, ReachSet_BDD, max_iter, emit):
     # Lấy BDD manager từ node ReachSet_BDD
     bdd = ReachSet_BDD.bdd
     One = bdd.true
@@ -70,6 +139,8 @@ def deadlock_iterative_ilp_bdd(pn, ReachSet_BDD, num_reach, max_iter=1000):
     for it in range(max_iter):
         # 1) Giải ILP
         status = model.solve(pulp.PULP_CBC_CMD(msg=False))
+        if emit is not None:
+            emit('ilp.round', solver_calls=it + 1, cuts=it)
         if pulp.LpStatus[status] != "Optimal":
             # Không còn dead marking nào trong toàn space 0/1^P
             if it == 0:
@@ -79,7 +150,7 @@ def deadlock_iterative_ilp_bdd(pn, ReachSet_BDD, num_reach, max_iter=1000):
             return None, msg
 
         # 2) Lấy nghiệm Mcand
-        Mcand = tuple(int(pulp.value(Mvars[p])) for p in range(P))
+        Mcand = _ilp_marking(Mvars, P)
 
         # 3) Kiểm tra reachable bằng BDD
         cand_bdd = marking_to_bdd(Mcand, pn, bdd)
@@ -127,7 +198,7 @@ def deadlock_bdd2(pn, ReachSet_BDD, num_reach):
         return None, "No dead marking at all (ILP) -> NO DEADLOCK."
 
     # CASE B: Có ít nhất 1 dead marking (trong toàn space, chưa chắc reachable)
-    Mcand_ilp = tuple(int(pulp.value(Mvars[p])) for p in range(P))
+    Mcand_ilp = _ilp_marking(Mvars, P)
 
     cand_bdd = marking_to_bdd(Mcand_ilp, pn, bdd)
     Check = ReachSet_BDD & cand_bdd
@@ -146,11 +217,8 @@ def deadlock_bdd2(pn, ReachSet_BDD, num_reach):
             # Không còn candidate nào
             return None, "Dead markings exist (ILP), but none reachable (BDD) -> NO DEADLOCK."
 
-        if trans_idx >= pn.I.shape[0] or trans_idx >= pn.O.shape[0]:
-            continue
-
-        input_places = np.flatnonzero(pn.I[trans_idx, :] > 0).tolist()
-        output_places = np.flatnonzero(pn.O[trans_idx, :] > 0).tolist()
+        input_places = pn.preset(trans_idx)[0].tolist()
+        output_places = pn.postset(trans_idx)[0].tolist()
 
         # Xây cond: những marking enable được transition này
         cond = bdd.true
@@ -172,10 +240,469 @@ def deadlock_bdd2(pn, ReachSet_BDD, num_reach):
 
     return deadlock_marking, "Deadlock found by BDD filtering (no big AnyEnabled)."
 
-def deadlock_iterative_ilp_bdd_auto(pn, max_iter=1000):
-    ReachSet_BDD, num_reach = bdd_reachable(pn)
+# ---------------------------------------------------------
+# CHỨNG MINH DEADLOCK-FREE KHÔNG CẦN BDD
+# ---------------------------------------------------------
+
+def prove_deadlock_freedom(pn, state_equation=True, invariants=False, traps=True,
+                           max_trap_cuts=200, solver=None, stats=None, observer=None):
+    """
+    Cố chứng minh net không có reachable deadlock chỉ bằng ILP.
+
+    Giải model dead marking đã tăng cường (state equation / P-invariants);
+    với mỗi nghiệm, nếu tập place rỗng chứa một trap được đánh dấu ở M0 thì
+    thêm trap cut và giải lại (lazy). Mọi ràng buộc đều là over-approximation
+    của tập reachable, nên model vô nghiệm => deadlock-free.
+
+    observer: callback tuỳ chọn (ilp.round / ilp.done, xem Observers.py).
+
+    Returns:
+        (proved, message, candidate): candidate là dead marking còn lại (thỏa
+        mọi ràng buộc, chưa chắc reachable) khi không chứng minh được.
+    """
+    if stats is None:
+        stats = {}
+    emit = _ilp_progress(observer, 'prove_deadlock_freedom')
+    result = _prove_deadlock_freedom(pn, state_equation, invariants, traps, max_trap_cuts, solver, stats, emit)
+    if emit is not None:
+        emit('ilp.done', proved=result[0], message=result[1], solver_calls=stats['solves'],
+             cuts=stats['trap_cuts'])
+    return result
+
+
+def _prove_deadlock_freedom(pn, state_equation, invariants, traps, max_trap_cuts, solver, stats, emit):
+    P = len(pn.place_ids)
+    stats.update(solves=0, trap_cuts=0)
+    model, Mvars = build_deadmark_ilp_model(pn, state_equation, invariants)
+    solver = solver or _default_solver()
+
+    while True:
+        stats['solves'] += 1
+        status = model.solve(solver)
+        if emit is not None:
+            emit('ilp.round', solver_calls=stats['solves'], cuts=stats['trap_cuts'])
+        if pulp.LpStatus[status] != "Optimal":
+            return True, (f"Strengthened ILP infeasible → NO DEADLOCK "
+                          f"({stats['solves']} solves, {stats['trap_cuts']} trap cuts, no BDD needed)."), None
+        M = _ilp_marking(Mvars, P)
+        Q = unmarked_trap(pn, M) if traps else None
+        if Q is None:
+            return False, "Potential dead marking satisfies all structural constraints.", M
+        if stats['trap_cuts'] >= max_trap_cuts:
+            return False, f"Gave up after {max_trap_cuts} trap cuts.", M
+        add_trap_cut(model, Mvars, Q)
+        stats['trap_cuts'] += 1
+
+
+# ---------------------------------------------------------
+# INCREMENTAL ILP + BDD: candidate pools, batched & generalized cuts
+# ---------------------------------------------------------
+# deadlock_iterative_ilp_bdd loại đúng 1 marking sau mỗi lần giải ILP. Ở đây
+# mỗi vòng:
+#   1. giải ILP (cùng 1 model, cùng 1 solver object) lấy 1 dead marking M;
+#   2. mở rộng M thành một pool dead marking bằng cách lật bit (vẫn dead,
+#      vẫn thỏa mọi cut) - rẻ hơn nhiều so với giải lại ILP;
+#   3. kiểm tra cả pool với ReachSet_BDD bằng 1 phép AND;
+#   4. với mỗi marking unreachable, bỏ dần literal của cube của nó khi
+#      cube vẫn rời ReachSet_BDD (cube generalization), rồi thêm tất cả
+#      các cut cùng lúc. Một cut ngắn loại được cả họ marking.
+
+def _default_solver():
+    """HiGHS chạy in-process (không ghi file LP, không spawn process) nếu có, không thì CBC."""
+    if 'HiGHS' in pulp.listSolvers(onlyAvailable=True):
+        return pulp.HiGHS(msg=False)
+    return pulp.PULP_CBC_CMD(msg=False)
+
+
+class _DeadMarkingPool:
+    """Dead marking lân cận (Hamming) của nghiệm ILP, thỏa các cut đã có."""
+
+    def __init__(self, pn):
+        self.P = len(pn.place_ids)
+        self.T = len(pn.trans_ids)
+        self.pre_idx = pn.pre_idx
+        self.pre_size = np.diff(pn.pre_ptr)
+        self.pre_row = np.repeat(np.arange(self.T), self.pre_size)
+        self._rows = []                                  # cut: A @ M <= b
+        self._rhs = []
+        self.A = np.zeros((0, self.P), dtype=np.int64)
+        self.b = np.zeros(0, dtype=np.int64)
+
+    def add_cut(self, ones, zeros):
+        row = np.zeros(self.P, dtype=np.int64)
+        row[list(ones)] = 1
+        row[list(zeros)] = -1
+        self._rows.append(row)
+        self._rhs.append(len(ones) - 1)
+        # A/b được dựng lại một lần cho mỗi lô cut (xem refresh)
+
+    def refresh(self):
+        if len(self._rows) != len(self.b):
+            self.A = np.array(self._rows, dtype=np.int64).reshape(-1, self.P)
+            self.b = np.array(self._rhs, dtype=np.int64)
+
+    def excluded(self, M, since=0):
+        """M vi phạm một trong các cut thứ since, since+1, ... (chưa refresh cũng được)."""
+        return any(row @ M > rhs for row, rhs in zip(self._rows[since:], self._rhs[since:]))
+
+    def _flips(self, M):
+        """Các place có thể lật mà marking vẫn dead và thỏa mọi cut."""
+        tokens = np.bincount(self.pre_row, weights=M[self.pre_idx], minlength=self.T)
+        tight = tokens >= self.pre_size - 1              # thêm 1 token là enable t
+        blocked = np.bincount(self.pre_idx, weights=tight[self.pre_row], minlength=self.P) > 0
+        d = 1 - 2 * M                                    # +1: 0 -> 1, -1: 1 -> 0
+        ok = ~((d > 0) & blocked)
+        if len(self.b):
+            slack = self.b - self.A @ M
+            ok &= (self.A * d <= slack[:, None]).all(axis=0)
+        return np.flatnonzero(ok)
+
+    def expand(self, M, size):
+        """BFS theo số bit lật, từ M, tới khi có `size` marking."""
+        start = np.asarray(M, dtype=np.int64)
+        pool = [start]
+        seen = {start.tobytes()}
+        i = 0
+        while i < len(pool) and len(pool) < size:
+            current = pool[i]
+            i += 1
+            for p in self._flips(current):
+                nxt = current.copy()
+                nxt[p] ^= 1
+                key = nxt.tobytes()
+                if key not in seen:
+                    seen.add(key)
+                    pool.append(nxt)
+                    if len(pool) >= size:
+                        break
+        return pool
+
+
+def _generalize(marking, pn, ReachSet_BDD):
+    """
+    Bỏ dần literal khỏi cube của một marking unreachable, miễn là cube còn
+    rời ReachSet_BDD. Trả về (places = 1, places = 0) của cube còn lại.
+    """
+    bdd = ReachSet_BDD.bdd
+    cube = {p_id: bool(bit) for p_id, bit in zip(pn.place_ids, marking)}
+    # Thử bỏ literal ở level sâu trước: cofactor theo các biến trên cùng rẻ hơn
+    for p_id in sorted(cube, key=bdd.level_of_var, reverse=True):
+        value = cube.pop(p_id)
+        if bdd.let(cube, ReachSet_BDD) != bdd.false:
+            cube[p_id] = value
+    index = {p_id: i for i, p_id in enumerate(pn.place_ids)}
+    ones = [index[p] for p, v in cube.items() if v]
+    zeros = [index[p] for p, v in cube.items() if not v]
+    return ones, zeros
+
+
+def deadlock_incremental_ilp_bdd(pn, ReachSet_BDD, num_reach, pool_size=64, max_rounds=1000,
+                                 generalize=True, solver=None, stats=None,
+                                 state_equation=False, invariants=False, traps=False,
+                                 observer=None):
+    """
+    Deadlock search: ILP đề xuất, BDD kiểm tra theo lô.
+
+    Args:
+        pn, ReachSet_BDD, num_reach: như deadlock_iterative_ilp_bdd.
+        pool_size:  số dead marking kiểm tra mỗi vòng (nghiệm ILP + lân cận).
+        max_rounds: số lần giải ILP tối đa.
+        generalize: rút gọn cut của marking unreachable (False = cut đúng 1 marking).
+        solver:     pulp solver, dùng lại qua mọi vòng (mặc định: HiGHS nếu có, không thì CBC).
+        stats:      dict tuỳ chọn: 'rounds', 'candidates', 'cuts', 'cut_literals', 'trap_cuts'.
+        state_equation, invariants: ràng buộc thêm, xem build_deadmark_ilp_model.
+        traps:      loại ứng viên có trap được đánh dấu ở M0 nằm trong tập place
+                    rỗng (trap cut), không cần tới BDD.
+        observer:   callback tuỳ chọn: ilp.round sau mỗi vòng, ilp.done (Observers.py).
+
+    Returns:
+        (deadlock_marking or None, message)
+    """
+    if stats is None:
+        stats = {}
+    emit = _ilp_progress(observer, 'incremental_ilp_bdd')
+    result = _deadlock_incremental_ilp_bdd(pn, ReachSet_BDD, pool_size, max_rounds, generalize, solver,
+                                           stats, state_equation, invariants, traps, emit)
+    if emit is not None:
+        emit('ilp.done', found=result[0] is not None, message=result[1], solver_calls=stats['rounds'],
+             **{k: v for k, v in stats.items() if k != 'rounds'})
+    return result
+
+
+def _deadlock_incremental_ilp_bdd(pn, ReachSet_BDD, pool_size, max_rounds, generalize, solver,
+                                  stats, state_equation, invariants, traps, emit):
+    bdd = ReachSet_BDD.bdd
+    Zero = bdd.false
+    P = len(pn.place_ids)
+    stats.update(rounds=0, candidates=0, cuts=0, cut_literals=0, trap_cuts=0)
+
+    model, Mvars = build_deadmark_ilp_model(pn, state_equation, invariants)
+    solver = solver or _default_solver()
+    pool_gen = _DeadMarkingPool(pn)
+
+    for rnd in range(max_rounds):
+        stats['rounds'] = rnd + 1
+        status = model.solve(solver)
+        if pulp.LpStatus[status] != "Optimal":
+            if rnd == 0:
+                return None, "No dead marking at all → NO DEADLOCK."
+            return None, (f"All dead markings are unreachable → NO DEADLOCK "
+                          f"({rnd + 1} ILP solves, {stats['candidates']} candidates, {stats['cuts']} cuts).")
+
+        pool = pool_gen.expand(_ilp_marking(Mvars, P), pool_size)
+        stats['candidates'] += len(pool)
+        if emit is not None:
+            emit('ilp.round', solver_calls=rnd + 1, cuts=stats['cuts'], candidates=stats['candidates'],
+                 trap_cuts=stats['trap_cuts'])
+
+        if traps:
+            # Trap cut cho mọi ứng viên bị trap loại; phần còn lại mới đưa qua BDD
+            first_new = stats['cuts']
+            kept = []
+            for M in pool:
+                if pool_gen.excluded(M, since=first_new):
+                    continue
+                Q = unmarked_trap(pn, M)
+                if Q is None:
+                    kept.append(M)
+                    continue
+                add_trap_cut(model, Mvars, Q)
+                pool_gen.add_cut([], Q)         # -sum_Q M <= -1
+                stats['cuts'] += 1
+                stats['trap_cuts'] += 1
+                stats['cut_literals'] += len(Q)
+            pool_gen.refresh()
+            pool = kept
+            if not pool:
+                continue
+
+        # Kiểm tra cả pool bằng một phép AND
+        candidates = Zero
+        for M in pool:
+            candidates |= marking_to_bdd(M, pn, bdd)
+        hit = ReachSet_BDD & candidates
+        if hit != Zero:
+            assignment = bdd.pick(hit)
+            deadlock = tuple(int(assignment.get(p_id, 0)) for p_id in pn.place_ids)
+            return deadlock, f"Deadlock found in round {rnd + 1} ({stats['candidates']} candidates checked)."
+
+        # Cả pool unreachable: thêm mọi cut một lượt
+        first_new = stats['cuts']
+        for M in pool:
+            if pool_gen.excluded(M, since=first_new):
+                continue        # đã bị một cut vừa thêm trong vòng này loại
+            if generalize:
+                ones, zeros = _generalize(M, pn, ReachSet_BDD)
+            else:
+                ones = np.flatnonzero(M).tolist()
+                zeros = np.flatnonzero(M == 0).tolist()
+            pool_gen.add_cut(ones, zeros)
+            model += pulp.lpSum([Mvars[p] for p in ones]) - pulp.lpSum([Mvars[p] for p in zeros]) \
+                <= len(ones) - 1
+            stats['cuts'] += 1
+            stats['cut_literals'] += len(ones) + len(zeros)
+        pool_gen.refresh()
+
+    return None, f"Stopped after {max_rounds} rounds without finding a reachable deadlock."
+
+
+# ---------------------------------------------------------
+# LIỆT KÊ TẤT CẢ DEADLOCK REACHABLE (symbolic)
+# ---------------------------------------------------------
+
+def deadlock_set_bdd(pn, ReachSet_BDD):
+    """
+    BDD của mọi reachable dead marking: Reached AND (với mọi t) NOT enabled(t).
+    enabled(t) = mọi input place có token, giống bdd_reachable và ràng buộc ILP.
+    """
+    bdd = ReachSet_BDD.bdd
+    Dead = ReachSet_BDD
+    for t in range(len(pn.trans_ids)):
+        if Dead == bdd.false:
+            break
+        enabled = bdd.true
+        for idx in pn.preset(t)[0].tolist():
+            enabled &= bdd.var(pn.place_ids[idx])
+        Dead &= ~enabled
+    return Dead
+
+
+class DeadlockSet:
+    """
+    Tập deadlock reachable, biểu diễn bằng BDD (chạy được với cả hai backend).
+
+        deadlocks.bdd_node      BDD của tập deadlock
+        deadlocks.count         số deadlock (chính xác, bdd.count)
+        iter(deadlocks)         duyệt lazy, thứ tự cố định theo thứ tự biến BDD
+        deadlocks.marking(i)    deadlock thứ i, O(|P|) (không duyệt qua i-1 cái trước)
+        deadlocks.page(k, n)    trang thứ k (n deadlock mỗi trang)
+        deadlocks.shortest_trace(m)  chuỗi bắn ngắn nhất từ M0 tới m
+
+    Thứ tự: từ điển theo biến ở level trên cùng trước, giá trị 0 trước 1.
+    """
+
+    def __init__(self, pn, ReachSet_BDD, engine=None):
+        self.pn = pn
+        self.bdd = ReachSet_BDD.bdd
+        self.bdd_node = deadlock_set_bdd(pn, ReachSet_BDD)
+        self.count = self.bdd.count(self.bdd_node, nvars=len(pn.place_ids))
+        self._engine = engine
+
+        # Vị trí (0..P-1) của các biến place theo level; terminal ở vị trí P
+        levels = sorted(self.bdd.level_of_var(p_id) for p_id in pn.place_ids)
+        self._pos_of_level = {lvl: k for k, lvl in enumerate(levels)}
+        self._place_at = [self.pn.place_ids.index(self.bdd.var_at_level(lvl)) for lvl in levels]
+        self._models = {}
+
+    # ---------- đếm mô hình theo từng node ----------
+
+    def _pos(self, u):
+        if u == self.bdd.true or u == self.bdd.false:
+            return len(self._place_at)
+        return self._pos_of_level[u.level]
+
+    def _children(self, u):
+        lo, hi = u.low, u.high
+        if u.negated:
+            lo, hi = ~lo, ~hi
+        return lo, hi
+
+    def _num_models(self, u):
+        """Số assignment của các biến ở vị trí >= _pos(u) làm u đúng."""
+        if u == self.bdd.false:
+            return 0
+        if u == self.bdd.true:
+            return 1
+        key = int(u)
+        n = self._models.get(key)
+        if n is None:
+            k = self._pos(u)
+            lo, hi = self._children(u)
+            n = (self._num_models(lo) << (self._pos(lo) - k - 1)) + \
+                (self._num_models(hi) << (self._pos(hi) - k - 1))
+            self._models[key] = n
+        return n
+
+    # ---------- truy cập ----------
+
+    def __len__(self):
+        return self.count
+
+    def marking(self, i):
+        """Deadlock thứ i (0 <= i < count) theo thứ tự cố định của tập."""
+        if not 0 <= i < self.count:
+            raise IndexError(f"deadlock index {i} out of range ({self.count} deadlocks)")
+        marking = [0] * len(self.pn.place_ids)
+        u = self.bdd_node
+        for k, place in enumerate(self._place_at):
+            if self._pos(u) == k:
+                lo, hi = self._children(u)
+                n_lo = self._num_models(lo) << (self._pos(lo) - k - 1)
+                if i < n_lo:
+                    u = lo
+                else:
+                    i -= n_lo
+                    marking[place] = 1
+                    u = hi
+            else:
+                # Biến tự do ở vị trí k: nửa đầu = 0, nửa sau = 1
+                half = self._num_models(u) << (self._pos(u) - k - 1)
+                if i >= half:
+                    i -= half
+                    marking[place] = 1
+        return tuple(marking)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.marking(i)
+
+    def iter(self, start=0, limit=None):
+        """Duyệt lazy từ deadlock thứ `start`, tối đa `limit` cái."""
+        stop = self.count if limit is None else min(self.count, start + limit)
+        for i in range(start, stop):
+            yield self.marking(i)
+
+    def page(self, k, page_size=100):
+        """Trang thứ k (đánh số từ 0); list rỗng khi đã hết."""
+        return list(self.iter(k * page_size, page_size))
+
+    def pages(self, page_size=100):
+        """Generator các trang liên tiếp."""
+        for start in range(0, self.count, page_size):
+            yield list(self.iter(start, page_size))
+
+    # ---------- witness ----------
+
+    def shortest_trace(self, marking):
+        """
+        Chuỗi bắn ngắn nhất (list trans_ids) từ M0 tới deadlock `marking`.
+        PartitionedReachability được dựng (và chạy) một lần, lần gọi đầu tiên.
+        """
+        if self._engine is None:
+            self._engine = PartitionedReachability(self.pn)
+        return self._engine.shortest_trace(marking)
+
+    def with_traces(self, markings):
+        """[(marking, shortest trace)] cho một trang deadlock."""
+        return [(m, self.shortest_trace(m)) for m in markings]
+
+
+def enumerate_deadlocks(pn, ReachSet_BDD, engine=None):
+    """
+    Mọi reachable deadlock dưới dạng DeadlockSet.
+
+    Args:
+        pn:           PetriNet
+        ReachSet_BDD: BDD của tập reachable (bdd_reachable, cached_bdd_reachable, ...)
+        engine:       PartitionedReachability đã chạy sẵn (tuỳ chọn) để lấy trace.
+    """
+    return DeadlockSet(pn, ReachSet_BDD, engine)
+
+
+# ---------------------------------------------------------
+# TÌM DEADLOCK EXPLICIT (on-the-fly, không cần BDD)
+# ---------------------------------------------------------
+
+def deadlock_explicit(pn, order='bfs', observer=None, budget=None):
+    """
+    Duyệt BFS/DFS và dừng ngay ở marking đầu tiên không có transition nào
+    enabled (ExplicitComputation.explicit_deadlock_search).
+
+    Returns:
+        (deadlock marking hoặc None, message); message có chuỗi bắn
+        (ngắn nhất với order='bfs') dẫn từ M0 tới deadlock.
+    """
+    mark, trace, stats = explicit_deadlock_search(pn, order, observer=observer, budget=budget)
+    if mark is not None:
+        return mark, (f"Deadlock found on the fly after {stats['states']} states "
+                      f"(trace of {len(trace)} firings: {' '.join(trace)}).")
+    if not stats['complete']:
+        return None, f"Budget exhausted after {stats['states']} states without a deadlock (inconclusive)."
+    return None, f"No deadlock among all {stats['states']} reachable markings (explicit {order.upper()})."
+
+
+# cache: ReachabilityCache, None (default cache directory) hoặc False (luôn tính lại)
+# backend: 'dd' hoặc 'array' (xem BDDBackend.py); các hàm ở trên chạy được với cả hai
+def deadlock_iterative_ilp_bdd_auto(pn, max_iter=1000, cache=None, backend='dd'):
+    ReachSet_BDD, num_reach = cached_bdd_reachable(pn, cache=cache, backend=backend)
     return deadlock_iterative_ilp_bdd(pn, ReachSet_BDD, num_reach, max_iter)
 
-def deadlock_bdd2_auto(pn):
-    ReachSet_BDD, num_reach = bdd_reachable(pn)
-    return deadlock_bdd2(pn, ReachSet_BDD, num_reach)
\ No newline at end of file
+def deadlock_bdd2_auto(pn, cache=None, backend='dd'):
+    ReachSet_BDD, num_reach = cached_bdd_reachable(pn, cache=cache, backend=backend)
+    return deadlock_bdd2(pn, ReachSet_BDD, num_reach)
+
+# strengthen: thử chứng minh deadlock-free bằng ILP mạnh trước (không cần BDD),
+# rồi dùng cùng các ràng buộc đó trong vòng ILP + BDD
+def deadlock_incremental_ilp_bdd_auto(pn, pool_size=64, max_rounds=1000, cache=None, backend='dd',
+                                      strengthen=True):
+    if strengthen:
+        proved, msg, _ = prove_deadlock_freedom(pn)
+        if proved:
+            return None, msg
+    ReachSet_BDD, num_reach = cached_bdd_reachable(pn, cache=cache, backend=backend)
+    return deadlock_incremental_ilp_bdd(pn, ReachSet_BDD, num_reach, pool_size, max_rounds,
+                                        state_equation=strengthen, traps=strengthen)
+
+def enumerate_deadlocks_auto(pn, cache=None, backend='dd'):
+    ReachSet_BDD, num_reach = cached_bdd_reachable(pn, cache=cache, backend=backend)
+    return enumerate_deadlocks(pn, ReachSet_BDD)
@@ -0,0 +1,339 @@
+import mmap
+import os
+import pickle
+import tempfile
+import zlib
+from array import array
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
+
+from PetriNetReading import PetriNet
+from ExplicitComputation import NotSafeError, bfs_reachable, bfs_reachable_safe
+from Checkpointing import SAFE_ENGINES, read_checkpoint_meta
+
+# ---------------------------------------------------------
+# DISK-BACKED STORAGE FOR EXPLICIT EXPLORATION
+# ---------------------------------------------------------
+# MMapMarkingSet: open-addressing hash table of packed markings living in a
+#                 memory-mapped file, so the visited set can outgrow RAM.
+# DiskQueue:      FIFO that keeps a bounded buffer in memory and spills the
+#                 rest to sequential segment files.
+# Both follow the small part of the set/deque API the explicit engines use,
+# so they can be passed to bfs_reachable(pn, visited=..., queue=...).
+
+DEFAULT_RESIDENT_BYTES = 64 * 1024 * 1024
+
+
+class MMapMarkingSet:
+    """
+    Set of markings stored in a memory-mapped open-addressing table.
+
+    Each slot is 1 flag byte + a fixed-width record: one bit per place for
+    1-safe nets, otherwise one (max_tokens <= 255) or two bytes per place.
+    The table doubles (into a new file) when it is half full.
+
+    resident_bytes bounds how much of the mapping is kept in memory: once that
+    many bytes of slots have been touched, dirty pages are flushed and the
+    kernel is told to drop them (MADV_DONTNEED), so RSS stays around that
+    budget while the file grows.
+    """
+
+    _MAX_LOAD = 0.5
+
+    def __init__(self, num_places: int, one_safe: bool = False, max_tokens: int = 255,
+                 path: Optional[str] = None, capacity: int = 1 << 16,
+                 resident_bytes: int = DEFAULT_RESIDENT_BYTES):
+        self.num_places = num_places
+        self.one_safe = one_safe
+        if one_safe:
+            self._width = max(1, (num_places + 7) // 8)
+            self._typecode = None
+        else:
+            self._typecode = 'B' if max_tokens <= 0xFF else 'H' if max_tokens <= 0xFFFF else 'I'
+            self._width = num_places * array(self._typecode).itemsize
+        self._slot = self._width + 1
+        self.resident_bytes = resident_bytes
+
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix='.visited')
+            os.close(fd)
+        self.path = path
+        self._size = 0
+        self._touched = 0
+        self._open(self.path, max(8, 1 << (capacity - 1).bit_length()))
+
+    # ---------- file / mapping management ----------
+
+    def _open(self, path: str, capacity: int) -> None:
+        self._capacity = capacity
+        self._file = open(path, 'w+b')
+        self._file.truncate(capacity * self._slot)
+        self._mm = mmap.mmap(self._file.fileno(), capacity * self._slot)
+
+    def _close_mapping(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def _release(self) -> None:
+        """Write dirty pages back and let the kernel reclaim the mapping."""
+        self._mm.flush()
+        if hasattr(self._mm, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+            self._mm.madvise(mmap.MADV_DONTNEED)
+        self._touched = 0
+
+    def _touch(self, nbytes: int) -> None:
+        self._touched += nbytes
+        if self._touched >= self.resident_bytes:
+            self._release()
+
+    # ---------- encoding ----------
+
+    def encode(self, marking) -> bytes:
+        if self.one_safe:
+            if not isinstance(marking, int):
+                code = 0
+                for p, tokens in enumerate(marking):
+                    if tokens:
+                        code |= 1 << p
+                marking = code
+            return marking.to_bytes(self._width, 'little')
+        try:
+            return array(self._typecode, marking).tobytes()
+        except OverflowError:
+            raise ValueError(f"Marking {tuple(marking)} exceeds the max_tokens of this "
+                             f"MMapMarkingSet (typecode {self._typecode!r})") from None
+
+    def decode(self, record: bytes) -> Tuple[int, ...]:
+        if self.one_safe:
+            code = int.from_bytes(record, 'little')
+            return tuple((code >> p) & 1 for p in range(self.num_places))
+        return tuple(array(self._typecode, record))
+
+    # ---------- hash table ----------
+
+    def _home(self, record: bytes) -> int:
+        # crc32 is stable across processes, so a table file can be reopened
+        h = (zlib.crc32(record) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return h % self._capacity
+
+    def _lookup(self, record: bytes) -> Tuple[int, bool]:
+        mm = self._mm
+        slot_size = self._slot
+        slot = self._home(record)
+        probes = 0
+        while True:
+            off = slot * slot_size
+            probes += 1
+            if mm[off] == 0:
+                self._touch(probes * slot_size)
+                return off, False
+            if mm[off + 1:off + slot_size] == record:
+                self._touch(probes * slot_size)
+                return off, True
+            slot = (slot + 1) % self._capacity
+
+    def _grow(self) -> None:
+        old_mm, old_file, old_capacity = self._mm, self._file, self._capacity
+        tmp_path = self.path + '.grow'
+        self._open(tmp_path, old_capacity * 2)
+        slot_size = self._slot
+        for slot in range(old_capacity):
+            off = slot * slot_size
+            if old_mm[off]:
+                record = old_mm[off + 1:off + slot_size]
+                new_off, _ = self._lookup(record)
+                self._mm[new_off] = 1
+                self._mm[new_off + 1:new_off + slot_size] = record
+        old_mm.close()
+        old_file.close()
+        self._mm.flush()
+        self._close_mapping()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'r+b')
+        self._mm = mmap.mmap(self._file.fileno(), self._capacity * slot_size)
+        self._touched = 0
+
+    def add(self, marking) -> bool:
+        """Insert a marking (tuple, or int bitset in 1-safe mode). True if new."""
+        record = self.encode(marking)
+        off, found = self._lookup(record)
+        if found:
+            return False
+        self._mm[off] = 1
+        self._mm[off + 1:off + self._slot] = record
+        self._size += 1
+        if self._size > self._MAX_LOAD * self._capacity:
+            self._grow()
+        return True
+
+    def __contains__(self, marking) -> bool:
+        try:
+            record = self.encode(marking)
+        except (OverflowError, ValueError):
+            return False
+        return self._lookup(record)[1]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        """Decode every stored marking with one sequential scan of the table."""
+        mm = self._mm
+        slot_size = self._slot
+        for slot in range(self._capacity):
+            off = slot * slot_size
+            if mm[off]:
+                yield self.decode(mm[off + 1:off + slot_size])
+            self._touch(slot_size)
+
+    @property
+    def file_bytes(self) -> int:
+        return self._capacity * self._slot
+
+    def close(self, remove: bool = True) -> None:
+        self._close_mapping()
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> "MMapMarkingSet":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class DiskQueue:
+    """
+    FIFO queue with a bounded in-memory buffer.
+
+    append() fills a tail buffer; when it holds buffer_items items it is
+    pickled to a new segment file. popleft() drains a head buffer and refills
+    it from the oldest segment (or directly from the tail when nothing was
+    spilled). All disk I/O is sequential, whole-segment writes and reads.
+    """
+
+    def __init__(self, directory: Optional[str] = None, buffer_items: int = 100_000):
+        self.directory = directory or tempfile.mkdtemp(prefix='bfsqueue-')
+        os.makedirs(self.directory, exist_ok=True)
+        self.buffer_items = buffer_items
+        self._head = deque()
+        self._tail: List = []
+        self._segments = deque()
+        self._next_segment = 0
+        self._size = 0
+
+    def append(self, item) -> None:
+        self._tail.append(item)
+        self._size += 1
+        if len(self._tail) >= self.buffer_items:
+            path = os.path.join(self.directory, f'segment-{self._next_segment:08d}.pkl')
+            self._next_segment += 1
+            with open(path, 'wb') as f:
+                pickle.dump(self._tail, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._segments.append(path)
+            self._tail = []
+
+    def popleft(self):
+        if not self._head:
+            if self._segments:
+                path = self._segments.popleft()
+                with open(path, 'rb') as f:
+                    self._head = deque(pickle.load(f))
+                os.remove(path)
+            elif self._tail:
+                self._head = deque(self._tail)
+                self._tail = []
+            else:
+                raise IndexError("pop from an empty DiskQueue")
+        self._size -= 1
+        return self._head.popleft()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self):
+        """Items in pop order, without removing them (spilled segments are read back)."""
+        yield from self._head
+        for path in self._segments:
+            with open(path, 'rb') as f:
+                yield from pickle.load(f)
+        yield from self._tail
+
+    def close(self) -> None:
+        for path in self._segments:
+            if os.path.exists(path):
+                os.remove(path)
+        self._segments.clear()
+        if not os.listdir(self.directory):
+            os.rmdir(self.directory)
+
+
+def disk_bfs_reachable(pn: PetriNet, directory: Optional[str] = None,
+                       resident_bytes: int = DEFAULT_RESIDENT_BYTES,
+                       one_safe: Optional[bool] = None, max_tokens: int = 255, observer=None,
+                       budget=None, checkpoint=None, resume=None) -> MMapMarkingSet:
+    """
+    BFS reachability whose visited set and queue live on disk.
+
+    Args:
+        pn:             PetriNet
+        directory:      where the table file and queue segments go (default: temp dir).
+        resident_bytes: memory budget, split between the mmap table window and
+                        the queue buffers.
+        one_safe:       store one bit per place. None (default) tries it when
+                        arc weights and M0 are 0/1 and restarts with one
+                        record per place if a place gets a second token (the
+                        observer then sees both runs); when resuming, the
+                        checkpoint's engine decides.
+        max_tokens:     largest token count per place in the general mode
+                        (records use 1, 2 or 4 bytes per place accordingly).
+        observer:       optional progress callback (see Observers.py).
+        budget, checkpoint, resume: see Checkpointing.py.
+
+    Returns:
+        The MMapMarkingSet of reachable markings; call .close() to delete its file.
+    """
+    fallback = False
+    if one_safe is None:
+        if resume is not None:
+            one_safe = read_checkpoint_meta(resume)['engine'] in SAFE_ENGINES
+        else:
+            one_safe = fallback = bool((pn.pre_w <= 1).all() and (pn.post_w <= 1).all()
+                                       and (pn.M0 <= 1).all())
+    directory = directory or tempfile.mkdtemp(prefix='reach-')
+    os.makedirs(directory, exist_ok=True)
+    if one_safe:
+        try:
+            return _disk_bfs(pn, directory, resident_bytes, True, max_tokens, observer,
+                             budget, checkpoint, resume)
+        except NotSafeError:
+            if not fallback:
+                raise
+    return _disk_bfs(pn, directory, resident_bytes, False, max_tokens, observer,
+                     budget, checkpoint, resume)
+
+
+def _disk_bfs(pn, directory, resident_bytes, one_safe, max_tokens, observer,
+              budget, checkpoint, resume) -> MMapMarkingSet:
+    num_places = len(pn.place_ids)
+    visited = MMapMarkingSet(num_places, one_safe=one_safe, max_tokens=max_tokens,
+                             path=os.path.join(directory, 'visited.tbl'),
+                             resident_bytes=resident_bytes // 2)
+    # A queued item is roughly a marking plus its enabled mask
+    item_bytes = 64 + (num_places // 8 if one_safe else 8 * num_places)
+    queue = DiskQueue(os.path.join(directory, 'queue'),
+                      buffer_items=max(1024, resident_bytes // 4 // item_bytes))
+    try:
+        if one_safe:
+            return bfs_reachable_safe(pn, visited=visited, queue=queue, observer=observer,
+                                      budget=budget, checkpoint=checkpoint, resume=resume)
+        return bfs_reachable(pn, visited=visited, queue=queue, observer=observer,
+                             budget=budget, checkpoint=checkpoint, resume=resume)
+    except BaseException:
+        visited.close()
+        raise
+    finally:
+        queue.close()
@@ -1,63 +1,975 @@
+from array import array
 from collections import deque
 import numpy as np
 from PetriNetReading import PetriNet
-from typing import Set, Tuple
+from Observers import ExplicitProgress
+from Checkpointing import ExplorationControl, StopExploration, load_checkpoint
+from typing import Callable, Iterator, List, Optional, Set, Tuple
 
-def bfs_reachable(pn: PetriNet) -> Set[Tuple[int, ...]]:
-    I = pn.I
-    O = pn.O
-    C = O - I              
-    
-    M0 = pn.M0.flatten().astype(int)
-    initial = tuple(M0.tolist())
+def _sparse_transitions(pn: PetriNet) -> List[Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]]:
+    """
+    Per transition: (pre pairs [(p, weight)], delta pairs [(p, post - pre)]),
+    read from the CSR pre/post-sets so that each check only touches its arcs.
+    """
+    transitions = []
+    for t in range(len(pn.trans_ids)):
+        pre_idx, pre_w = pn.preset(t)
+        post_idx, post_w = pn.postset(t)
+        delta = {}
+        for p, w in zip(pre_idx.tolist(), pre_w.tolist()):
+            delta[p] = delta.get(p, 0) - w
+        for p, w in zip(post_idx.tolist(), post_w.tolist()):
+            delta[p] = delta.get(p, 0) + w
+        pre = list(zip(pre_idx.tolist(), pre_w.tolist()))
+        transitions.append((pre, [(p, d) for p, d in delta.items() if d != 0]))
+    return transitions
 
-    reachable= set()
-    queue = deque([initial])
-    reachable.add(initial)
 
-    while queue:
-        current_tuple = queue.popleft()
-        current = np.array(current_tuple, dtype=int) 
-        enabled = np.all(current >= I, axis=1)        # (T,)
+def _fire(current: Tuple[int, ...], delta: List[Tuple[int, int]]) -> Tuple[int, ...]:
+    new_marking = list(current)
+    for p, d in delta:
+        new_marking[p] += d
+    return tuple(new_marking)
+
+
+class SuccessorGenerator:
+    """
+    Successor generator that carries the enabled set forward with each marking.
+
+    The enabled set is an int bitmask over transitions. Firing t only changes
+    the places in its pre/post-sets, so afterwards only the transitions that
+    consume from one of those places (affected[t]) are re-checked; all other
+    enabledness bits are copied from the parent. Per state this costs
+    O(local degree) instead of O(T * P).
+    """
+
+    def __init__(self, pn: PetriNet):
+        self.transitions = _sparse_transitions(pn)
+
+        # t -> transitions whose pre-set contains a place changed by t
+        self.affected: List[List[int]] = []
+        self.affected_mask: List[int] = []
+        for _, delta in self.transitions:
+            touched = set()
+            for p, _ in delta:
+                touched.update(pn.consumers(p).tolist())
+            self.affected.append(sorted(touched))
+            self.affected_mask.append(sum(1 << u for u in touched))
+
+        M0 = pn.M0.flatten().astype(int)
+        self.initial_marking = tuple(M0.tolist())
+
+    def is_enabled(self, marking: Tuple[int, ...], t: int) -> bool:
+        return all(marking[p] >= w for p, w in self.transitions[t][0])
+
+    def enabled(self, marking: Tuple[int, ...]) -> int:
+        """Full enabledness check (used for the initial marking only)."""
+        mask = 0
+        for t in range(len(self.transitions)):
+            if self.is_enabled(marking, t):
+                mask |= 1 << t
+        return mask
+
+    def initial(self) -> Tuple[Tuple[int, ...], int]:
+        return self.initial_marking, self.enabled(self.initial_marking)
+
+    def successors(self, marking: Tuple[int, ...], enabled: int,
+                   candidates: Optional[int] = None) -> Iterator[Tuple[int, Tuple[int, ...], int]]:
+        """
+        Yield (t, new_marking, new_enabled) for every transition enabled in
+        `marking`, or only for those in the `candidates` bitmask if given.
+        """
+        transitions = self.transitions
+        affected = self.affected
+        affected_mask = self.affected_mask
+
+        remaining = enabled if candidates is None else enabled & candidates
+        while remaining:
+            low = remaining & -remaining
+            remaining ^= low
+            t = low.bit_length() - 1
+
+            new_marking = _fire(marking, transitions[t][1])
+            new_enabled = enabled & ~affected_mask[t]
+            for u in affected[t]:
+                for p, w in transitions[u][0]:
+                    if new_marking[p] < w:
+                        break
+                else:
+                    new_enabled |= 1 << u
+            yield t, new_marking, new_enabled
+
+
+# ---------------------------------------------------------
+# STREAMING API
+# ---------------------------------------------------------
+# _explore is the single exploration loop: it yields every edge as soon as it
+# is generated, together with whether its target was new. The public
+# generators filter that stream, and bfs_reachable / dfs_reachable just drain
+# it, so only the visited index has to be held in memory.
+
+Marking = Tuple[int, ...]
 
-        for t_idx in np.where(enabled)[0]:
-            # C[t_idx, :] là vector (P,)
-            new_marking = current + C[t_idx, :]
-            new_tuple = tuple(new_marking.tolist())
 
-            if new_tuple not in reachable:
-                reachable.add(new_tuple)
-                queue.append(new_tuple)
+def _explore(pn: PetriNet, depth_first: bool = False, visited=None,
+             queue=None, observer=None, budget=None, checkpoint=None,
+             resume=None) -> Iterator[Tuple[Optional[Marking], Optional[int], Marking, bool]]:
+    """
+    Yield (src, t, dst, is_new) for every edge, in BFS or DFS order. The
+    initial marking comes first as (None, None, M0, True). `observer`
+    receives explicit.progress / explicit.done events (see Observers.py);
+    budget, checkpoint and resume are described in Checkpointing.py. A resumed
+    run does not yield the markings restored from the checkpoint again.
+    """
+    gen = SuccessorGenerator(pn)
+    engine = 'dfs' if depth_first else 'bfs'
 
+    reachable = set() if visited is None else visited
+    todo = deque() if queue is None else queue
+    elapsed_before = 0.0
+    if resume is None:
+        initial, initial_enabled = gen.initial()
+        todo.append((initial, initial_enabled))
+        reachable.add(initial)
+        yield None, None, initial, True
+    else:
+        meta, markings, frontier = load_checkpoint(resume, pn, engine)
+        for m in markings:
+            reachable.add(m)
+        for item in frontier:
+            todo.append(item)
+        elapsed_before = meta['elapsed_s']
+
+    pop = todo.pop if depth_first else todo.popleft
+    progress = None
+    if observer is not None:
+        progress = ExplicitProgress(observer, engine, reachable, todo, len(pn.place_ids))
+        pop = progress.wrap(pop)
+    control = None
+    if budget is not None or checkpoint is not None:
+        control = ExplorationControl(pn, engine, reachable, todo, budget, checkpoint, elapsed_before)
+        pop = control.wrap(pop)
+    try:
+        while todo:
+            current, enabled = pop()
+
+            for t, new_tuple, new_enabled in gen.successors(current, enabled):
+                is_new = new_tuple not in reachable
+                if is_new:
+                    reachable.add(new_tuple)
+                    todo.append((new_tuple, new_enabled))
+                yield current, t, new_tuple, is_new
+        if control is not None:
+            control.finish()
+    except StopExploration:
+        pass
+    finally:
+        if progress is not None:
+            progress.done()
+
+
+def _check_order(order: str) -> bool:
+    if order not in ('bfs', 'dfs'):
+        raise ValueError(f"order must be 'bfs' or 'dfs', got {order!r}")
+    return order == 'dfs'
+
+
+def iter_reachable(pn: PetriNet, order: str = 'bfs',
+                   predicate: Optional[Callable[[Marking], bool]] = None,
+                   limit: Optional[int] = None, visited=None,
+                   queue=None, observer=None, budget=None, checkpoint=None,
+                   resume=None) -> Iterator[Marking]:
+    """
+    Yield every reachable marking once, as soon as it is discovered.
+
+    Args:
+        pn:        PetriNet
+        order:     'bfs' or 'dfs'.
+        predicate: only markings with predicate(m) == True are yielded
+                   (exploration still goes through the others).
+        limit:     stop after this many markings have been yielded.
+        visited, queue: optional stores, as for bfs_reachable.
+        observer:  optional progress callback (see Observers.py).
+        budget, checkpoint, resume: see Checkpointing.py.
+
+    Breaking out of the loop also stops the exploration.
+    """
+    if limit is not None and limit <= 0:
+        return
+    depth_first = _check_order(order)
+    count = 0
+    for _, _, dst, is_new in _explore(pn, depth_first, visited, queue, observer,
+                                      budget, checkpoint, resume):
+        if is_new and (predicate is None or predicate(dst)):
+            yield dst
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+def iter_edges(pn: PetriNet, order: str = 'bfs',
+               predicate: Optional[Callable[[Marking, int, Marking], bool]] = None,
+               limit: Optional[int] = None, visited=None,
+               queue=None, observer=None) -> Iterator[Tuple[Marking, int, Marking]]:
+    """
+    Yield every edge (src, transition index, dst) of the reachability graph
+    when it is generated. predicate(src, t, dst) filters edges and limit caps
+    how many are yielded, as in iter_reachable.
+    """
+    if limit is not None and limit <= 0:
+        return
+    depth_first = _check_order(order)
+    count = 0
+    for src, t, dst, _ in _explore(pn, depth_first, visited, queue, observer):
+        if src is None:
+            continue
+        if predicate is None or predicate(src, t, dst):
+            yield src, t, dst
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+
+def bfs_reachable(pn: PetriNet, visited=None, queue=None, observer=None,
+                  budget=None, checkpoint=None, resume=None) -> Set[Tuple[int, ...]]:
+    """
+    BFS reachability. `visited` (set-like: add / in) and `queue` (append /
+    popleft) default to an in-memory set and deque; pass the stores from
+    DiskStore to explore state spaces larger than RAM. `observer` gets
+    progress events (Observers.py). With a `budget` the run may stop early
+    and return a partial set (budget.complete is then False); `checkpoint`
+    and `resume` save and continue runs (Checkpointing.py). Returns `visited`.
+    """
+    reachable = set() if visited is None else visited
+    for _ in iter_reachable(pn, 'bfs', visited=reachable, queue=queue, observer=observer,
+                            budget=budget, checkpoint=checkpoint, resume=resume):
+        pass
     return reachable
 
-def dfs_reachable(pn: PetriNet) -> Set[Tuple[int, ...]]:
-    I = pn.I
-    O = pn.O
-    C = O - I              # shape (T, P)
+def dfs_reachable(pn: PetriNet, visited=None, observer=None, budget=None,
+                  checkpoint=None, resume=None) -> Set[Tuple[int, ...]]:
+    reachable: Set[Tuple[int, ...]] = set() if visited is None else visited
+    for _ in iter_reachable(pn, 'dfs', visited=reachable, observer=observer,
+                            budget=budget, checkpoint=checkpoint, resume=resume):
+        pass
+    return reachable
+
+
+# ---------------------------------------------------------
+# PARTIAL-ORDER REDUCTION (deadlock-preserving stubborn sets)
+# ---------------------------------------------------------
+# In every marking only the enabled transitions of a stubborn set are fired.
+# Closure rules (Valmari, for P/T nets):
+#   - enabled t in S  -> every transition sharing an input place with t is in S
+#   - disabled t in S -> for one insufficiently marked input place p of t
+#                        (the scapegoat), every producer of p is in S
+# Such sets preserve all reachable deadlocks, and on highly concurrent nets
+# they avoid exploring every interleaving of independent transitions.
+
+class StubbornSets:
+    """Stubborn set computation over the transition bitmasks of a net."""
+
+    def __init__(self, pn: PetriNet, gen: SuccessorGenerator):
+        self.gen = gen
+        T = len(pn.trans_ids)
+        # conflicts[t]: transitions sharing an input place with t
+        self.conflicts: List[int] = []
+        for t in range(T):
+            mask = 1 << t
+            for p in pn.preset(t)[0].tolist():
+                for u in pn.consumers(p).tolist():
+                    mask |= 1 << u
+            self.conflicts.append(mask)
+        self.producers: List[int] = [
+            sum(1 << u for u in pn.producers(p).tolist()) for p in range(len(pn.place_ids))
+        ]
+
+    def closure(self, marking: Marking, enabled: int, seed: int) -> int:
+        stubborn = 1 << seed
+        work = [seed]
+        while work:
+            t = work.pop()
+            if (enabled >> t) & 1:
+                add = self.conflicts[t]
+            else:
+                # Scapegoat: first input place that lacks tokens
+                for p, w in self.gen.transitions[t][0]:
+                    if marking[p] < w:
+                        add = self.producers[p]
+                        break
+            new = add & ~stubborn
+            stubborn |= new
+            while new:
+                low = new & -new
+                new ^= low
+                work.append(low.bit_length() - 1)
+        return stubborn
+
+    def __call__(self, marking: Marking, enabled: int) -> int:
+        """Stubborn set with the fewest enabled transitions over all enabled seeds."""
+        best = enabled
+        best_size = bin(enabled).count('1')
+        remaining = enabled
+        while remaining and best_size > 1:
+            low = remaining & -remaining
+            remaining ^= low
+            stubborn = self.closure(marking, enabled, low.bit_length() - 1)
+            size = bin(stubborn & enabled).count('1')
+            if size < best_size:
+                best, best_size = stubborn, size
+        return best
+
+
+def _trace(parents, marking: Marking, trans_ids: List[str]) -> List[str]:
+    trace = []
+    while True:
+        parent = parents[marking]
+        if parent is None:
+            break
+        marking, t = parent
+        trace.append(trans_ids[t])
+    trace.reverse()
+    return trace
+
+
+def por_deadlock_search(pn: PetriNet, stop_at_first: bool = True,
+                        count_full: bool = False):
+    """
+    Explicit deadlock search on the stubborn-set reduced state space (BFS).
+
+    Args:
+        pn:            PetriNet
+        stop_at_first: return as soon as one deadlock is reached; otherwise the
+                       whole reduced space is explored and all deadlocks listed.
+        count_full:    also run the full bfs_reachable to report how many
+                       states the reduction pruned.
+
+    Returns:
+        (deadlock, trace, stats), where deadlock is a marking tuple or None,
+        trace is the list of transition IDs firing M0 -> deadlock (shortest in
+        the reduced graph), and stats is a dict with 'states' (explored with
+        reduction), 'deadlocks' (all found), 'full_states' and 'pruned' (only
+        when count_full is set, else None).
+    """
+    gen = SuccessorGenerator(pn)
+    stubborn = StubbornSets(pn, gen)
+    initial, initial_enabled = gen.initial()
+
+    parents = {initial: None}
+    queue = deque([(initial, initial_enabled)])
+    deadlocks: List[Marking] = []
+
+    while queue:
+        current, enabled = queue.popleft()
+        if not enabled:
+            deadlocks.append(current)
+            if stop_at_first:
+                break
+            continue
+
+        for t, new_tuple, new_enabled in gen.successors(current, enabled, stubborn(current, enabled)):
+            if new_tuple not in parents:
+                parents[new_tuple] = (current, t)
+                queue.append((new_tuple, new_enabled))
+
+    stats = {'states': len(parents), 'deadlocks': deadlocks, 'full_states': None, 'pruned': None}
+    if count_full:
+        stats['full_states'] = len(bfs_reachable(pn))
+        stats['pruned'] = stats['full_states'] - stats['states']
+
+    if not deadlocks:
+        return None, None, stats
+    return deadlocks[0], _trace(parents, deadlocks[0], pn.trans_ids), stats
+
+# ---------------------------------------------------------
+# 1-SAFE MODE: markings packed as bitsets
+# ---------------------------------------------------------
+# For 1-safe nets a marking fits in one Python int (bit p = token in place p).
+# Enabledness becomes a mask test and firing a couple of bitwise operations,
+# so no numpy array has to be rebuilt for every popped state.
+
+class NotSafeError(ValueError):
+    """A bitset engine fired a transition that puts a second token in a place."""
+
+
+def encode_marking(marking) -> int:
+    """Pack a 0/1 marking (tuple, list or np.ndarray) into an int bitset."""
+    code = 0
+    for p, tokens in enumerate(marking):
+        if tokens:
+            code |= 1 << p
+    return code
+
+
+def decode_marking(code: int, num_places: int) -> Tuple[int, ...]:
+    """Unpack an int bitset into a 0/1 marking tuple of length num_places."""
+    return tuple((code >> p) & 1 for p in range(num_places))
+
+
+def safe_masks(pn: PetriNet) -> Tuple[List[int], List[int]]:
+    """
+    Build the pre/post bitmasks of every transition of a 1-safe net.
+
+    Raises ValueError if an arc weight or the initial marking exceeds 1,
+    because such nets cannot be represented with one bit per place.
+    """
+    if np.any(pn.pre_w > 1) or np.any(pn.post_w > 1) or np.any(pn.M0 > 1):
+        raise ValueError("1-safe mode requires arc weights and M0 in {0, 1}.")
+
+    pre = [_mask(pn.preset(t)[0]) for t in range(len(pn.trans_ids))]
+    post = [_mask(pn.postset(t)[0]) for t in range(len(pn.trans_ids))]
+    return pre, post
+
+
+def _mask(places: np.ndarray) -> int:
+    code = 0
+    for p in places.tolist():
+        code |= 1 << p
+    return code
+
+
+class PackedMarkingSet:
+    """
+    Compact hash set of 1-safe markings.
+
+    Every marking is stored once as a fixed-width little-endian byte record in a
+    single bytearray; an open-addressing slot table (array of int64 record
+    indices, -1 = empty) gives O(1) average lookup. This costs roughly
+    ceil(P/8) + 16 bytes per marking instead of a tuple of P Python ints.
+
+    Members are int bitsets (see encode_marking). Iterating the set decodes
+    them to tuples, so it can be compared with the output of bfs_reachable.
+    """
+
+    _MAX_LOAD = 0.5
 
-    M0 = pn.M0.flatten().astype(int)
-    initial = tuple(M0.tolist())
+    def __init__(self, num_places: int, capacity: int = 1024):
+        self.num_places = num_places
+        self._width = max(1, (num_places + 7) // 8)
+        self._records = bytearray()
+        self._size = 0
+        self._alloc_slots(max(8, 1 << (capacity - 1).bit_length()))
 
-    reachable: Set[Tuple[int, ...]] = set()
-    stack = deque([initial])
-    reachable.add(initial)
+    def _alloc_slots(self, capacity: int) -> None:
+        self._bits = capacity.bit_length() - 1
+        self._slots = array('q', [-1]) * capacity
 
-    while stack:
-        current_tuple = stack.pop()
-        current = np.array(current_tuple, dtype=int)  # (P,)
+    def _home(self, code: int) -> int:
+        # Fibonacci hashing: take the top bits of a 64-bit multiplicative mix
+        h = (hash(code) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return h >> (64 - self._bits)
 
-        enabled = np.all(current >= I, axis=1)        # (T,)
+    def _lookup(self, code: int, record: bytes) -> Tuple[int, bool]:
+        """Return (slot, found) for the record of `code`."""
+        slots = self._slots
+        mask = len(slots) - 1
+        width = self._width
+        slot = self._home(code)
+        while True:
+            idx = slots[slot]
+            if idx < 0:
+                return slot, False
+            start = idx * width
+            if self._records[start:start + width] == record:
+                return slot, True
+            slot = (slot + 1) & mask
 
-        for t_idx in np.where(enabled)[0]:
-            new_marking = current + C[t_idx, :]
-            new_tuple = tuple(new_marking.tolist())
+    def _grow(self) -> None:
+        width = self._width
+        self._alloc_slots(len(self._slots) * 2)
+        slots = self._slots
+        mask = len(slots) - 1
+        for idx in range(self._size):
+            code = int.from_bytes(self._records[idx * width:(idx + 1) * width], 'little')
+            slot = self._home(code)
+            while slots[slot] >= 0:
+                slot = (slot + 1) & mask
+            slots[slot] = idx
 
-            if new_tuple not in reachable:
-                reachable.add(new_tuple)
-                stack.append(new_tuple)
+    def add(self, code: int) -> bool:
+        """Insert a bitset marking. Returns True if it was not present yet."""
+        record = code.to_bytes(self._width, 'little')
+        slot, found = self._lookup(code, record)
+        if found:
+            return False
+        self._slots[slot] = self._size
+        self._records += record
+        self._size += 1
+        if self._size > self._MAX_LOAD * len(self._slots):
+            self._grow()
+        return True
 
+    def __contains__(self, marking) -> bool:
+        code = marking if isinstance(marking, int) else encode_marking(marking)
+        if code < 0 or code.bit_length() > self._width * 8:
+            return False
+        return self._lookup(code, code.to_bytes(self._width, 'little'))[1]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def codes(self) -> Iterator[int]:
+        """Yield the stored markings as int bitsets (insertion order)."""
+        width = self._width
+        records = self._records
+        for idx in range(self._size):
+            yield int.from_bytes(records[idx * width:(idx + 1) * width], 'little')
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        for code in self.codes():
+            yield decode_marking(code, self.num_places)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the record buffer and the slot table."""
+        return len(self._records) + self._slots.itemsize * len(self._slots)
+
+
+def _safe_reachable(pn: PetriNet, depth_first: bool, visited=None, queue=None,
+                    observer=None, budget=None, checkpoint=None, resume=None) -> PackedMarkingSet:
+    pre, post = safe_masks(pn)
+    transitions = list(zip(pre, post))
+    engine = 'dfs_safe' if depth_first else 'bfs_safe'
+
+    reachable = PackedMarkingSet(len(pn.place_ids)) if visited is None else visited
+    todo = deque() if queue is None else queue
+    elapsed_before = 0.0
+    if resume is None:
+        initial = encode_marking(pn.M0.flatten())
+        reachable.add(initial)
+        todo.append(initial)
+    else:
+        meta, codes, frontier = load_checkpoint(resume, pn, engine)
+        for code in codes:
+            reachable.add(code)
+        for code in frontier:
+            todo.append(code)
+        elapsed_before = meta['elapsed_s']
+    pop = todo.pop if depth_first else todo.popleft
+    progress = None
+    if observer is not None:
+        progress = ExplicitProgress(observer, engine, reachable, todo, len(pn.place_ids))
+        pop = progress.wrap(pop)
+    control = None
+    if budget is not None or checkpoint is not None:
+        control = ExplorationControl(pn, engine, reachable, todo, budget, checkpoint, elapsed_before)
+        pop = control.wrap(pop)
+
+    try:
+        while todo:
+            m = pop()
+            for pre_t, post_t in transitions:
+                if (m & pre_t) == pre_t:
+                    kept = m & ~pre_t
+                    if kept & post_t:
+                        raise NotSafeError("Net is not 1-safe: a firing puts a second token in a place.")
+                    new_m = kept | post_t
+                    if reachable.add(new_m):
+                        todo.append(new_m)
+        if control is not None:
+            control.finish()
+    except StopExploration:
+        pass
+
+    if progress is not None:
+        progress.done()
     return reachable
 
+
+def bfs_reachable_safe(pn: PetriNet, visited=None, queue=None, observer=None,
+                       budget=None, checkpoint=None, resume=None) -> PackedMarkingSet:
+    """
+    BFS reachability for 1-safe nets using int bitsets and a PackedMarkingSet.
+    `visited` must accept int bitsets and return True from add() for new ones.
+    budget / checkpoint / resume work as in bfs_reachable.
+    """
+    return _safe_reachable(pn, depth_first=False, visited=visited, queue=queue, observer=observer,
+                           budget=budget, checkpoint=checkpoint, resume=resume)
+
+
+def dfs_reachable_safe(pn: PetriNet, visited=None, observer=None, budget=None,
+                       checkpoint=None, resume=None) -> PackedMarkingSet:
+    """DFS reachability for 1-safe nets using int bitsets and a PackedMarkingSet."""
+    return _safe_reachable(pn, depth_first=True, visited=visited, observer=observer,
+                           budget=budget, checkpoint=checkpoint, resume=resume)
+
+
+# ---------------------------------------------------------
+# ON-THE-FLY DEADLOCK DETECTION
+# ---------------------------------------------------------
+# The BFS/DFS loop checks every marking for enabled transitions when it is
+# discovered, so the search can end at the first deadlock instead of after
+# the whole reachable set. Witness traces come from a parent-pointer store:
+# states are numbered in discovery order and state i keeps only (index of its
+# parent, transition fired), 12 bytes instead of a parent tuple.
+
+class ParentPointers:
+    """Discovery-order parent index + transition id per state (root: -1, -1)."""
+
+    def __init__(self):
+        self.parent = array('q')
+        self.via = array('i')
+
+    def add(self, parent: int, t: int) -> int:
+        """Register a new state reached from `parent` by `t`. Returns its index."""
+        self.parent.append(parent)
+        self.via.append(t)
+        return len(self.parent) - 1
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def path(self, idx: int) -> List[int]:
+        """Transition indices firing the root into state idx."""
+        trace = []
+        while self.parent[idx] >= 0:
+            trace.append(self.via[idx])
+            idx = self.parent[idx]
+        trace.reverse()
+        return trace
+
+    @property
+    def nbytes(self) -> int:
+        return self.parent.itemsize * len(self.parent) + self.via.itemsize * len(self.via)
+
+
+def explicit_deadlock_search(pn: PetriNet, order: str = 'bfs', stop_at_first: bool = True,
+                             one_safe: bool = False, observer=None, budget=None):
+    """
+    Explicit deadlock search that stops at the first dead marking.
+
+    Args:
+        pn:            PetriNet
+        order:         'bfs' (witness traces are shortest firing sequences)
+                       or 'dfs' (often reaches deep deadlocks sooner, traces
+                       are the DFS tree paths).
+        stop_at_first: return at the first deadlock; otherwise the whole
+                       reachable set is explored and every deadlock listed.
+        one_safe:      use the int-bitset engine. Only for nets known to be
+                       1-safe: unit arc weights are not enough, and the
+                       bitset engine raises ValueError on a second token.
+        observer:      optional progress callback (see Observers.py).
+        budget:        optional Budget (Checkpointing.py); a stopped search
+                       that found nothing is inconclusive (stats['complete']).
+
+    Returns:
+        (deadlock, trace, stats) as in por_deadlock_search: deadlock is the
+        first marking found (tuple) or None, trace its list of transition
+        IDs from M0. stats has 'states' (discovered), 'expanded', 'deadlocks'
+        (all found), 'traces' (one per deadlock), 'complete' (True when the
+        search ended because the state space was exhausted or, with
+        stop_at_first, because a deadlock was found) and 'parent_bytes'.
+    """
+    depth_first = _check_order(order)
+    engine = ('dfs' if depth_first else 'bfs') + ('_safe' if one_safe else '') + '_deadlock'
+
+    parents = ParentPointers()
+    found: List[Tuple[Marking, int]] = []
+    todo = deque()
+    pop = todo.pop if depth_first else todo.popleft
+
+    if one_safe:
+        pre, post = safe_masks(pn)
+        transitions = list(zip(pre, post))
+        reachable = PackedMarkingSet(len(pn.place_ids))
+
+        def is_dead(m: int) -> bool:
+            for pre_t in pre:
+                if (m & pre_t) == pre_t:
+                    return False
+            return True
+
+        initial = encode_marking(pn.M0.flatten())
+        reachable.add(initial)
+        root = parents.add(-1, -1)
+        if is_dead(initial):
+            found.append((initial, root))
+        else:
+            todo.append((initial, root))
+    else:
+        gen = SuccessorGenerator(pn)
+        reachable = set()
+        initial, initial_enabled = gen.initial()
+        reachable.add(initial)
+        root = parents.add(-1, -1)
+        if not initial_enabled:
+            found.append((initial, root))
+        else:
+            todo.append((initial, initial_enabled, root))
+
+    progress = None
+    if observer is not None:
+        progress = ExplicitProgress(observer, engine, reachable, todo, len(pn.place_ids))
+        pop = progress.wrap(pop)
+    control = None
+    if budget is not None:
+        control = ExplorationControl(pn, engine, reachable, todo, budget)
+        pop = control.wrap(pop)
+
+    complete = True
+    try:
+        while todo and not (stop_at_first and found):
+            if one_safe:
+                m, idx = pop()
+                for t, (pre_t, post_t) in enumerate(transitions):
+                    if (m & pre_t) == pre_t:
+                        kept = m & ~pre_t
+                        if kept & post_t:
+                            raise NotSafeError("Net is not 1-safe: a firing puts a second token in a place.")
+                        new_m = kept | post_t
+                        if reachable.add(new_m):
+                            new_idx = parents.add(idx, t)
+                            if is_dead(new_m):
+                                found.append((new_m, new_idx))
+                                if stop_at_first:
+                                    break
+                            else:
+                                todo.append((new_m, new_idx))
+            else:
+                current, enabled, idx = pop()
+                for t, new_tuple, new_enabled in gen.successors(current, enabled):
+                    if new_tuple not in reachable:
+                        reachable.add(new_tuple)
+                        new_idx = parents.add(idx, t)
+                        if not new_enabled:
+                            found.append((new_tuple, new_idx))
+                            if stop_at_first:
+                                break
+                        else:
+                            todo.append((new_tuple, new_enabled, new_idx))
+        if control is not None:
+            control.finish()
+    except StopExploration:
+        complete = bool(stop_at_first and found)
+    if progress is not None:
+        progress.done()
+
+    deadlocks = [decode_marking(m, len(pn.place_ids)) if one_safe else m for m, _ in found]
+    traces = [[pn.trans_ids[t] for t in parents.path(idx)] for _, idx in found]
+    stats = {
+        'states': len(reachable),
+        'expanded': len(reachable) - len(todo) - len(found),
+        'deadlocks': deadlocks,
+        'traces': traces,
+        'complete': complete,
+        'parent_bytes': parents.nbytes,
+    }
+    if not deadlocks:
+        return None, None, stats
+    return deadlocks[0], traces[0], stats
+
+
+# ---------------------------------------------------------
+# FRONTIER-BATCHED (VECTORIZED) BFS
+# ---------------------------------------------------------
+# Level-synchronous BFS: the whole frontier is a 2-D array (N x P). Enabledness
+# of all (state, transition) pairs, successor generation and duplicate
+# elimination are done with numpy operations on whole batches instead of one
+# Python iteration per marking.
+
+def _delta_csr(pn: PetriNet) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR (ptr, places, change) of the net effect post - pre of every transition."""
+    ptr = [0]
+    places: List[int] = []
+    change: List[int] = []
+    for _, delta in _sparse_transitions(pn):
+        for p, d in delta:
+            places.append(p)
+            change.append(d)
+        ptr.append(len(places))
+    return (np.array(ptr, dtype=np.int64),
+            np.array(places, dtype=np.int64),
+            np.array(change, dtype=np.int64))
+
+
+def _enabled_matrix(frontier: np.ndarray, pn: PetriNet, starts: np.ndarray,
+                    nonempty: np.ndarray) -> np.ndarray:
+    """(N x T) bool matrix: enabled[n, t] iff frontier[n] enables t."""
+    enabled = np.ones((frontier.shape[0], len(pn.trans_ids)), dtype=bool)
+    if len(pn.pre_idx):
+        covered = frontier[:, pn.pre_idx] >= pn.pre_w          # (N, nnz)
+        enabled[:, nonempty] = np.logical_and.reduceat(covered, starts, axis=1)
+    return enabled
+
+
+def _expand(frontier: np.ndarray, enabled: np.ndarray,
+            delta: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+    """All successors of the frontier, one row per enabled (state, transition) pair."""
+    d_ptr, d_places, d_change = delta
+    rows, ts = np.nonzero(enabled)
+    succ = frontier[rows]
+
+    counts = d_ptr[ts + 1] - d_ptr[ts]
+    total = int(counts.sum())
+    if total:
+        succ_rows = np.repeat(np.arange(len(ts)), counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        arcs = np.repeat(d_ptr[ts], counts) + (np.arange(total) - first)
+        # (row, place) pairs are unique because deltas are merged per place
+        succ[succ_rows, d_places[arcs]] += d_change[arcs]
+    return succ
+
+
+def _row_keys(rows: np.ndarray, one_safe: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack every row into a fixed-width key (bits for 1-safe nets, raw int32
+    bytes otherwise) and a vectorized 64-bit hash of it.
+
+    Returns (hashes, keys). Keys of up to 8 bytes are uint64 scalars and are
+    their own (exact) hash; wider keys are void records hashed word by word.
+    """
+    if one_safe:
+        packed = np.packbits(rows.astype(bool), axis=1)
+    else:
+        packed = np.ascontiguousarray(rows, dtype=np.int32).view(np.uint8)
+    width = packed.shape[1]
+    padded = np.zeros((rows.shape[0], -(-width // 8) * 8), dtype=np.uint8)
+    padded[:, :width] = packed
+    words = padded.view(np.uint64)
+    if words.shape[1] == 1:
+        keys = words.ravel()
+        return keys, keys
+
+    hashes = np.full(rows.shape[0], 0xCBF29CE484222325, dtype=np.uint64)
+    for col in range(words.shape[1]):
+        hashes = (hashes ^ words[:, col]) * np.uint64(0x100000001B3)
+        hashes ^= hashes >> np.uint64(29)
+    return hashes, np.ascontiguousarray(packed).view(np.dtype((np.void, width))).ravel()
+
+
+class _SortedKeyRuns:
+    """
+    Visited store for the batched BFS: a few sorted runs of (hash, key) pairs,
+    merged LSM-style so that a level costs O(new log V) instead of re-sorting
+    everything seen so far. Membership is a vectorized searchsorted on the
+    hashes, confirmed on the full keys.
+    """
+
+    def __init__(self):
+        self.runs: List[Tuple[np.ndarray, np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return sum(len(h) for h, _ in self.runs)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(h.nbytes + k.nbytes for h, k in self.runs)
+
+    def contains(self, hashes: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(hashes), dtype=bool)
+        for run_h, run_k in self.runs:
+            left = np.searchsorted(run_h, hashes, side='left')
+            right = np.searchsorted(run_h, hashes, side='right')
+            hit = right > left
+            single = hit & (right - left == 1)
+            idx = np.flatnonzero(single)
+            found[idx] |= run_k[left[idx]] == keys[idx]
+            # Hash collisions inside the run: compare every candidate
+            for i in np.flatnonzero(hit & ~single).tolist():
+                found[i] |= bool(np.any(run_k[left[i]:right[i]] == keys[i]))
+        return found
+
+    def add(self, hashes: np.ndarray, keys: np.ndarray) -> None:
+        order = np.argsort(hashes, kind='stable')
+        run = (hashes[order], keys[order])
+        while self.runs and len(self.runs[-1][0]) <= 2 * len(run[0]):
+            prev_h, prev_k = self.runs.pop()
+            h = np.concatenate([prev_h, run[0]])
+            k = np.concatenate([prev_k, run[1]])
+            order = np.argsort(h, kind='stable')
+            run = (h[order], k[order])
+        self.runs.append(run)
+
+
+def _unique_rows(hashes: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Indices of the first occurrence of every distinct key."""
+    order = np.argsort(hashes, kind='stable')
+    h = hashes[order]
+    k = keys[order]
+    same_hash = h[1:] == h[:-1]
+    if np.any(same_hash & (k[1:] != k[:-1])):
+        # 64-bit hash collision inside the level: fall back to exact keys
+        return np.unique(keys, return_index=True)[1]
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = ~same_hash
+    return order[keep]
+
+
+def bfs_reachable_batched(pn: PetriNet, batch_size: int = 65536, observer=None,
+                          one_safe: Optional[bool] = None) -> np.ndarray:
+    """
+    Frontier-batched BFS.
+
+    Args:
+        pn:         PetriNet
+        batch_size: number of frontier states expanded per numpy batch
+                    (bounds the N x T enabled matrix and N x nnz gather).
+        observer:   optional callback, one explicit.progress event per level.
+        one_safe:   key markings by one bit per place. None (default) starts
+                    with bit keys when arc weights and M0 are 0/1 and switches
+                    to int keys as soon as a place holds 2 tokens; True
+                    asserts safety and raises ValueError if it does not hold.
+
+    Returns:
+        (num_reachable x P) int array with one reachable marking per row,
+        in BFS discovery order. {tuple(r) for r in result.tolist()} equals
+        bfs_reachable(pn).
+    """
+    M0 = pn.M0.flatten().astype(np.int64)
+    asserted = one_safe is True
+    if one_safe is None:
+        # unit weights do not make a net 1-safe; checked again on every level
+        one_safe = bool(np.all(pn.pre_w <= 1) and np.all(pn.post_w <= 1) and np.all(M0 <= 1))
+
+    nonempty = np.flatnonzero(np.diff(pn.pre_ptr) > 0)
+    starts = pn.pre_ptr[nonempty]
+    delta = _delta_csr(pn)
+
+    frontier = M0[None, :]
+    levels = [frontier]
+    visited = _SortedKeyRuns()
+    visited.add(*_row_keys(frontier, one_safe))
+    progress = None
+    if observer is not None:
+        progress = ExplicitProgress(observer, 'bfs_batched', visited, None, len(pn.place_ids))
+
+    while len(frontier):
+        if progress is not None:
+            progress.expanded += len(frontier)
+            progress.queue = frontier
+            progress.emit()
+        batches = []
+        for lo in range(0, len(frontier), batch_size):
+            chunk = frontier[lo:lo + batch_size]
+            batches.append(_expand(chunk, _enabled_matrix(chunk, pn, starts, nonempty), delta))
+        succ = np.concatenate(batches)
+        if not len(succ):
+            break
+        if one_safe and succ.max() > 1:
+            if asserted:
+                raise ValueError("Net is not 1-safe: a reachable marking has 2 tokens in a place.")
+            # Bit keys would merge 1 and 2 tokens: re-key everything with int keys
+            one_safe = False
+            visited = _SortedKeyRuns()
+            visited.add(*_row_keys(np.concatenate(levels), False))
+            if progress is not None:
+                progress.visited = visited
+
+        # Dedupe inside the level, then against everything seen so far
+        hashes, keys = _row_keys(succ, one_safe)
+        first = np.sort(_unique_rows(hashes, keys))
+        hashes, keys = hashes[first], keys[first]
+        new = ~visited.contains(hashes, keys)
+
+        frontier = succ[first[new]]
+        if len(frontier):
+            levels.append(frontier)
+            visited.add(hashes[new], keys[new])
+
+    if progress is not None:
+        progress.queue = frontier
+        progress.done()
+    return np.concatenate(levels)
+
 #print(len(dfs_reachable(PetriNet.from_pnml(r"D:\py_1stbtlmhh\SimpleLoadBal-pnml\SimpleLoadBal\PT\simple_lbs-5.pnml"))))
 #print(len(bfs_reachable(PetriNet.from_pnml(r"D:\py_1stbtlmhh\SimpleLoadBal-pnml\SimpleLoadBal\PT\simple_lbs-5.pnml"))))
\ No newline at end of file
@@ -0,0 +1,192 @@
+import multiprocessing as mp
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Optional
+
+# ---------------------------------------------------------
+# MEASUREMENT MODES
+# ---------------------------------------------------------
+# tracemalloc hooks every allocation, which slows allocation-heavy code such
+# as bfs_reachable several times over, so timing under it is not honest.
+# Every measurement therefore picks exactly one mode and reports it:
+#   'time'         wall + CPU time only, nothing else running (peak_kb is None)
+#   'rss'          time + peak resident set size above the RSS before the call,
+#                  sampled by a background thread every `interval` seconds
+#   'tracemalloc'  time + peak traced Python allocations (times are inflated)
+# With isolate=True (default) each measurement runs in a fresh child process,
+# so heap state and allocator high-water marks of earlier runs do not leak in.
+
+MODES = ('time', 'rss', 'tracemalloc')
+
+_PAGE_KB = os.sysconf('SC_PAGE_SIZE') // 1024 if hasattr(os, 'sysconf') else 4
+
+
+class Measurement:
+    """One measurement; every number is only meaningful together with its mode."""
+
+    __slots__ = ('mode', 'wall_ms', 'cpu_ms', 'peak_kb', 'result', 'isolated')
+
+    def __init__(self, mode: str, wall_ms: float, cpu_ms: float, peak_kb: Optional[float],
+                 result: Any = None, isolated: bool = False):
+        self.mode = mode
+        self.wall_ms = wall_ms
+        self.cpu_ms = cpu_ms
+        self.peak_kb = peak_kb
+        self.result = result
+        self.isolated = isolated
+
+    def memory_label(self) -> str:
+        if self.peak_kb is None:
+            return f"n/a ({self.mode} mode)"
+        kind = 'peak RSS increase' if self.mode == 'rss' else 'tracemalloc peak'
+        return f"{self.peak_kb:.2f} KB [{kind}]"
+
+    def time_label(self) -> str:
+        note = ', inflated by tracing' if self.mode == 'tracemalloc' else ''
+        return f"{self.wall_ms:.2f} ms (cpu {self.cpu_ms:.2f} ms) [{self.mode}{note}]"
+
+    def to_dict(self) -> dict:
+        return {'mode': self.mode, 'wall_ms': self.wall_ms, 'cpu_ms': self.cpu_ms,
+                'peak_kb': self.peak_kb, 'isolated': self.isolated}
+
+    def __repr__(self) -> str:
+        return f"Measurement({self.time_label()}, memory={self.memory_label()})"
+
+
+def current_rss_kb(peak_fallback: bool = True) -> Optional[float]:
+    """
+    Resident set size of this process in KB (None where it cannot be read).
+    Without /proc the fallback is the process's lifetime peak RSS, which never
+    goes down; peak_fallback=False returns None instead.
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_KB
+    except (OSError, ValueError, IndexError):
+        pass
+    if not peak_fallback:
+        return None
+    try:
+        import resource
+        # ru_maxrss is the high-water mark (KB on Linux, bytes on macOS), the
+        # best available without /proc
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / 1024 if os.uname().sysname == 'Darwin' else float(rss)
+    except (ImportError, AttributeError, OSError):
+        return None
+
+
+class _RSSSampler(threading.Thread):
+    """Background thread keeping the maximum RSS seen while it runs."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss_kb()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            rss = current_rss_kb()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def stop(self) -> Optional[float]:
+        self._stop_event.set()
+        self.join()
+        rss = current_rss_kb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+        return self.peak
+
+
+def _measure_here(func: Callable, args, kwargs, mode: str, interval: float) -> Measurement:
+    peak_kb = None
+    if mode == 'time':
+        t0, c0 = time.perf_counter(), time.process_time()
+        result = func(*args, **kwargs)
+        wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+    elif mode == 'rss':
+        base = current_rss_kb()
+        sampler = _RSSSampler(interval)
+        sampler.start()
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+            peak = sampler.stop()
+        if base is not None and peak is not None:
+            peak_kb = max(peak - base, 0.0)
+    elif mode == 'tracemalloc':
+        tracemalloc.start()
+        try:
+            t0, c0 = time.perf_counter(), time.process_time()
+            result = func(*args, **kwargs)
+            wall, cpu = time.perf_counter() - t0, time.process_time() - c0
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        peak_kb = peak / 1024
+    else:
+        raise ValueError(f"Unknown measurement mode {mode!r}; expected one of {MODES}")
+    return Measurement(mode, wall * 1000, cpu * 1000, peak_kb, result)
+
+
+def _child(conn, func, args, kwargs, mode, interval, summary):
+    try:
+        m = _measure_here(func, args, kwargs, mode, interval)
+        m.result = summary(m.result) if summary is not None else None
+        conn.send(('ok', m))
+    except BaseException as e:            # report everything, the parent re-raises
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def measure(func: Callable, *args, mode: str = 'time', isolate: bool = True,
+            summary: Optional[Callable[[Any], Any]] = None, interval: float = 0.005,
+            **kwargs) -> Measurement:
+    """
+    Measure func(*args, **kwargs) in one mode.
+
+    Args:
+        mode:     one of MODES.
+        isolate:  run in a fresh child process (fork where available).
+        summary:  isolated runs only: function applied to the result in the
+                  child; its (picklable) value becomes Measurement.result.
+                  Without it the result is dropped, since e.g. BDD nodes
+                  cannot leave the child.
+        interval: RSS sampling period in seconds ('rss' mode).
+
+    Returns:
+        Measurement; .result is the return value of func (in-process) or
+        summary(result) (isolated).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown measurement mode {mode!r}; expected one of {MODES}")
+    if not isolate:
+        m = _measure_here(func, args, kwargs, mode, interval)
+        if summary is not None:
+            m.result = summary(m.result)
+        return m
+
+    ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else mp.get_context()
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child, args=(child, func, args, kwargs, mode, interval, summary))
+    proc.start()
+    child.close()
+    try:
+        status, payload = parent.recv()
+    except EOFError:
+        proc.join()
+        raise RuntimeError(f"Measured process died (exit code {proc.exitcode})")
+    finally:
+        parent.close()
+    proc.join()
+    if status == 'error':
+        raise RuntimeError(f"Measured function failed: {payload}")
+    payload.isolated = True
+    return payload
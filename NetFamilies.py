@@ -0,0 +1,181 @@
+import os
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Sequence, Tuple
+
+# ---------------------------------------------------------
+# SCALABLE 1-SAFE NET FAMILIES (PNML generators)
+# ---------------------------------------------------------
+# Every generator returns (places, transitions, arcs, M0) and write_pnml turns
+# that into a PNML file that PetriNet.from_pnml reads. All families are
+# 1-safe, so every engine (explicit, BDD, ILP) can run on them.
+#
+#   parallel   n independent chains of `length` places   (length^n states, dead once every chain ends)
+#   philo      n dining philosophers                     (deadlocks when all hold their left fork)
+#   lbs        load balancer with c clients, s servers   (same shape as simple_lbs-2, no rebalancing)
+#   ring       token-ring mutual exclusion, n stations   (~n 2^n states, live)
+#   tokens     k tokens sliding right on a line of n cells (C(n, k) states, one deadlock)
+
+Net = Tuple[List[str], List[str], List[Tuple[str, str]], Dict[str, int]]
+
+FAMILIES = ('parallel', 'philo', 'lbs', 'ring', 'tokens')
+
+
+def write_pnml(net: Net, filename: str, net_id: str = 'net') -> str:
+    places, transitions, arcs, m0 = net
+    root = ET.Element('pnml')
+    net_el = ET.SubElement(root, 'net', id=net_id,
+                           type="http://www.pnml.org/version-2009/grammar/pnmlcoremodel")
+    page = ET.SubElement(net_el, 'page', id='page0')
+    for pid in places:
+        place = ET.SubElement(page, 'place', id=pid)
+        ET.SubElement(ET.SubElement(place, 'name'), 'text').text = pid
+        if m0.get(pid):
+            ET.SubElement(ET.SubElement(place, 'initialMarking'), 'text').text = str(m0[pid])
+    for tid in transitions:
+        trans = ET.SubElement(page, 'transition', id=tid)
+        ET.SubElement(ET.SubElement(trans, 'name'), 'text').text = tid
+    for i, (src, dst) in enumerate(arcs):
+        ET.SubElement(page, 'arc', id=f"a{i}", source=src, target=dst)
+    with open(filename, 'wb') as f:
+        ET.ElementTree(root).write(f)
+    return filename
+
+
+def _transition(net: Net, tid: str, pre: Sequence[str], post: Sequence[str]) -> None:
+    _, transitions, arcs, _ = net
+    transitions.append(tid)
+    arcs.extend((p, tid) for p in pre)
+    arcs.extend((tid, p) for p in post)
+
+
+def parallel_chains(n_chains: int, length: int) -> Net:
+    """n_chains chains p0 -> p1 -> ... of `length` places, one token each."""
+    net: Net = ([], [], [], {})
+    for c in range(n_chains):
+        for i in range(length):
+            net[0].append(f"c{c}_p{i}")
+        net[3][f"c{c}_p0"] = 1
+        for i in range(length - 1):
+            _transition(net, f"c{c}_t{i}", [f"c{c}_p{i}"], [f"c{c}_p{i + 1}"])
+    return net
+
+
+def dining_philosophers(n: int) -> Net:
+    """Philosophers take the left fork, then the right one, eat and release both."""
+    net: Net = ([], [], [], {})
+    for i in range(n):
+        net[0].extend([f"think{i}", f"left{i}", f"eat{i}", f"fork{i}"])
+        net[3][f"think{i}"] = net[3][f"fork{i}"] = 1
+    for i in range(n):
+        j = (i + 1) % n
+        _transition(net, f"takeL{i}", [f"think{i}", f"fork{i}"], [f"left{i}"])
+        _transition(net, f"takeR{i}", [f"left{i}", f"fork{j}"], [f"eat{i}"])
+        _transition(net, f"release{i}", [f"eat{i}"], [f"think{i}", f"fork{i}", f"fork{j}"])
+    return net
+
+
+def load_balancer(n_clients: int, n_servers: int) -> Net:
+    """
+    Client / load balancer / server protocol with the place names of
+    simple_lbs-N. The balancer routes a request to any server whose load
+    counter (lb_load_s_0 .. lb_load_s_c) is below n_clients and decrements
+    it on the server's notification; the rebalancing step is left out.
+    """
+    net: Net = ([], [], [], {})
+    P, M0 = net[0], net[3]
+    C, S = range(1, n_clients + 1), range(1, n_servers + 1)
+    for c in C:
+        P.extend([f"P-client_idle_{c}", f"P-client_waiting_{c}", f"P-client_request_{c}", f"P-client_ack_{c}"])
+        M0[f"P-client_idle_{c}"] = 1
+    for s in S:
+        P.extend([f"P-server_idle_{s}", f"P-server_waiting_{s}", f"P-server_processed_{s}",
+                  f"P-server_notification_{s}", f"P-server_notification_ack_{s}"])
+        M0[f"P-server_idle_{s}"] = 1
+        P.extend(f"P-server_request_{c}_{s}" for c in C)
+    P.append("P-lb_idle_1")
+    M0["P-lb_idle_1"] = 1
+    P.extend(f"P-lb_routing_1_{c}" for c in C)
+    for s in S:
+        P.extend(f"P-lb_load_{s}_{l}" for l in range(n_clients + 1))
+        M0[f"P-lb_load_{s}_0"] = 1
+
+    for c in C:
+        _transition(net, f"T-client_send_{c}", [f"P-client_idle_{c}"],
+                    [f"P-client_waiting_{c}", f"P-client_request_{c}"])
+        _transition(net, f"T-client_receive_{c}", [f"P-client_waiting_{c}", f"P-client_ack_{c}"],
+                    [f"P-client_idle_{c}"])
+        _transition(net, f"T-lb_receive_client_{c}", [f"P-client_request_{c}", "P-lb_idle_1"],
+                    [f"P-lb_routing_1_{c}"])
+        for s in S:
+            _transition(net, f"T-server_process_{c}_{s}", [f"P-server_idle_{s}", f"P-server_request_{c}_{s}"],
+                        [f"P-client_ack_{c}", f"P-server_processed_{s}"])
+            for l in range(n_clients):
+                _transition(net, f"T-lb_route_{c}_to_{s}_{l}",
+                            [f"P-lb_routing_1_{c}", f"P-lb_load_{s}_{l}"],
+                            [f"P-server_request_{c}_{s}", "P-lb_idle_1", f"P-lb_load_{s}_{l + 1}"])
+    for s in S:
+        _transition(net, f"T-server_notify_{s}", [f"P-server_processed_{s}"],
+                    [f"P-server_waiting_{s}", f"P-server_notification_{s}"])
+        _transition(net, f"T-server_endloop_{s}", [f"P-server_waiting_{s}", f"P-server_notification_ack_{s}"],
+                    [f"P-server_idle_{s}"])
+        for l in range(1, n_clients + 1):
+            _transition(net, f"T-lb_receive_notification_{s}_{l}",
+                        [f"P-server_notification_{s}", "P-lb_idle_1", f"P-lb_load_{s}_{l}"],
+                        [f"P-server_notification_ack_{s}", "P-lb_idle_1", f"P-lb_load_{s}_{l - 1}"])
+    return net
+
+
+def token_ring(n: int) -> Net:
+    """
+    n stations pass one token around a ring. A station requests (idle ->
+    wait) at any time and enters its critical section only with the token.
+    """
+    net: Net = ([], [], [], {})
+    for i in range(n):
+        net[0].extend([f"idle{i}", f"wait{i}", f"crit{i}", f"token{i}"])
+        net[3][f"idle{i}"] = 1
+    net[3]["token0"] = 1
+    for i in range(n):
+        _transition(net, f"request{i}", [f"idle{i}"], [f"wait{i}"])
+        _transition(net, f"enter{i}", [f"wait{i}", f"token{i}"], [f"crit{i}"])
+        _transition(net, f"leave{i}", [f"crit{i}"], [f"idle{i}", f"token{i}"])
+        _transition(net, f"pass{i}", [f"token{i}"], [f"token{(i + 1) % n}"])
+    return net
+
+
+def token_game(n_cells: int, n_tokens: int) -> Net:
+    """
+    n_tokens tokens start in the leftmost cells of a line and move one cell
+    right into a free cell (free_i is the complement of full_i). The only
+    dead marking has all tokens packed at the right end.
+    """
+    if not 0 < n_tokens <= n_cells:
+        raise ValueError("token_game needs 0 < n_tokens <= n_cells")
+    net: Net = ([], [], [], {})
+    for i in range(n_cells):
+        net[0].extend([f"full{i}", f"free{i}"])
+        net[3][f"full{i}" if i < n_tokens else f"free{i}"] = 1
+    for i in range(n_cells - 1):
+        _transition(net, f"move{i}", [f"full{i}", f"free{i + 1}"], [f"free{i}", f"full{i + 1}"])
+    return net
+
+
+def make_net(family: str, *params: int) -> Net:
+    """Build one instance of a family by name (see FAMILIES)."""
+    builders = {
+        'parallel': parallel_chains,
+        'philo': dining_philosophers,
+        'lbs': load_balancer,
+        'ring': token_ring,
+        'tokens': token_game,
+    }
+    if family not in builders:
+        raise ValueError(f"Unknown net family {family!r}; expected one of {FAMILIES}")
+    return builders[family](*params)
+
+
+def generate(family: str, params: Sequence[int], directory: str = '.') -> str:
+    """Write an instance to <directory>/<family>-<p1>-<p2>.pnml and return the path."""
+    os.makedirs(directory, exist_ok=True)
+    name = '-'.join([family] + [str(p) for p in params])
+    return write_pnml(make_net(family, *params), os.path.join(directory, name + '.pnml'), net_id=name)
@@ -0,0 +1,219 @@
+import json
+import sys
+import time
+from typing import Callable, List, Optional, TextIO, Union
+
+# ---------------------------------------------------------
+# OBSERVER HOOKS
+# ---------------------------------------------------------
+# The reachability and deadlock functions take an optional `observer`: any
+# callable observer(event, data). With observer=None (the default) the
+# engines run exactly the loops they always ran; with one attached they emit
+#
+#   explicit.progress / explicit.done
+#       engine, states, frontier, states_per_sec, visited_bytes, elapsed_s
+#       (bfs / dfs / iter_*, *_safe, batched BFS, disk BFS)
+#   bdd.iteration
+#       iteration, reached_nodes, manager_nodes, peak_nodes,
+#       image_ms {transition id: ms spent on its image this iteration}, elapsed_s
+#   bdd.done
+#       iterations, states, reached_nodes, manager_nodes, peak_nodes, elapsed_s
+#   ilp.round / ilp.done
+#       engine, solver_calls, cuts (+ engine-specific counters), elapsed_s
+#
+# Hot explicit loops only look at the clock every CHECK_EVERY states and emit
+# at most once per observer.period seconds (PROGRESS_PERIOD by default).
+
+PROGRESS_PERIOD = 0.5
+CHECK_EVERY = 1024
+
+ObserverFn = Callable[[str, dict], None]
+
+
+class Observer:
+    """Base class for observers; override on_event. Plain functions work too."""
+
+    period = PROGRESS_PERIOD
+
+    def __call__(self, event: str, data: dict) -> None:
+        self.on_event(event, data)
+
+    def on_event(self, event: str, data: dict) -> None:
+        pass
+
+
+class Recorder(Observer):
+    """Keeps every (event, data) pair in memory."""
+
+    def __init__(self, period: float = PROGRESS_PERIOD):
+        self.period = period
+        self.events: List[tuple] = []
+
+    def on_event(self, event: str, data: dict) -> None:
+        self.events.append((event, data))
+
+    def of(self, event: str) -> List[dict]:
+        return [data for name, data in self.events if name == event]
+
+
+class Tee(Observer):
+    """Forwards every event to several observers."""
+
+    def __init__(self, *observers: ObserverFn):
+        self.observers = observers
+        periods = [getattr(o, 'period', PROGRESS_PERIOD) for o in observers]
+        self.period = min(periods) if periods else PROGRESS_PERIOD
+
+    def on_event(self, event: str, data: dict) -> None:
+        for obs in self.observers:
+            obs(event, data)
+
+
+class JSONLinesExporter(Observer):
+    """
+    Writes one JSON object per event: {"t": seconds since creation,
+    "event": name, ...data}. Accepts a path (opened for append) or a text file.
+    """
+
+    def __init__(self, target: Union[str, TextIO], period: float = PROGRESS_PERIOD):
+        self.period = period
+        self._own = isinstance(target, str)
+        self.file = open(target, 'a', encoding='utf-8') if self._own else target
+        self._t0 = time.perf_counter()
+
+    def on_event(self, event: str, data: dict) -> None:
+        record = {'t': round(time.perf_counter() - self._t0, 6), 'event': event}
+        record.update(data)
+        self.file.write(json.dumps(record, default=str) + '\n')
+        if event.endswith('.done'):
+            self.file.flush()
+
+    def close(self) -> None:
+        if self._own:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self) -> "JSONLinesExporter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _human(n: float) -> str:
+    for unit in ('', 'K', 'M', 'G'):
+        if abs(n) < 1000:
+            return f"{n:.0f}{unit}" if unit == '' else f"{n:.1f}{unit}"
+        n /= 1000
+    return f"{n:.1f}T"
+
+
+class ProgressBar(Observer):
+    """
+    One live status line on a terminal stream (stderr by default), redrawn
+    in place on every progress event and finished with a newline on *.done.
+    """
+
+    _SPIN = '|/-\\'
+
+    def __init__(self, stream: Optional[TextIO] = None, period: float = 0.2):
+        self.period = period
+        self.stream = stream or sys.stderr
+        self._tick = 0
+        self._width = 0
+
+    def _line(self, event: str, d: dict) -> str:
+        kind = event.split('.')[0]
+        if kind == 'explicit':
+            mem = d.get('visited_bytes')
+            return (f"[{d.get('engine', 'explicit')}] {_human(d['states'])} states"
+                    f" | {_human(d.get('states_per_sec', 0))} st/s"
+                    f" | frontier {_human(d.get('frontier', 0))}"
+                    + (f" | visited {mem / 2 ** 20:.1f} MB" if mem is not None else '')
+                    + f" | {d.get('elapsed_s', 0):.1f}s")
+        if kind == 'bdd':
+            it = d.get('iteration', d.get('iterations'))
+            return (f"[bdd] iteration {it} | Reached {_human(d.get('reached_nodes', 0))} nodes"
+                    f" | manager {_human(d.get('manager_nodes', 0))} nodes"
+                    + (f" | {_human(d['states'])} states" if 'states' in d else '')
+                    + f" | {d.get('elapsed_s', 0):.1f}s")
+        if kind == 'ilp':
+            return (f"[{d.get('engine', 'ilp')}] solver calls {d.get('solver_calls', 0)}"
+                    f" | cuts {d.get('cuts', 0)} | {d.get('elapsed_s', 0):.1f}s")
+        return f"[{event}]"
+
+    def on_event(self, event: str, data: dict) -> None:
+        done = event.endswith('.done')
+        spin = ' ' if done else self._SPIN[self._tick % len(self._SPIN)]
+        self._tick += 1
+        line = f"{spin} {self._line(event, data)}"
+        pad = max(self._width - len(line), 0)
+        self._width = 0 if done else len(line)
+        self.stream.write('\r' + line + ' ' * pad + ('\n' if done else ''))
+        self.stream.flush()
+
+
+# ---------------------------------------------------------
+# Helpers used by the engines
+# ---------------------------------------------------------
+
+def visited_bytes(visited, num_places: int) -> Optional[int]:
+    """Memory of a visited store; for a set of tuples an estimate of set + tuples."""
+    nbytes = getattr(visited, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    file_bytes = getattr(visited, 'file_bytes', None)          # MMapMarkingSet (property)
+    if file_bytes is not None:
+        return int(file_bytes() if callable(file_bytes) else file_bytes)
+    if isinstance(visited, (set, frozenset, dict)):
+        # tuple header + one pointer per place; small ints are shared
+        return sys.getsizeof(visited) + len(visited) * (sys.getsizeof(()) + 8 * num_places)
+    return None
+
+
+class ExplicitProgress:
+    """
+    Progress reporting for a pop-driven exploration loop. wrap(pop) returns a
+    pop that counts states and, every CHECK_EVERY calls, emits
+    'explicit.progress' if observer.period seconds have passed. The loop
+    itself is unchanged, so without an observer nothing is wrapped at all.
+    """
+
+    def __init__(self, observer: ObserverFn, engine: str, visited, queue, num_places: int):
+        self.observer = observer
+        self.engine = engine
+        self.visited = visited
+        self.queue = queue
+        self.num_places = num_places
+        self.period = getattr(observer, 'period', PROGRESS_PERIOD)
+        self.t0 = self.last = time.perf_counter()
+        self.expanded = 0
+
+    def snapshot(self) -> dict:
+        elapsed = time.perf_counter() - self.t0
+        states = len(self.visited)
+        return {
+            'engine': self.engine,
+            'states': states,
+            'expanded': self.expanded,
+            'frontier': len(self.queue) if self.queue is not None else 0,
+            'states_per_sec': states / elapsed if elapsed > 0 else 0.0,
+            'visited_bytes': visited_bytes(self.visited, self.num_places),
+            'elapsed_s': elapsed,
+        }
+
+    def emit(self, event: str = 'explicit.progress') -> None:
+        self.last = time.perf_counter()
+        self.observer(event, self.snapshot())
+
+    def wrap(self, pop):
+        def observed_pop():
+            self.expanded += 1
+            if self.expanded % CHECK_EVERY == 0 and time.perf_counter() - self.last >= self.period:
+                self.emit()
+            return pop()
+        return observed_pop
+
+    def done(self) -> None:
+        self.emit('explicit.done')
@@ -1,3 +1,4 @@
+import heapq
 from typing import List, Tuple, Optional, Union
 import numpy as np
 from dd.autoref import Function as DDNode
@@ -10,17 +11,19 @@ def _normalize_c(c: Union[List[int], np.ndarray]) -> List[int]:
     return [int(x) for x in c]
 
 
-def max_reachable_marking(
+def max_reachable_marking_bnb(
     place_ids: List[str],
-    node: DDNode,                      # dd.autoref.Function (reachable markings BDD)
+    node: DDNode,                      # reachable markings BDD (dd.autoref or ArrayBDD Function)
     c: Union[List[int], np.ndarray],
 ) -> Tuple[Optional[List[int]], Optional[int]]:
     """
-    Branch-and-bound optimization over a dd.autoref BDD.
+    Branch-and-bound optimization over a BDD (either backend in BDDBackend.py).
+    Kept for comparison; max_reachable_marking gives the same optimum in
+    O(|BDD|) regardless of how tight the bound is.
 
     Args:
         place_ids: list of place IDs (same order as in c).
-        node:      dd.autoref.Function encoding the set of reachable markings.
+        node:      Function encoding the set of reachable markings.
         c:         cost/weight vector.
 
     Returns:
@@ -150,3 +153,347 @@ def max_reachable_marking(
         return None, None
 
     return best_marking, best_value
+
+
+# ---------------------------------------------------------
+# LONGEST PATH OVER THE BDD DAG (memoized, O(|BDD|))
+# ---------------------------------------------------------
+# Every path root -> TRUE is a cube of markings. With weights w on the
+# positions (place variables sorted by level), the best marking below node u
+# is
+#     val(u) = max( val(low)  + free(u, low),
+#                   w[u] + val(high) + free(u, high) )
+# where free(u, v) adds the positive weights of the levels skipped on the
+# edge u -> v (those variables are unconstrained). One bottom-up pass over the
+# nodes gives the optimum; the argmax is read back from the stored choices.
+
+
+def _place_layout(place_ids: List[str], mgr) -> Tuple[dict, List[int]]:
+    """
+    Returns:
+        (pos_of_level, idx_at):
+            pos_of_level maps a BDD level to its position 0..n-1 among the
+            place variables (top first); idx_at[k] is the index in place_ids
+            of the variable at position k. Terminals sit at position n.
+    """
+    levels = sorted((mgr.level_of_var(p_id), i) for i, p_id in enumerate(place_ids))
+    pos_of_level = {lvl: k for k, (lvl, _) in enumerate(levels)}
+    return pos_of_level, [i for _, i in levels]
+
+
+def _children(u):
+    """Cofactors of u; dd stores complement edges, so undo the negation."""
+    lo, hi = u.low, u.high
+    if u.negated:
+        lo, hi = ~lo, ~hi
+    return lo, hi
+
+
+def _bottom_up(node: DDNode) -> List[Tuple[int, DDNode, DDNode, DDNode]]:
+    """
+    Internal nodes reachable from `node` as (key, u, low, high), children
+    before parents. Iterative, so deep BDDs do not hit the recursion limit.
+    """
+    mgr = node.bdd
+    seen = set()
+    order = []
+    stack = [(node, False)]
+    while stack:
+        u, expanded = stack.pop()
+        if u == mgr.true or u == mgr.false:
+            continue
+        key = int(u)
+        if expanded:
+            lo, hi = _children(u)
+            order.append((key, u, lo, hi))
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        lo, hi = _children(u)
+        stack.append((u, True))
+        stack.append((hi, False))
+        stack.append((lo, False))
+    return order
+
+
+def max_reachable_marking(
+    place_ids: List[str],
+    node: DDNode,                      # reachable markings BDD (dd.autoref or ArrayBDD Function)
+    c: Union[List[int], np.ndarray],
+) -> Tuple[Optional[List[int]], Optional[int]]:
+    """
+    Maximize c^T M over the markings of a BDD as a longest-path problem.
+
+    One memoized bottom-up pass over the BDD nodes, so the cost is O(|BDD| + n)
+    and does not depend on the quality of any bound. Variables skipped by an
+    edge are free and are set to 1 exactly when their weight is positive.
+    Ties prefer M_p = 1 for c_p >= 0 and M_p = 0 otherwise, like the
+    branch-and-bound version.
+
+    Args:
+        place_ids: list of place IDs (same order as in c); every one must be a
+                   variable of node.bdd.
+        node:      Function encoding the set of reachable markings.
+        c:         cost/weight vector.
+
+    Returns:
+        (best_marking, best_value) as in max_reachable_marking_bnb,
+        or (None, None) if the BDD is empty.
+    """
+    c_list = _normalize_c(c)
+    n = len(place_ids)
+    mgr = node.bdd
+    if node == mgr.false:
+        return None, None
+
+    pos_of_level, idx_at = _place_layout(place_ids, mgr)
+    w = [c_list[i] for i in idx_at]
+    # pos_prefix[k] = positive weight of positions 0..k-1
+    pos_prefix = [0] * (n + 1)
+    for k in range(n):
+        pos_prefix[k + 1] = pos_prefix[k] + max(w[k], 0)
+
+    def pos(u) -> int:
+        if u == mgr.true or u == mgr.false:
+            return n
+        return pos_of_level[u.level]
+
+    # best value below each node (keys: int(u)); TRUE = 0, FALSE = infeasible
+    value = {int(mgr.true): 0}
+    take_high = {}
+    for key, u, lo, hi in _bottom_up(node):
+        k = pos_of_level[u.level]
+        best = None
+        for bit, child in ((0, lo), (1, hi)):
+            if child == mgr.false:
+                continue
+            v = value[int(child)] + pos_prefix[pos(child)] - pos_prefix[k + 1] + (w[k] if bit else 0)
+            if best is None or v > best or (v == best and bit == (w[k] >= 0)):
+                best, choice = v, bit
+        value[key] = best
+        take_high[key] = choice
+
+    best_value = pos_prefix[pos(node)] + value[int(node)]
+
+    # Reconstruct the argmax: follow the stored choices, fill skipped levels
+    best_marking = [0] * n
+    u, k = node, 0
+    while True:
+        k_u = pos(u)
+        for j in range(k, k_u):
+            if w[j] > 0:
+                best_marking[idx_at[j]] = 1
+        if k_u == n:
+            break
+        lo, hi = _children(u)
+        if take_high[int(u)]:
+            best_marking[idx_at[k_u]] = 1
+            u = hi
+        else:
+            u = lo
+        k = k_u + 1
+    return best_marking, best_value
+
+
+# ---------------------------------------------------------
+# BATCHED OBJECTIVES, TOP-K AND RANGES
+# ---------------------------------------------------------
+# Same recurrence as max_reachable_marking, but every node carries a vector
+# of values, one per cost vector, and all nodes of one level are updated with
+# a single numpy operation (nodes on one level never point to each other).
+
+
+def _normalize_C(C, n: int) -> np.ndarray:
+    """Cost matrix as int64 of shape (m, n); a single vector becomes m = 1."""
+    C = np.asarray(C, dtype=np.int64)
+    if C.ndim == 1:
+        C = C[None, :]
+    if C.ndim != 2 or C.shape[1] != n:
+        raise ValueError(f"Cost matrix must have shape (m, {n}), got {C.shape}")
+    return C
+
+
+class _LongestPaths:
+    """
+    Per-node longest-path values of a BDD for m cost vectors at once.
+
+    Rows: 0 = FALSE, 1 = TRUE, 2.. = internal nodes. After construction
+        value[r]   (m,) best sum over the positions below row r
+        high[r]    (m,) bool, whether the best path takes the high edge
+        pos[r]     position of row r (terminals: n)
+    """
+
+    def __init__(self, place_ids: List[str], node: DDNode, W: np.ndarray):
+        mgr = node.bdd
+        self.mgr = mgr
+        self.n = n = len(place_ids)
+        pos_of_level, self.idx_at = _place_layout(place_ids, mgr)
+        # Weights by position, and prefix sums of their positive parts
+        self.w = W[:, self.idx_at].T                            # (n, m)
+        self.pos_prefix = np.zeros((n + 1, W.shape[0]), dtype=np.int64)
+        np.cumsum(np.maximum(self.w, 0), axis=0, out=self.pos_prefix[1:])
+
+        nodes = _bottom_up(node) if node != mgr.false and node != mgr.true else []
+        self.row = {int(mgr.false): 0, int(mgr.true): 1}
+        for r, (key, _, _, _) in enumerate(nodes, start=2):
+            self.row[key] = r
+        R = len(nodes) + 2
+        self.pos = np.full(R, n, dtype=np.int64)
+        lo = np.zeros(R, dtype=np.int64)
+        hi = np.zeros(R, dtype=np.int64)
+        for r, (_, u, u_lo, u_hi) in enumerate(nodes, start=2):
+            self.pos[r] = pos_of_level[u.level]
+            lo[r] = self.row[int(u_lo)]
+            hi[r] = self.row[int(u_hi)]
+        self.lo, self.hi = lo, hi
+
+        m = W.shape[0]
+        self.value = np.zeros((R, m), dtype=np.int64)
+        self.high = np.zeros((R, m), dtype=bool)
+        if not nodes:
+            return
+        rows = np.arange(2, R)
+        rows = rows[np.argsort(-self.pos[rows], kind='stable')]
+        bounds = np.flatnonzero(np.diff(self.pos[rows])) + 1
+        for group in np.split(rows, bounds):           # deepest level first
+            k = self.pos[group[0]]
+            base = self.pos_prefix[k + 1]
+            lo_g, hi_g = lo[group], hi[group]
+            v_lo = self.value[lo_g] + self.pos_prefix[self.pos[lo_g]] - base
+            v_hi = self.value[hi_g] + self.pos_prefix[self.pos[hi_g]] - base + self.w[k]
+            lo_ok = (lo_g != 0)[:, None]
+            hi_ok = (hi_g != 0)[:, None]
+            take = hi_ok & (~lo_ok | (v_hi > v_lo) | ((v_hi == v_lo) & (self.w[k] >= 0)))
+            self.high[group] = take
+            self.value[group] = np.where(take, v_hi, v_lo)
+
+    def best(self, root_row: int) -> np.ndarray:
+        return self.pos_prefix[self.pos[root_row]] + self.value[root_row]
+
+    def to_go(self, k: int, r: int, j: int = 0) -> int:
+        """Best value of positions k..n-1 for objective j, starting at row r."""
+        p = self.pos[r]
+        return int(self.pos_prefix[p, j] - self.pos_prefix[k, j] + self.value[r, j])
+
+    def argmax(self, root_row: int, j: int) -> List[int]:
+        marking = [0] * self.n
+        r, k = root_row, 0
+        while True:
+            p = int(self.pos[r])
+            for q in range(k, p):
+                if self.w[q, j] > 0:
+                    marking[self.idx_at[q]] = 1
+            if p == self.n:
+                return marking
+            if self.high[r, j]:
+                marking[self.idx_at[p]] = 1
+                r = self.hi[r]
+            else:
+                r = self.lo[r]
+            k = p + 1
+
+
+def max_reachable_markings(
+    place_ids: List[str],
+    node: DDNode,
+    C,
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    max_reachable_marking for many cost vectors in one pass over the BDD.
+
+    Args:
+        place_ids: list of place IDs (columns of C).
+        node:      Function encoding the set of reachable markings.
+        C:         (m, n) cost matrix, one objective per row (a 1-D vector is
+                   treated as m = 1).
+
+    Returns:
+        (markings, values): int8 array (m, n) of argmax markings and int64
+        array (m,) of optima, or (None, None) if the BDD is empty.
+    """
+    W = _normalize_C(C, len(place_ids))
+    if node == node.bdd.false:
+        return None, None
+    lp = _LongestPaths(place_ids, node, W)
+    root = lp.row[int(node)]
+    markings = np.array([lp.argmax(root, j) for j in range(W.shape[0])], dtype=np.int8)
+    return markings.reshape(W.shape[0], len(place_ids)), lp.best(root)
+
+
+def objective_ranges(place_ids: List[str], node: DDNode, C) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """
+    (min, max) of c^T M over the reachable markings for every row c of C,
+    from a single pass (the minimum is minus the maximum of -c).
+
+    Returns:
+        (mins, maxs) int64 arrays of shape (m,), or (None, None) if the BDD is empty.
+    """
+    W = _normalize_C(C, len(place_ids))
+    if node == node.bdd.false:
+        return None, None
+    lp = _LongestPaths(place_ids, node, np.vstack([W, -W]))
+    best = lp.best(lp.row[int(node)])
+    m = W.shape[0]
+    return -best[m:], best[:m]
+
+
+def objective_range(place_ids: List[str], node: DDNode, c) -> Tuple[Optional[int], Optional[int]]:
+    """(min, max) of c^T M over the reachable markings, or (None, None)."""
+    mins, maxs = objective_ranges(place_ids, node, _normalize_c(c))
+    if mins is None:
+        return None, None
+    return int(mins[0]), int(maxs[0])
+
+
+def top_k_reachable_markings(
+    place_ids: List[str],
+    node: DDNode,
+    c: Union[List[int], np.ndarray],
+    k: int,
+) -> List[Tuple[List[int], int]]:
+    """
+    The k highest-scoring distinct markings of the BDD, best first.
+
+    Best-first search over (position, node) states with the exact longest-path
+    value as the remaining score, so every state popped at position n is the
+    next best marking. Free variables are branched on like BDD variables.
+    Costs O(|BDD|) for the values plus O(k * n log(k * n)) for the search.
+
+    Returns:
+        list of (marking, value), fewer than k if the BDD has fewer markings.
+    """
+    W = _normalize_C(_normalize_c(c), len(place_ids))
+    if k <= 0 or node == node.bdd.false:
+        return []
+    lp = _LongestPaths(place_ids, node, W)
+    n = lp.n
+    w = lp.w[:, 0].tolist()
+    root = lp.row[int(node)]
+
+    # heap entries: (-bound, tie, position, row, score so far, path)
+    # path is a linked list (position, prev) of the positions set to 1
+    tie = 0
+    heap = [(-lp.to_go(0, root), tie, 0, root, 0, None)]
+    result = []
+    while heap and len(result) < k:
+        neg_bound, _, q, r, score, path = heapq.heappop(heap)
+        if q == n:
+            marking = [0] * n
+            while path is not None:
+                marking[lp.idx_at[path[0]]] = 1
+                path = path[1]
+            result.append((marking, score))
+            continue
+        if lp.pos[r] == q:
+            branches = ((int(lp.lo[r]), 0), (int(lp.hi[r]), 1))
+        else:
+            branches = ((r, 0), (r, 1))            # free variable at position q
+        for child, bit in branches:
+            if child == 0:
+                continue
+            s = score + (w[q] if bit else 0)
+            tie += 1
+            heapq.heappush(heap, (-(s + lp.to_go(q + 1, child)), tie, q + 1, child, s,
+                                  (q, path) if bit else path))
+    return result
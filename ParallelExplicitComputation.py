@@ -0,0 +1,181 @@
+import multiprocessing as mp
+import os
+import queue as queue_mod
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+from PetriNetReading import PetriNet
+from ExplicitComputation import SuccessorGenerator, bfs_reachable
+
+# ---------------------------------------------------------
+# PARALLEL EXPLICIT REACHABILITY (hash-partitioned ownership)
+# ---------------------------------------------------------
+# Every worker process owns the markings m with owner(m) == worker id. It keeps
+# the visited set of its partition, expands its own states and ships the
+# successors it does not own, in batches, to the owning worker's inbox.
+#
+# Termination is detected by the coordinator (the calling process) with a
+# counting scheme: it sends probe waves and every worker answers with
+# (messages sent, messages received, idle?). Two consecutive waves in which all
+# workers are idle and report the same totals with sent == received mean that
+# nobody is working and no batch is in flight.
+
+_PROBE_TIMEOUT = 0.05
+
+
+def owner(marking: Tuple[int, ...], num_workers: int) -> int:
+    # hash() of a tuple of ints is not salted, so all processes agree on it
+    return hash(marking) % num_workers
+
+
+def _worker(wid: int, num_workers: int, pn: PetriNet, inboxes, control, results,
+            batch_size: int) -> None:
+    gen = SuccessorGenerator(pn)
+    inbox = inboxes[wid]
+
+    local: Set[Tuple[int, ...]] = set()
+    todo = deque()
+    outbox: List[List[Tuple[Tuple[int, ...], int]]] = [[] for _ in range(num_workers)]
+    sent = 0
+    received = 0
+    reported_idle = False
+
+    initial, initial_enabled = gen.initial()
+    if owner(initial, num_workers) == wid:
+        local.add(initial)
+        todo.append((initial, initial_enabled))
+
+    def flush(dest: int) -> None:
+        nonlocal sent
+        inboxes[dest].put(('states', outbox[dest]))
+        outbox[dest] = []
+        sent += 1
+
+    while True:
+        # 1. Drain the inbox (block briefly only when there is nothing to do)
+        try:
+            msg = inbox.get(timeout=_PROBE_TIMEOUT) if not todo else inbox.get_nowait()
+        except queue_mod.Empty:
+            msg = None
+
+        while msg is not None:
+            kind = msg[0]
+            if kind == 'states':
+                received += 1
+                for marking, enabled in msg[1]:
+                    if marking not in local:
+                        local.add(marking)
+                        todo.append((marking, enabled))
+            elif kind == 'probe':
+                control.put(('ack', wid, msg[1], sent, received, not todo))
+            elif kind == 'stop':
+                results.put((wid, local))
+                return
+            try:
+                msg = inbox.get_nowait()
+            except queue_mod.Empty:
+                msg = None
+
+        # 2. Expand up to batch_size owned states
+        if todo:
+            reported_idle = False
+            for _ in range(min(batch_size, len(todo))):
+                current, enabled = todo.popleft()
+                for _, new_marking, new_enabled in gen.successors(current, enabled):
+                    dest = owner(new_marking, num_workers)
+                    if dest == wid:
+                        if new_marking not in local:
+                            local.add(new_marking)
+                            todo.append((new_marking, new_enabled))
+                    else:
+                        outbox[dest].append((new_marking, new_enabled))
+                        if len(outbox[dest]) >= batch_size:
+                            flush(dest)
+
+        # 3. Out of work: push partial batches and tell the coordinator once
+        if not todo:
+            for dest in range(num_workers):
+                if outbox[dest]:
+                    flush(dest)
+            if not reported_idle:
+                control.put(('idle', wid))
+                reported_idle = True
+
+
+def parallel_bfs_reachable(pn: PetriNet, num_workers: Optional[int] = None,
+                           batch_size: int = 1024) -> Set[Tuple[int, ...]]:
+    """
+    Multi-process explicit reachability with hash-partitioned state ownership.
+
+    Args:
+        pn:          PetriNet
+        num_workers: number of worker processes (default: os.cpu_count()).
+        batch_size:  successors per inter-process message, and states expanded
+                     between two inbox polls.
+
+    Returns:
+        The set of reachable markings, identical to bfs_reachable(pn) for any
+        number of workers.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if num_workers <= 1:
+        return bfs_reachable(pn)
+
+    ctx = mp.get_context('fork') if 'fork' in mp.get_all_start_methods() else mp.get_context()
+    inboxes = [ctx.Queue() for _ in range(num_workers)]
+    control = ctx.Queue()
+    results = ctx.Queue()
+
+    workers = [
+        ctx.Process(target=_worker,
+                    args=(wid, num_workers, pn, inboxes, control, results, batch_size),
+                    daemon=True)
+        for wid in range(num_workers)
+    ]
+    for w in workers:
+        w.start()
+
+    try:
+        # Latest known state of every worker, in control-queue order
+        idle = [False] * num_workers
+        wave = 0
+        last_totals = None
+        while True:
+            if not all(idle):
+                msg = control.get()
+                if msg[0] == 'idle':
+                    idle[msg[1]] = True
+                continue
+
+            # Everybody claims to be idle: run a probe wave
+            wave += 1
+            for box in inboxes:
+                box.put(('probe', wave))
+            acks: Dict[int, Tuple[int, int]] = {}
+            while len(acks) < num_workers:
+                msg = control.get()
+                if msg[0] == 'idle':
+                    idle[msg[1]] = True
+                elif msg[2] == wave:
+                    acks[msg[1]] = (msg[3], msg[4])
+                    idle[msg[1]] = msg[5]
+
+            totals = (sum(s for s, _ in acks.values()), sum(r for _, r in acks.values()))
+            if all(idle) and totals[0] == totals[1] and totals == last_totals:
+                break
+            last_totals = totals if all(idle) else None
+
+        for box in inboxes:
+            box.put(('stop',))
+        reachable: Set[Tuple[int, ...]] = set()
+        for _ in range(num_workers):
+            _, local = results.get()
+            reachable |= local
+    finally:
+        for w in workers:
+            w.join(timeout=5)
+            if w.is_alive():
+                w.terminate()
+
+    return reachable
@@ -1,7 +1,112 @@
+import hashlib
+import json
+import mmap
+import os
 import numpy as np
 import xml.etree.ElementTree as ET
+from array import array
 from typing import List, Optional, Dict, Tuple
 
+# (ptr, idx, weights): row r owns idx[ptr[r]:ptr[r+1]] and weights[ptr[r]:ptr[r+1]]
+CSR = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _csr_from_triples(num_rows: int, rows: np.ndarray, cols: np.ndarray, weights: np.ndarray) -> CSR:
+    """
+    Build a CSR triple from parallel (row, col, weight) arrays. Duplicate
+    (row, col) pairs keep the last weight; zero weights are dropped.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    weights = np.asarray(weights, dtype=int)
+    order = np.lexsort((np.arange(len(rows)), cols, rows))
+    rows, cols, weights = rows[order], cols[order], weights[order]
+    last = np.ones(len(rows), dtype=bool)
+    last[:-1] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    keep = last & (weights != 0)
+    rows, cols, weights = rows[keep], cols[keep], weights[keep]
+    ptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=ptr[1:])
+    return ptr, cols, weights
+
+
+def _csr_from_dense(mat: np.ndarray) -> CSR:
+    """Build a CSR triple from a dense (rows x cols) matrix."""
+    mat = np.asarray(mat)
+    rows, cols = np.nonzero(mat)
+    ptr = np.zeros(mat.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=mat.shape[0]), out=ptr[1:])
+    return ptr, cols.astype(np.int64), mat[rows, cols].astype(int)
+
+
+def _dense_from_csr(ptr: np.ndarray, idx: np.ndarray, weights: np.ndarray, num_cols: int) -> np.ndarray:
+    mat = np.zeros((len(ptr) - 1, num_cols), dtype=int)
+    rows = np.repeat(np.arange(len(ptr) - 1), np.diff(ptr))
+    mat[rows, idx] = weights
+    return mat
+
+
+def _transpose_csr(ptr: np.ndarray, idx: np.ndarray, num_cols: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column -> rows adjacency of a CSR pattern (weights are not needed)."""
+    rows = np.repeat(np.arange(len(ptr) - 1, dtype=np.int64), np.diff(ptr))
+    order = np.argsort(idx, kind='stable')
+    t_ptr = np.zeros(num_cols + 1, dtype=np.int64)
+    np.cumsum(np.bincount(idx, minlength=num_cols), out=t_ptr[1:])
+    return t_ptr, rows[order]
+
+
+# Node kinds while streaming a PNML file
+_UNKNOWN, _PLACE, _TRANS, _REF, _ARC = 0, 1, 2, 3, 4
+
+
+def _parse_int(text: Optional[str], default: int) -> int:
+    """Integer value of a <text> element; non-integer values fall back to default."""
+    if text is None:
+        return default
+    try:
+        return int(text)
+    except ValueError:
+        return default
+
+
+# ---------------------------------------------------------
+# Compiled net files
+# ---------------------------------------------------------
+# Layout: magic | header length (8 bytes, little endian) | JSON header |
+# raw arrays, each starting at a 64-byte aligned offset after the header.
+_COMPILED_MAGIC = b'PNMLC\x00\x00\x01'
+_COMPILED_VERSION = 1
+COMPILED_SUFFIX = 'c'
+
+
+def compiled_path(filename: str) -> str:
+    """Where from_pnml keeps the compiled copy of a PNML file (net.pnml -> net.pnmlc)."""
+    return filename + COMPILED_SUFFIX
+
+
+def _file_sha256(filename: str) -> str:
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_compiled_header(path: str) -> Optional[dict]:
+    """Header of a compiled net, or None if it is missing, foreign or outdated."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(_COMPILED_MAGIC)) != _COMPILED_MAGIC:
+                return None
+            header_len = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(header_len))
+    except (OSError, ValueError):
+        return None
+    if header.get('version') != _COMPILED_VERSION:
+        return None
+    return header
+
+
 class PetriNet:
     """
     Represents a simple Petri Net structure derived from a PNML file.
@@ -11,8 +116,13 @@ class PetriNet:
         trans_ids (List[str]): Unique IDs of transitions.
         place_names (List[Optional[str]]): Names associated with places.
         trans_names (List[Optional[str]]): Names associated with transitions.
-        I (np.ndarray): Input incidence matrix (T x P).
-        O (np.ndarray): Output incidence matrix (T x P).
+        pre_ptr, pre_idx, pre_w (np.ndarray): CSR pre-sets. The input places of
+            transition t are pre_idx[pre_ptr[t]:pre_ptr[t+1]], with arc weights pre_w[...].
+        post_ptr, post_idx, post_w (np.ndarray): CSR post-sets (output places), same layout.
+        cons_ptr, cons_idx (np.ndarray): CSR place -> transitions that consume from it.
+        prod_ptr, prod_idx (np.ndarray): CSR place -> transitions that produce into it.
+        I (np.ndarray): Input incidence matrix (T x P), built lazily from the CSR pre-sets.
+        O (np.ndarray): Output incidence matrix (T x P), built lazily from the CSR post-sets.
         M0 (np.ndarray): Initial marking (P x 1 vector).
         
         boi vi 1 so sai sot trong luc viet code va lam nhom, 
@@ -24,157 +134,356 @@ class PetriNet:
         trans_ids: List[str],
         place_names: List[Optional[str]],
         trans_names: List[Optional[str]],
-        I: np.ndarray,  
-        O: np.ndarray, 
-        M0: np.ndarray
+        I: Optional[np.ndarray] = None,
+        O: Optional[np.ndarray] = None,
+        M0: Optional[np.ndarray] = None,
+        pre: Optional[CSR] = None,
+        post: Optional[CSR] = None,
     ):
+        """
+        Either the dense matrices (I, O) or the CSR triples (pre, post) must be
+        given; each CSR triple is (ptr, idx, weights) indexed by transition.
+        """
+        if M0 is None:
+            raise ValueError("Initial marking M0 is required.")
+        if pre is None:
+            if I is None:
+                raise ValueError("Either I or pre must be given.")
+            pre = _csr_from_dense(I)
+        if post is None:
+            if O is None:
+                raise ValueError("Either O or post must be given.")
+            post = _csr_from_dense(O)
+
         self.place_ids = place_ids
         self.trans_ids = trans_ids
         self.place_names = place_names
         self.trans_names = trans_names
-        self.I = I
-        self.O = O
+        self.pre_ptr, self.pre_idx, self.pre_w = pre
+        self.post_ptr, self.post_idx, self.post_w = post
         self.M0 = M0
+        self._I = I
+        self._O = O
+
+        # Place -> transition adjacency (transposed CSR)
+        num_places = len(place_ids)
+        self.cons_ptr, self.cons_idx = _transpose_csr(self.pre_ptr, self.pre_idx, num_places)
+        self.prod_ptr, self.prod_idx = _transpose_csr(self.post_ptr, self.post_idx, num_places)
+
+    @property
+    def I(self) -> np.ndarray:
+        if self._I is None:
+            self._I = _dense_from_csr(self.pre_ptr, self.pre_idx, self.pre_w, len(self.place_ids))
+        return self._I
+
+    @property
+    def O(self) -> np.ndarray:
+        if self._O is None:
+            self._O = _dense_from_csr(self.post_ptr, self.post_idx, self.post_w, len(self.place_ids))
+        return self._O
+
+    def preset(self, t: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(input place indices, arc weights) of transition t."""
+        lo, hi = self.pre_ptr[t], self.pre_ptr[t + 1]
+        return self.pre_idx[lo:hi], self.pre_w[lo:hi]
+
+    def postset(self, t: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(output place indices, arc weights) of transition t."""
+        lo, hi = self.post_ptr[t], self.post_ptr[t + 1]
+        return self.post_idx[lo:hi], self.post_w[lo:hi]
+
+    def consumers(self, p: int) -> np.ndarray:
+        """Transitions that have place p in their pre-set."""
+        return self.cons_idx[self.cons_ptr[p]:self.cons_ptr[p + 1]]
+
+    def producers(self, p: int) -> np.ndarray:
+        """Transitions that have place p in their post-set."""
+        return self.prod_idx[self.prod_ptr[p]:self.prod_ptr[p + 1]]
 
     @classmethod
-    def from_pnml(cls, filename: str) -> "PetriNet":
-        
-        # --- 1. XML Parsing Setup ---
+    def from_pnml(cls, filename: str, use_cache: bool = True) -> "PetriNet":
+        """
+        Load a PNML file, through its compiled cache when possible.
+
+        With use_cache, a compiled copy of the net is kept next to the source
+        (see compiled_path). It is used when its recorded size/mtime match the
+        PNML file, or failing that, when its recorded content hash does;
+        otherwise the PNML is parsed and the cache rewritten. A cache that
+        cannot be written (read-only directory) is silently skipped.
+        """
+        if not use_cache:
+            return cls._parse_pnml(filename)
+        path = compiled_path(filename)
         try:
-            tree = ET.parse(filename)
-            root = tree.getroot()
+            stat = os.stat(filename)
         except FileNotFoundError:
             raise FileNotFoundError(f"PNML file not found: {filename}")
-        except ET.ParseError:
-            raise ValueError(f"Error parsing XML in file: {filename}")
-            
-        # Determine the namespace to correctly find elements
-        # We extract it from the root tag if present.
-        namespace = ''
-        if root.tag.startswith('{'):
-            namespace = root.tag.split('}')[0] + '}'
-        
-        # Find the first 'net' element
-        net_element = root.find(f'{namespace}net')
-        if net_element is None:
-            raise ValueError("Could not find a 'net' element in the PNML file.")
-            
-        # --- 2. Collect Places and Transitions ---
-        
+        source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+        header = _read_compiled_header(path)
+        if header is not None:
+            cached = header['source']
+            fresh = cached.get('size') == source['size'] and cached.get('mtime_ns') == source['mtime_ns']
+            if not fresh:
+                source['sha256'] = _file_sha256(filename)
+                fresh = cached.get('sha256') == source['sha256']
+            if fresh:
+                try:
+                    return cls.load_compiled(path)
+                except (OSError, ValueError, KeyError):
+                    pass    # truncated or damaged: rebuild below
+
+        pn = cls._parse_pnml(filename)
+        source.setdefault('sha256', _file_sha256(filename))
+        try:
+            pn.save_compiled(path, source=source)
+        except OSError:
+            pass
+        return pn
+
+    @classmethod
+    def _parse_pnml(cls, filename: str) -> "PetriNet":
+        """
+        Single-pass streaming PNML loader (ElementTree.iterparse).
+
+        Places, transitions and arcs are picked up at any depth inside the
+        first <net>, so nested and multiple <page>s are all read, and arcs may
+        point to <referencePlace>/<referenceTransition> nodes (resolved to the
+        node they reference). Every element is dropped from the tree as soon
+        as it has been read, and arcs are kept as flat integer arrays, so peak
+        memory follows the size of the net, not of the XML document.
+        """
+
+        # --- 1. State kept while streaming ---
+
         place_ids: List[str] = []
         trans_ids: List[str] = []
         place_names: List[Optional[str]] = []
         trans_names: List[Optional[str]] = []
-        
-        # Maps for quick look-up and indexing
-        place_idx_map: Dict[str, int] = {}
-        trans_idx_map: Dict[str, int] = {}
-        
-        # Initial marking data
-        initial_markings: Dict[str, int] = {}
-
-        # Process Places
-        for place in net_element.findall(f'{namespace}page/{namespace}place'):
-            p_id = place.get('id')
-            if not p_id: continue
-            
-            p_idx = len(place_ids)
-            place_ids.append(p_id)
-            place_idx_map[p_id] = p_idx
-            
-            # Get name (optional)
-            name_element = place.find(f'{namespace}name/{namespace}text')
-            place_names.append(name_element.text if name_element is not None else None)
-            
-            # Get initial marking (default to 0 if not specified)
-            marking_element = place.find(f'{namespace}initialMarking/{namespace}text')
-            marking_value = 0
-            if marking_element is not None and marking_element.text is not None:
-                try:
-                    marking_value = int(marking_element.text)
-                except ValueError:
-                    # Ignore non-integer marking values
-                    pass
-            initial_markings[p_id] = marking_value
-
-        # Process Transitions
-        for transition in net_element.findall(f'{namespace}page/{namespace}transition'):
-            t_id = transition.get('id')
-            if not t_id: continue
-            
-            t_idx = len(trans_ids)
-            trans_ids.append(t_id)
-            trans_idx_map[t_id] = t_idx
-            
-            # Get name (optional)
-            name_element = transition.find(f'{namespace}name/{namespace}text')
-            trans_names.append(name_element.text if name_element is not None else None)
-
-        # Determine dimensions
+        initial_marking = array('q')
+
+        # Every id seen (as a node or as an arc end) gets a node number;
+        # node_kind / node_ref say what it turned out to be.
+        node_of: Dict[str, int] = {}
+        node_kind: List[int] = []      # _UNKNOWN, _PLACE, _TRANS, _REF
+        node_ref: List[int] = []       # place/transition index, or referenced node
+
+        def node(node_id: str) -> int:
+            n = node_of.get(node_id)
+            if n is None:
+                n = node_of[node_id] = len(node_kind)
+                node_kind.append(_UNKNOWN)
+                node_ref.append(-1)
+            return n
+
+        arc_src, arc_dst, arc_w = array('q'), array('q'), array('q')
+
+        tags: List[str] = []           # local names of the open elements
+        elems: List[ET.Element] = []
+        net_depth = -1                 # depth of the first <net>, -1 = not reached yet
+        nets_seen = 0
+        current = None                 # (kind, index) of the open place / transition / arc
+
+        # --- 2. Stream the document ---
+        try:
+            for event, elem in ET.iterparse(filename, events=('start', 'end')):
+                tag = elem.tag.rsplit('}', 1)[-1]
+
+                if event == 'start':
+                    tags.append(tag)
+                    elems.append(elem)
+                    if tag == 'net':
+                        nets_seen += 1
+                        if nets_seen == 1:
+                            net_depth = len(tags) - 1
+                        continue
+                    if net_depth < 0 or nets_seen > 1:
+                        continue
+                    node_id = elem.get('id')
+                    if tag == 'place' and node_id:
+                        n = node(node_id)
+                        node_kind[n], node_ref[n] = _PLACE, len(place_ids)
+                        place_ids.append(node_id)
+                        place_names.append(None)
+                        initial_marking.append(0)
+                        current = (_PLACE, len(place_ids) - 1)
+                    elif tag == 'transition' and node_id:
+                        n = node(node_id)
+                        node_kind[n], node_ref[n] = _TRANS, len(trans_ids)
+                        trans_ids.append(node_id)
+                        trans_names.append(None)
+                        current = (_TRANS, len(trans_ids) - 1)
+                    elif tag in ('referencePlace', 'referenceTransition') and node_id and elem.get('ref'):
+                        n = node(node_id)
+                        node_kind[n], node_ref[n] = _REF, node(elem.get('ref'))
+                    elif tag == 'arc' and elem.get('source') and elem.get('target'):
+                        arc_src.append(node(elem.get('source')))
+                        arc_dst.append(node(elem.get('target')))
+                        arc_w.append(1)
+                        current = (_ARC, len(arc_w) - 1)
+                    continue
+
+                # event == 'end'
+                tags.pop()
+                elems.pop()
+                if tag == 'text' and current is not None and len(tags) >= 2:
+                    owner, label = tags[-2], tags[-1]
+                    kind, i = current
+                    text = elem.text
+                    if kind == _PLACE and owner == 'place' and label == 'name':
+                        place_names[i] = text
+                    elif kind == _TRANS and owner == 'transition' and label == 'name':
+                        trans_names[i] = text
+                    elif kind == _PLACE and owner == 'place' and label == 'initialMarking':
+                        initial_marking[i] = _parse_int(text, 0)
+                    elif kind == _ARC and owner == 'arc' and label == 'inscription':
+                        arc_w[i] = _parse_int(text, 1)
+                elif tag in ('place', 'transition', 'arc'):
+                    current = None
+                if tag == 'net':
+                    elem.clear()
+                # Drop finished subtrees: once a child of a container ends it
+                # has been fully read, so the container can forget it.
+                if elems and tags[-1] in ('pnml', 'net', 'page'):
+                    del elems[-1][:]
+        except FileNotFoundError:
+            raise FileNotFoundError(f"PNML file not found: {filename}")
+        except ET.ParseError:
+            raise ValueError(f"Error parsing XML in file: {filename}")
+
+        if nets_seen == 0:
+            raise ValueError("Could not find a 'net' element in the PNML file.")
+
         num_places = len(place_ids)
         num_trans = len(trans_ids)
-        
         if num_places == 0 and num_trans == 0:
-             raise ValueError("The PNML file contains no places or transitions.")
+            raise ValueError("The PNML file contains no places or transitions.")
+
+        # --- 3. Resolve reference nodes to the place / transition they stand for ---
+        kind = np.array(node_kind, dtype=np.int64)
+        ref = np.array(node_ref, dtype=np.int64)
+        for n in np.flatnonzero(kind == _REF).tolist():
+            target, hops = ref[n], 0
+            while kind[target] == _REF and hops <= len(kind):
+                target, hops = ref[target], hops + 1
+            # Dangling or cyclic references stay unresolved (arcs to them are ignored)
+            kind[n], ref[n] = (kind[target], ref[target]) if kind[target] != _REF else (_UNKNOWN, -1)
+
+        # --- 4. Arcs straight into the sparse pre/post-sets ---
+        src = np.frombuffer(arc_src, dtype=np.int64)
+        dst = np.frombuffer(arc_dst, dtype=np.int64)
+        w = np.frombuffer(arc_w, dtype=np.int64)
+
+        # Place -> Transition (input) and Transition -> Place (output);
+        # arcs not connecting P and T, or to/from unknown nodes, are ignored
+        is_in = (kind[src] == _PLACE) & (kind[dst] == _TRANS)
+        is_out = (kind[src] == _TRANS) & (kind[dst] == _PLACE)
 
-        # --- 3. Initialize Matrices and Marking Vector ---
-        
-        # I (Input): P rows x T columns, I[p, t] = weight of arc from p to t
-        I = np.zeros((num_places, num_trans), dtype=int)
-        # O (Output): P rows x T columns, O[p, t] = weight of arc from t to p
-        O = np.zeros((num_places, num_trans), dtype=int)
-        # M0 (Initial Marking): P rows x 1 column
-        M0 = np.zeros(num_places, dtype=int)
-
-        # Populate M0
-        for p_id, p_idx in place_idx_map.items():
-            M0[p_idx] = initial_markings.get(p_id, 0)
-        
-        # --- 4. Process Arcs to Build I and O Matrices ---
-        
-        for arc in net_element.findall(f'{namespace}page/{namespace}arc'):
-            source_id = arc.get('source')
-            target_id = arc.get('target')
-            
-            # Get arc weight (default to 1)
-            weight_element = arc.find(f'{namespace}inscription/{namespace}text')
-            weight = 1
-            if weight_element is not None and weight_element.text is not None:
-                try:
-                    weight = int(weight_element.text)
-                except ValueError:
-                    # Ignore non-integer weight values
-                    pass
-
-            # An arc can be Place -> Transition (Input) or Transition -> Place (Output)
-            
-            # Case 1: Place -> Transition (Input Matrix I)
-            if source_id in place_idx_map and target_id in trans_idx_map:
-                p_idx = place_idx_map[source_id]
-                t_idx = trans_idx_map[target_id]
-                I[p_idx, t_idx] = weight
-            
-            # Case 2: Transition -> Place (Output Matrix O)
-            elif source_id in trans_idx_map and target_id in place_idx_map:
-                t_idx = trans_idx_map[source_id]
-                p_idx = place_idx_map[target_id]
-                O[p_idx, t_idx] = weight
-                
-            # Ignore arcs not connecting P and T or to/from unknown nodes
-            
-        # --- 5. Return PetriNet Instance ---
         return cls(
             place_ids=place_ids,
             trans_ids=trans_ids,
             place_names=place_names,
             trans_names=trans_names,
-            #here
-            I=I.T,
-            #here
-            O=O.T,
-            M0=M0 
+            M0=np.array(initial_marking, dtype=int),
+            pre=_csr_from_triples(num_trans, ref[dst[is_in]], ref[src[is_in]], w[is_in]),
+            post=_csr_from_triples(num_trans, ref[src[is_out]], ref[dst[is_out]], w[is_out]),
         )
 
+    def save_compiled(self, path: str, source: Optional[dict] = None) -> None:
+        """
+        Write the net in the compiled binary layout (see _COMPILED_MAGIC):
+        a JSON header followed by the raw CSR arrays, M0 and the ID / name
+        strings, each aligned to 64 bytes. `source` describes the PNML it was
+        built from and is used by from_pnml for invalidation.
+        """
+        blobs = {
+            'pre_ptr': self.pre_ptr, 'pre_idx': self.pre_idx, 'pre_w': self.pre_w,
+            'post_ptr': self.post_ptr, 'post_idx': self.post_idx, 'post_w': self.post_w,
+            'M0': np.asarray(self.M0),
+        }
+        arrays = {k: np.ascontiguousarray(v, dtype=np.int64) for k, v in blobs.items()}
+        for key, strings in (('place_ids', self.place_ids), ('trans_ids', self.trans_ids),
+                             ('place_names', self.place_names), ('trans_names', self.trans_names)):
+            # XML text cannot contain NUL, so it is a safe separator;
+            # the *_none arrays flag names that were absent
+            arrays[key] = np.frombuffer('\x00'.join(x or '' for x in strings).encode(), dtype=np.uint8)
+            if key.endswith('names'):
+                arrays[key + '_none'] = np.array([x is None for x in strings], dtype=np.uint8)
+
+        layout = {}
+        offset = 0
+        for key, arr in arrays.items():
+            layout[key] = [offset, arr.dtype.str, len(arr)]
+            offset += -(-arr.nbytes // 64) * 64
+        header = json.dumps({'version': _COMPILED_VERSION, 'source': source or {},
+                             'num_places': len(self.place_ids), 'num_trans': len(self.trans_ids),
+                             'arrays': layout}).encode()
+        data_start = -(-(len(_COMPILED_MAGIC) + 8 + len(header)) // 64) * 64
+
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(_COMPILED_MAGIC)
+            f.write(len(header).to_bytes(8, 'little'))
+            f.write(header)
+            for key, arr in arrays.items():
+                f.seek(data_start + layout[key][0])
+                f.write(arr.tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load_compiled(cls, path: str) -> "PetriNet":
+        """
+        Open a compiled net. The arrays are zero-copy views of a private
+        (copy-on-write) memory map of the file, so loading does not read the
+        arc data up front and writes never reach the file.
+        """
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        header_len = int.from_bytes(mm[len(_COMPILED_MAGIC):len(_COMPILED_MAGIC) + 8], 'little')
+        start = len(_COMPILED_MAGIC) + 8
+        header = json.loads(mm[start:start + header_len])
+        data_start = -(-(start + header_len) // 64) * 64
+
+        def view(key):
+            offset, dtype, count = header['arrays'][key]
+            return np.frombuffer(mm, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+
+        def strings(key, num):
+            if num == 0:
+                return []
+            values = view(key).tobytes().decode().split('\x00')
+            if key + '_none' in header['arrays']:
+                none = view(key + '_none')
+                return [None if none[i] else v for i, v in enumerate(values)]
+            return values
+
+        num_places, num_trans = header['num_places'], header['num_trans']
+        return cls(
+            place_ids=strings('place_ids', num_places),
+            trans_ids=strings('trans_ids', num_trans),
+            place_names=strings('place_names', num_places),
+            trans_names=strings('trans_names', num_trans),
+            M0=view('M0'),
+            pre=(view('pre_ptr'), view('pre_idx'), view('pre_w')),
+            post=(view('post_ptr'), view('post_idx'), view('post_w')),
+        )
+
+    def fingerprint(self) -> str:
+        """
+        SHA-256 over place/transition IDs, the sparse pre/post-sets and M0.
+        Two nets with the same fingerprint are the same net.
+        """
+        h = hashlib.sha256()
+        h.update("\x1f".join(self.place_ids).encode())
+        h.update(b"\x1e")
+        h.update("\x1f".join(self.trans_ids).encode())
+        for arr in (self.pre_ptr, self.pre_idx, self.pre_w,
+                    self.post_ptr, self.post_idx, self.post_w, self.M0):
+            h.update(b"\x1e")
+            h.update(np.ascontiguousarray(arr, dtype=np.int64).tobytes())
+        return h.hexdigest()
+
     def __str__(self) -> str:
         s = []
         s.append("Places: " + str(self.place_ids))
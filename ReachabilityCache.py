@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import List, Optional, Sequence, Tuple
+
+from PetriNetReading import PetriNet
+from BDDBackend import new_bdd
+from SymbolicComputation import bdd_reachable, _resolve_order
+
+# ---------------------------------------------------------
+# PERSISTENT CACHE OF REACHABILITY BDDs
+# ---------------------------------------------------------
+# Content-addressed: the key is a hash of the net fingerprint (ids, pre/post
+# arcs, M0) and the variable order, so a changed net or a different order
+# simply misses and gets its own entry. Every entry is a pair of files:
+#   <key>.json       the reachable-set BDD, in dd's JSON dump layout
+#   <key>.meta.json  fingerprint, order and state count (checked on load)
+# The modification time of the meta file is the LRU clock: a hit touches it,
+# and put() evicts the least recently used entries until the directory fits
+# in max_bytes.
+
+DEFAULT_CACHE_DIR = os.environ.get('PN_BDD_CACHE', '.bdd_cache')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_FORMAT_VERSION = 1
+
+
+class ReachabilityCache:
+    """On-disk LRU cache of (Reached, num_reachable) pairs from bdd_reachable."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    # ---------- keys and paths ----------
+
+    @staticmethod
+    def key(pn: PetriNet, order: Sequence[str]) -> str:
+        h = hashlib.sha256()
+        h.update(f"v{_FORMAT_VERSION}\n{pn.fingerprint()}\n".encode())
+        h.update('\n'.join(order).encode())
+        return h.hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.meta.json'
+
+    def _remove(self, key: str) -> None:
+        for path in self._paths(key):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # ---------- lookup / store ----------
+
+    def get(self, pn: PetriNet, order: Sequence[str], backend: str = 'dd'):
+        """
+        Load the reachable set of pn under `order`.
+
+        Returns:
+            (Reached, num_reachable) in a fresh `backend` manager whose
+            variables are declared in `order`, or None on a miss. Both
+            backends write the same JSON layout, so entries are shared.
+        """
+        order = list(order)
+        key = self.key(pn, order)
+        bdd_path, meta_path = self._paths(key)
+        if not (os.path.exists(bdd_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('fingerprint') != pn.fingerprint() or meta.get('order') != order:
+                return None
+            bdd = new_bdd(backend)
+            # Declaring first pins the levels; load() keeps existing variables
+            bdd.declare(*order)
+            Reached = bdd.load(bdd_path)['reached']
+        except (OSError, ValueError, KeyError):
+            # Half-written or corrupt entry: drop it and recompute
+            self._remove(key)
+            return None
+        os.utime(meta_path)
+        return Reached, meta['num_reachable']
+
+    def put(self, pn: PetriNet, order: Sequence[str], Reached, num_reachable: int) -> str:
+        """Store a reachable set, then evict old entries. Returns the key."""
+        order = list(order)
+        key = self.key(pn, order)
+        bdd_path, meta_path = self._paths(key)
+        meta = {
+            'version': _FORMAT_VERSION,
+            'fingerprint': pn.fingerprint(),
+            'order': order,
+            'num_reachable': int(num_reachable),
+            'num_places': len(pn.place_ids),
+            'num_transitions': len(pn.trans_ids),
+        }
+        # Write to temp files and rename, so readers never see a partial entry
+        fd, tmp_bdd = tempfile.mkstemp(suffix='.json', dir=self.directory)
+        os.close(fd)
+        Reached.bdd.dump(tmp_bdd, roots={'reached': Reached}, filetype='json')
+        fd, tmp_meta = tempfile.mkstemp(suffix='.json', dir=self.directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=1)
+        os.replace(tmp_bdd, bdd_path)
+        os.replace(tmp_meta, meta_path)
+        self.evict(keep=key)
+        return key
+
+    # ---------- eviction ----------
+
+    def entries(self) -> List[Tuple[str, float, int]]:
+        """(key, last use, bytes) of every complete entry, least recently used first."""
+        result = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.meta.json'):
+                continue
+            key = name[:-len('.meta.json')]
+            bdd_path, meta_path = self._paths(key)
+            try:
+                size = os.path.getsize(bdd_path) + os.path.getsize(meta_path)
+                last_use = os.path.getmtime(meta_path)
+            except OSError:
+                continue
+            result.append((key, last_use, size))
+        result.sort(key=lambda e: e[1])
+        return result
+
+    def size(self) -> int:
+        return sum(size for _, _, size in self.entries())
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used entries until the cache fits. Returns how many."""
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for key, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._remove(key)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for key, _, _ in self.entries():
+            self._remove(key)
+
+
+def cached_bdd_reachable(pn: PetriNet, order=None, order_file=None, cache=None, stats=None,
+                         backend='dd', observer=None):
+    """
+    bdd_reachable backed by a ReachabilityCache.
+
+    Args:
+        pn:         PetriNet
+        order, order_file: as in bdd_reachable (resolved first, since the
+                    order is part of the cache key).
+        cache:      ReachabilityCache, None for the default cache directory,
+                    or False to always recompute.
+        stats:      optional dict; 'cache' is set to 'hit', 'miss' or 'off'
+                    on top of what bdd_reachable reports.
+        backend:    BDD manager for the result ('dd' or 'array').
+        observer:   passed to bdd_reachable on a miss (no events on a hit).
+
+    Returns:
+        (Reached, num_reachable)
+    """
+    if cache is False:
+        if stats is not None:
+            stats['cache'] = 'off'
+        return bdd_reachable(pn, order=order, order_file=order_file, stats=stats, backend=backend,
+                             observer=observer)
+    if cache is None:
+        cache = ReachabilityCache()
+
+    var_order, _ = _resolve_order(pn, order, order_file)
+    hit = cache.get(pn, var_order, backend)
+    if hit is not None:
+        print(f"   [DD] Reachable set loaded from cache ({cache.directory})")
+        if stats is not None:
+            stats['cache'] = 'hit'
+            stats['order'] = var_order
+        return hit
+
+    Reached, num_reachable = bdd_reachable(pn, order=order, order_file=order_file, stats=stats,
+                                           backend=backend, observer=observer)
+    cache.put(pn, var_order, Reached, num_reachable)
+    if stats is not None:
+        stats['cache'] = 'miss'
+    return Reached, num_reachable
@@ -0,0 +1,148 @@
+from fractions import Fraction
+from math import gcd
+from typing import Iterable, List, Set
+
+import numpy as np
+
+from PetriNetReading import PetriNet
+
+
+def incidence_matrix(pn: PetriNet) -> np.ndarray:
+    """C = O - I, shape (T x P): C[t, p] = net token change of p when t fires."""
+    C = np.zeros((len(pn.trans_ids), len(pn.place_ids)), dtype=np.int64)
+    for t in range(len(pn.trans_ids)):
+        pre_idx, pre_w = pn.preset(t)
+        post_idx, post_w = pn.postset(t)
+        np.subtract.at(C[t], pre_idx, pre_w)
+        np.add.at(C[t], post_idx, post_w)
+    return C
+
+
+def _normalize(row: List[int]) -> List[int]:
+    g = 0
+    for x in row:
+        g = gcd(g, abs(x))
+    return [x // g for x in row] if g > 1 else row
+
+
+def p_semiflows(pn: PetriNet, max_rows: int = 5000) -> List[np.ndarray]:
+    """
+    Minimal-support P-semiflows (y >= 0, y != 0, y^T C^T = 0) by the Farkas
+    algorithm. Every semiflow gives a conservation law y^T M = y^T M0.
+
+    Args:
+        pn:       PetriNet
+        max_rows: give up when an intermediate tableau exceeds this many rows
+                  (the algorithm is exponential in the worst case).
+
+    Returns:
+        List of length-P int arrays. Raises ValueError if max_rows is exceeded.
+    """
+    P = len(pn.place_ids)
+    C = incidence_matrix(pn).T.tolist()      # P x T
+    T = len(pn.trans_ids)
+
+    # Tableau rows: (incidence part, semiflow part)
+    rows = [(C[p], [1 if q == p else 0 for q in range(P)]) for p in range(P)]
+
+    for j in range(T):
+        zero = [r for r in rows if r[0][j] == 0]
+        pos = [r for r in rows if r[0][j] > 0]
+        neg = [r for r in rows if r[0][j] < 0]
+
+        combined = []
+        for a_inc, a_y in pos:
+            for b_inc, b_y in neg:
+                ka, kb = -b_inc[j], a_inc[j]
+                y = _normalize([ka * u + kb * v for u, v in zip(a_y, b_y)])
+                inc = [ka * u + kb * v for u, v in zip(a_inc, b_inc)]
+                combined.append((inc, y))
+
+        rows = zero + combined
+        # Keep only rows with minimal support
+        rows.sort(key=lambda r: sum(1 for x in r[1] if x))
+        kept = []
+        supports = []
+        for inc, y in rows:
+            support = frozenset(i for i, x in enumerate(y) if x)
+            if any(s <= support for s in supports):
+                continue
+            supports.append(support)
+            kept.append((inc, y))
+        rows = kept
+
+        if len(rows) > max_rows:
+            raise ValueError(f"Farkas tableau exceeded {max_rows} rows at transition {j}.")
+
+    return [np.array(y, dtype=np.int64) for _, y in rows]
+
+
+def p_invariant_basis(pn: PetriNet) -> List[np.ndarray]:
+    """
+    Basis of all P-invariants (y with y^T C^T = 0, any sign), by exact
+    rational Gaussian elimination of C. Every row is scaled to coprime
+    integers. Cheaper than p_semiflows and never blows up, but the vectors
+    may have negative entries.
+    """
+    C = incidence_matrix(pn)
+    T, P = C.shape
+    rows = [[Fraction(int(x)) for x in C[t]] for t in range(T) if C[t].any()]
+
+    # Reduced row echelon form
+    pivots = []
+    r = 0
+    for col in range(P):
+        pivot = next((i for i in range(r, len(rows)) if rows[i][col] != 0), None)
+        if pivot is None:
+            continue
+        rows[r], rows[pivot] = rows[pivot], rows[r]
+        lead = rows[r][col]
+        rows[r] = [x / lead for x in rows[r]]
+        for i in range(len(rows)):
+            if i != r and rows[i][col] != 0:
+                f = rows[i][col]
+                rows[i] = [a - f * b for a, b in zip(rows[i], rows[r])]
+        pivots.append(col)
+        r += 1
+        if r == len(rows):
+            break
+
+    basis = []
+    pivot_set = set(pivots)
+    for free in range(P):
+        if free in pivot_set:
+            continue
+        y = [Fraction(0)] * P
+        y[free] = Fraction(1)
+        for i, col in enumerate(pivots):
+            y[col] = -rows[i][free]
+        scale = 1
+        for x in y:
+            scale = scale * x.denominator // gcd(scale, x.denominator)
+        ints = _normalize([int(x * scale) for x in y])
+        basis.append(np.array(ints, dtype=np.int64))
+    return basis
+
+
+def maximal_trap(pn: PetriNet, places: Iterable[int]) -> Set[int]:
+    """
+    Largest trap contained in `places` (Q with Q• ⊆ •Q: every transition that
+    takes from Q puts back into Q). A marked trap stays marked forever.
+    """
+    Q = set(int(p) for p in places)
+    # outputs_in_Q[t] = |t• ∩ Q|; p must leave Q if some consumer of p has none
+    outputs_in_Q = {}
+    for t in range(len(pn.trans_ids)):
+        outputs_in_Q[t] = sum(1 for p in pn.postset(t)[0].tolist() if p in Q)
+    todo = [p for p in Q if any(outputs_in_Q[t] == 0 for t in pn.consumers(p).tolist())]
+    while todo:
+        p = todo.pop()
+        if p not in Q:
+            continue
+        Q.discard(p)
+        for t in pn.producers(p).tolist():
+            outputs_in_Q[t] -= 1
+            if outputs_in_Q[t] == 0:
+                # every place of Q that t consumes from must go as well
+                todo.extend(q for q in pn.preset(t)[0].tolist() if q in Q)
+    return Q
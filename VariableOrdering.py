@@ -0,0 +1,172 @@
+import json
+import os
+from collections import deque
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from PetriNetReading import PetriNet
+from StructuralAnalysis import p_semiflows
+
+# ---------------------------------------------------------
+# STATIC BDD VARIABLE ORDERING HEURISTICS
+# ---------------------------------------------------------
+# All heuristics return a permutation of pn.place_ids (the BDD variable names).
+# The idea is the same for all of them: places that are connected through a
+# transition should get nearby levels, so that each transition's condition and
+# update only span a short band of the BDD.
+
+ORDER_METHODS = ('natural', 'bfs', 'dfs', 'force', 'invariant')
+
+
+def _neighbours(pn: PetriNet) -> List[List[int]]:
+    """Undirected place graph: p ~ q if some transition touches both."""
+    P = len(pn.place_ids)
+    adj = [set() for _ in range(P)]
+    for t in range(len(pn.trans_ids)):
+        touched = set(pn.preset(t)[0].tolist()) | set(pn.postset(t)[0].tolist())
+        for p in touched:
+            adj[p] |= touched
+    return [sorted(a - {p}) for p, a in enumerate(adj)]
+
+
+def _traversal_order(pn: PetriNet, depth_first: bool) -> List[int]:
+    """BFS/DFS over the place graph, starting from marked places first."""
+    adj = _neighbours(pn)
+    P = len(pn.place_ids)
+    starts = [p for p in range(P) if pn.M0[p] > 0] + list(range(P))
+    seen = [False] * P
+    order: List[int] = []
+    for start in starts:
+        if seen[start]:
+            continue
+        todo = deque([start])
+        seen[start] = True
+        while todo:
+            p = todo.pop() if depth_first else todo.popleft()
+            order.append(p)
+            nbrs = reversed(adj[p]) if depth_first else adj[p]
+            for q in nbrs:
+                if not seen[q]:
+                    seen[q] = True
+                    todo.append(q)
+    return order
+
+
+def _span(pos: np.ndarray, edge_ptr: np.ndarray, edge_places: np.ndarray) -> int:
+    if not len(edge_places):
+        return 0
+    p = pos[edge_places]
+    starts = edge_ptr[:-1]
+    return int(np.sum(np.maximum.reduceat(p, starts) - np.minimum.reduceat(p, starts)))
+
+
+def _force_order(pn: PetriNet, max_iter: int = 100) -> List[int]:
+    """
+    FORCE (Aloul, Markov, Sakallah): move every place to the average centre of
+    gravity of the transitions (hyperedges) it belongs to, re-rank, repeat
+    while the total span of the hyperedges decreases.
+    """
+    P = len(pn.place_ids)
+    edges = []
+    for t in range(len(pn.trans_ids)):
+        touched = sorted(set(pn.preset(t)[0].tolist()) | set(pn.postset(t)[0].tolist()))
+        if len(touched) > 1:
+            edges.append(touched)
+    if not edges:
+        return list(range(P))
+
+    edge_ptr = np.cumsum([0] + [len(e) for e in edges])
+    edge_places = np.array([p for e in edges for p in e], dtype=np.int64)
+    edge_of = np.repeat(np.arange(len(edges)), np.diff(edge_ptr))
+    degree = np.bincount(edge_places, minlength=P)
+
+    # Start from the BFS order, which is already a decent placement
+    order = np.array(_traversal_order(pn, depth_first=False), dtype=np.int64)
+    pos = np.empty(P, dtype=np.float64)
+    pos[order] = np.arange(P)
+    best_order, best_span = order, _span(pos, edge_ptr, edge_places)
+
+    for _ in range(max_iter):
+        cog = np.add.reduceat(pos[edge_places], edge_ptr[:-1]) / np.diff(edge_ptr)
+        total = np.bincount(edge_places, weights=cog[edge_of], minlength=P)
+        target = np.where(degree > 0, total / np.maximum(degree, 1), pos)
+        # lexsort: primary key target, ties broken by the current position
+        order = np.lexsort((pos, target))
+        pos = np.empty(P, dtype=np.float64)
+        pos[order] = np.arange(P)
+        span = _span(pos, edge_ptr, edge_places)
+        if span >= best_span:
+            break
+        best_order, best_span = order, span
+
+    return best_order.tolist()
+
+
+def _invariant_order(pn: PetriNet) -> List[int]:
+    """
+    Group the support of every P-semiflow together (conserved token groups,
+    e.g. the local states of one process), in BFS order inside the groups.
+    """
+    bfs = _traversal_order(pn, depth_first=False)
+    rank = {p: i for i, p in enumerate(bfs)}
+    try:
+        flows = p_semiflows(pn)
+    except ValueError:
+        flows = []
+    groups = sorted((sorted(np.flatnonzero(y).tolist(), key=rank.get) for y in flows),
+                    key=lambda g: rank[g[0]])
+
+    placed = [False] * len(pn.place_ids)
+    order: List[int] = []
+    for group in groups:
+        for p in group:
+            if not placed[p]:
+                placed[p] = True
+                order.append(p)
+    order.extend(p for p in bfs if not placed[p])
+    return order
+
+
+def variable_order(pn: PetriNet, method: str = 'force') -> List[str]:
+    """
+    Static variable order for bdd_reachable.
+
+    Args:
+        pn:     PetriNet
+        method: 'natural' (pn.place_ids), 'bfs' / 'dfs' (traversal of the
+                place-transition graph from the marked places), 'force'
+                (FORCE hyperedge placement) or 'invariant' (P-semiflow groups).
+
+    Returns:
+        List of place IDs, first = top BDD level.
+    """
+    if method == 'natural':
+        idx = list(range(len(pn.place_ids)))
+    elif method in ('bfs', 'dfs'):
+        idx = _traversal_order(pn, depth_first=(method == 'dfs'))
+    elif method == 'force':
+        idx = _force_order(pn)
+    elif method == 'invariant':
+        idx = _invariant_order(pn)
+    else:
+        raise ValueError(f"Unknown ordering method {method!r}; expected one of {ORDER_METHODS}")
+    return [pn.place_ids[p] for p in idx]
+
+
+def save_order(path: str, pn: PetriNet, order: Sequence[str], method: Optional[str] = None) -> None:
+    """Store an order as JSON together with the fingerprint of the net."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'fingerprint': pn.fingerprint(), 'method': method, 'order': list(order)}, f, indent=1)
+
+
+def load_order(path: str, pn: PetriNet) -> Optional[List[str]]:
+    """Return the saved order, or None if the file is missing or was made for another net."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    order = data.get('order')
+    if data.get('fingerprint') != pn.fingerprint() or sorted(order or []) != sorted(pn.place_ids):
+        return None
+    return order
@@ -1,6 +1,4 @@
 import sys
-import time
-import tracemalloc
 from typing import Callable, Any
 from typing import Set, Tuple
 
@@ -8,34 +6,61 @@ from typing import Set, Tuple
 from PetriNetReading import PetriNet
 from ExplicitComputation import bfs_reachable, dfs_reachable
 from SymbolicComputation import bdd_reachable
-from DeadlockDetecting import deadlock_bdd2, deadlock_iterative_ilp_bdd
+from ReachabilityCache import ReachabilityCache, cached_bdd_reachable
+from DeadlockDetecting import deadlock_bdd2, deadlock_incremental_ilp_bdd
 from Optimization import max_reachable_marking
+from Measurement import MODES, Measurement, measure
+from Observers import JSONLinesExporter, ProgressBar, Tee
 import numpy as np
 
 
 # -------------------------------------------------------------
-# Helper function to measure time + memory
+# Helper function to measure time (+ memory, see Measurement.py)
 # -------------------------------------------------------------
-def profile(func: Callable, *args, **kwargs) -> Tuple[Any, float, float]:
-    tracemalloc.start()
-    start_time = time.perf_counter()
-
+def profile(func: Callable, *args, mode: str = 'time', isolate: bool = False,
+            **kwargs) -> Tuple[Any, Measurement]:
+    """
+    Run func once for its result and measure it in the given mode.
+
+    In-process measurements time the call that produces the result. Isolated
+    ones measure in a child process first and then call func again here for
+    the result; a `stats` dict argument is updated with what the measured
+    run reported (e.g. cache miss), not with the second call's.
+    """
+    if not isolate:
+        m = measure(func, *args, mode=mode, isolate=False, **kwargs)
+        return m.result, m
+    stats = kwargs.get('stats')
+    m = measure(func, *args, mode=mode, isolate=True,
+                summary=(lambda _: dict(stats)) if stats is not None else None, **kwargs)
     result = func(*args, **kwargs)
+    if stats is not None:
+        stats.update(m.result)
+    return result, m
 
-    end_time = time.perf_counter()
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-
-    elapsed_ms = (end_time - start_time) * 1000
-    peak_kb = peak / 1024
 
-    return result, elapsed_ms, peak_kb
+def _print_measurement(m: Measurement):
+    print(f"  Time: {m.time_label()}")
+    print(f"  Peak Memory: {m.memory_label()}")
 
 
 # -------------------------------------------------------------
 # Benchmark Runner
 # -------------------------------------------------------------
-def run_benchmark(filename: str):
+def run_benchmark(filename: str, cache=None, backend: str = 'dd', mode: str = 'time',
+                  isolate: bool = None, observer=None):
+    """
+    cache:   ReachabilityCache for the BDD step, None for the default cache
+             directory, False to rebuild the reachable set every run.
+    backend: BDD manager for steps 3-6 ('dd' or 'array', see BDDBackend.py).
+    mode:    measurement mode ('time', 'rss' or 'tracemalloc', see Measurement.py).
+    isolate: measure every step in its own process; defaults to True for the
+             memory modes, whose numbers depend on earlier allocations.
+    observer: progress callback for steps 1-4 (see Observers.py).
+    """
+    if isolate is None:
+        isolate = mode != 'time'
+    opts = {'mode': mode, 'isolate': isolate}
     print("========================================")
     print("======= BENCHMARK: REACHABILITY ========")
     print("========================================")
@@ -50,58 +75,108 @@ def run_benchmark(filename: str):
 
     # ---------------- BFS ----------------
     print("\n[1] BFS Reachability")
-    (bfs_res, bfs_time, bfs_mem) = profile(bfs_reachable, pn)
+    bfs_res, m = profile(bfs_reachable, pn, observer=observer, **opts)
     print(f"  Reachable markings: {len(bfs_res)}")
-    print(f"  Time: {bfs_time:.2f} ms")
-    print(f"  Peak Memory: {bfs_mem:.2f} KB")
+    _print_measurement(m)
 
     # ---------------- DFS ----------------
     print("\n[2] DFS Reachability")
-    (dfs_res, dfs_time, dfs_mem) = profile(dfs_reachable, pn)
+    dfs_res, m = profile(dfs_reachable, pn, observer=observer, **opts)
     print(f"  Reachable markings: {len(dfs_res)}")
-    print(f"  Time: {dfs_time:.2f} ms")
-    print(f"  Peak Memory: {dfs_mem:.2f} KB")
+    _print_measurement(m)
 
     # ---------------- BDD ----------------
     print("\n[3] BDD Reachability")
-    ((bdd_node, bdd_count), bdd_time, bdd_mem) = profile(bdd_reachable, pn)
+    bdd_stats = {}
+    (bdd_node, bdd_count), m = profile(cached_bdd_reachable, pn, cache=cache, stats=bdd_stats,
+                                       backend=backend, observer=observer, **opts)
     print(f"  Reachable markings: {bdd_count}")
-    print(f"  Time: {bdd_time:.2f} ms")
-    print(f"  Peak Memory: {bdd_mem:.2f} KB")
+    print(f"  Backend: {backend} | Cache: {bdd_stats['cache']}")
+    _print_measurement(m)
 
     # # ---------------- Deadlock (ILP + BDD) ----------------
-    print("\n[4] Deadlock Search (Iterative ILP + BDD)")
-    (dead_mark, dead_msg), dead_time, dead_mem = profile(deadlock_iterative_ilp_bdd, pn,bdd_node,bdd_count)
+    print("\n[4] Deadlock Search (Incremental ILP + BDD, batched cuts)")
+    (dead_mark, dead_msg), m = profile(deadlock_incremental_ilp_bdd, pn, bdd_node, bdd_count,
+                                       observer=observer, **opts)
     print(f"  Result: {dead_mark}")
     print(f"  Message: {dead_msg}")
-    print(f"  Time: {dead_time:.2f} ms")
-    print(f"  Peak Memory: {dead_mem:.2f} KB")
+    _print_measurement(m)
 
     # # ---------------- Deadlock (BDD2) ----------------
     print("\n[5] Deadlock Search (BDD-Only & ILP Filtering)")
-    (dead2_mark, dead2_msg), dead2_time, dead2_mem = profile(deadlock_bdd2, pn, bdd_node,bdd_count)
+    (dead2_mark, dead2_msg), m = profile(deadlock_bdd2, pn, bdd_node, bdd_count, **opts)
     print(f"  Result: {dead2_mark}")
     print(f"  Message: {dead2_msg}")
-    print(f"  Time: {dead2_time:.2f} ms")
-    print(f"  Peak Memory: {dead2_mem:.2f} KB")
+    _print_measurement(m)
 
-    # ---------------- Optimization (Branch-and-Bound) ----------------
+    # ---------------- Optimization (longest path over the BDD) ----------------
     print("\n[6] Optimization (Max cᵀM with BDD)")
     c = np.ones(len(pn.place_ids))  # Example cost vector: all weights = 1
-    (opt_mark, opt_val), opt_time, opt_mem = profile(max_reachable_marking, pn.place_ids, bdd_node, c)
+    (opt_mark, opt_val), m = profile(max_reachable_marking, pn.place_ids, bdd_node, c, **opts)
     print(f"  Best marking: {opt_mark}")
     print(f"  Best value: {opt_val}")
-    print(f"  Time: {opt_time:.2f} ms")
-    print(f"  Peak Memory: {opt_mem:.2f} KB")
+    _print_measurement(m)
 
     
 # -------------------------------------------------------------
 # Command line interface
 # -------------------------------------------------------------
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python3 benchmark.py <pnml-file>")
+    args = sys.argv[1:]
+    cache = None
+    if '--no-cache' in args:
+        args.remove('--no-cache')
+        cache = False
+    if '--cache-dir' in args:
+        i = args.index('--cache-dir')
+        if i + 1 >= len(args):
+            args = []
+        else:
+            cache = ReachabilityCache(args[i + 1]) if cache is None else cache
+            del args[i:i + 2]
+    backend = 'dd'
+    if '--backend' in args:
+        i = args.index('--backend')
+        if i + 1 >= len(args):
+            args = []
+        else:
+            backend = args[i + 1]
+            del args[i:i + 2]
+    mode = 'time'
+    if '--measure' in args:
+        i = args.index('--measure')
+        if i + 1 >= len(args) or args[i + 1] not in MODES:
+            args = []
+        else:
+            mode = args[i + 1]
+            del args[i:i + 2]
+    isolate = None
+    if '--isolate' in args:
+        args.remove('--isolate')
+        isolate = True
+    if '--no-isolate' in args:
+        args.remove('--no-isolate')
+        isolate = False
+    observers = []
+    if '--progress' in args:
+        args.remove('--progress')
+        observers.append(ProgressBar())
+    if '--events' in args:
+        i = args.index('--events')
+        if i + 1 >= len(args):
+            args = []
+        else:
+            observers.append(JSONLinesExporter(args[i + 1]))
+            del args[i:i + 2]
+    if len(args) != 1:
+        print("Usage: python3 benchmark.py <pnml-file> [--cache-dir DIR] [--no-cache] [--backend dd|array]\n"
+              "                            [--measure time|rss|tracemalloc] [--isolate | --no-isolate]\n"
+              "                            [--progress] [--events FILE.jsonl]")
         sys.exit(1)
 
-    filename = sys.argv[1]
-    run_benchmark(filename)
+    filename = args[0]
+    observer = Tee(*observers) if observers else None
+    run_benchmark(filename, cache=cache, backend=backend, mode=mode, isolate=isolate, observer=observer)
+    for obs in observers:
+        if isinstance(obs, JSONLinesExporter):
+            obs.close()
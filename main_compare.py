@@ -1,5 +1,3 @@
-import time
-import tracemalloc
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
@@ -10,6 +8,7 @@ import math
 from PetriNetReading import PetriNet
 from ExplicitComputation import bfs_reachable
 from SymbolicComputation import bdd_reachable
+from Measurement import measure
 
 def generate_parallel_pnml(target_states, filename):
     a = int(target_states ** (1/3))
@@ -48,22 +47,21 @@ def generate_parallel_pnml(target_states, filename):
         tree.write(f)
     return real_states
 
-def measure_performance(algorithm_func, pn, algo_type="Explicit"):
-    tracemalloc.start()
-    start_time = time.time()
-    
-    result = algorithm_func(pn)
-    
+def measure_performance(algorithm_func, pn, algo_type="Explicit", mode="rss"):
+    """
+    Đo một thuật toán trong process con riêng (xem Measurement.py).
+
+    mode: 'time' (chỉ thời gian, mem = nan), 'rss' (peak RSS tăng thêm,
+          mặc định) hoặc 'tracemalloc' (thời gian bị chậm đi do tracing).
+    Returns: (số trạng thái, thời gian ms, bộ nhớ MB)
+    """
     if algo_type == "Symbolic":
-        count = result[1] if isinstance(result, tuple) else result
+        count_of = lambda result: result[1] if isinstance(result, tuple) else result
     else:
-        count = len(result)
-        
-    end_time = time.time()
-    current, peak = tracemalloc.get_traced_memory()
-    tracemalloc.stop()
-    
-    return count, (end_time - start_time) * 1000, peak / (1024 * 1024)
+        count_of = len
+    m = measure(algorithm_func, pn, mode=mode, isolate=True, summary=count_of)
+    mem_mb = m.peak_kb / 1024 if m.peak_kb is not None else float('nan')
+    return m.result, m.wall_ms, mem_mb
 
 def main_benchmark_parallel():
     targets = np.linspace(100, 50000, 20, dtype=int)
@@ -72,14 +70,14 @@ def main_benchmark_parallel():
 
     results = {"States": [], "BFS_Time": [], "BFS_Mem": [], "BDD_Time": [], "BDD_Mem": []}
 
-    print("States     | BFS (ms)   | BDD (ms)   | BFS (MB)   | BDD (MB)")
+    print("States     | BFS (ms)   | BDD (ms)   | BFS (MB)   | BDD (MB)   (memory: peak RSS increase)")
 
     for t in targets:
         filename = f"temp_para_{t}.pnml"
         real_states = generate_parallel_pnml(t, filename)
         
         try:
-            pn = PetriNet.from_pnml(filename)
+            pn = PetriNet.from_pnml(filename, use_cache=False)  # file bị xoá ngay sau đó, không ghi .pnmlc
             cnt_bfs, t_bfs, m_bfs = measure_performance(bfs_reachable, pn, "Explicit")
             cnt_bdd, t_bdd, m_bdd = measure_performance(bdd_reachable, pn, "Symbolic")
             
@@ -108,7 +106,7 @@ def main_benchmark_parallel():
 
     ax2.plot(df["States"], df["BFS_Mem"], 'r--o', label='BFS Mem')
     ax2.plot(df["States"], df["BDD_Mem"], 'b--s', label='BDD Mem')
-    ax2.set_title('Memory Usage')
+    ax2.set_title('Memory Usage (peak RSS increase)')
     ax2.legend()
     ax2.grid(True)
     
@@ -123,7 +121,7 @@ def run_single_file_check():
     print(f"Loaded! Places: {len(pn.place_ids)}, Transitions: {len(pn.trans_ids)}")
 
     print("-" * 60)
-    print(f"{'Algorithm':<15} | {'States':<10} | {'Time (ms)':<10} | {'Mem (MB)':<10}")
+    print(f"{'Algorithm':<15} | {'States':<10} | {'Time (ms)':<10} | {'Mem (MB)':<10} (peak RSS increase)")
     print("-" * 60)
 
     cnt_bfs, t_bfs, m_bfs = measure_performance(bfs_reachable, pn, "Explicit")
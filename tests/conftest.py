@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from NetFamilies import write_pnml  # noqa: E402
+from PetriNetReading import PetriNet  # noqa: E402
+
+
+@pytest.fixture
+def make_net(tmp_path):
+    """Build a PetriNet from a NetFamilies-style (places, transitions, arcs, M0) tuple."""
+    def build(net, name='net'):
+        path = write_pnml(net, str(tmp_path / f"{name}.pnml"), net_id=name)
+        return PetriNet.from_pnml(path, use_cache=False)
+    return build
+
+
+def unit_weight_net(pre, post, m0):
+    """
+    Net with places p0.. and transitions t0..; pre[t] / post[t] list place
+    indices (arc weight 1), m0 the initial token counts.
+    """
+    places = [f"p{i}" for i in range(len(m0))]
+    transitions, arcs = [], []
+    for t, (ins, outs) in enumerate(zip(pre, post)):
+        transitions.append(f"t{t}")
+        arcs.extend((places[p], f"t{t}") for p in ins)
+        arcs.extend((f"t{t}", places[p]) for p in outs)
+    return places, transitions, arcs, {p: k for p, k in zip(places, m0) if k}
+
+
+def random_conservative_net(seed, num_places=5, num_transitions=6, tokens=3):
+    """Random unit-weight net where every transition moves one token: bounded, usually not 1-safe."""
+    import random
+    rng = random.Random(seed)
+    pre = [[rng.randrange(num_places)] for _ in range(num_transitions)]
+    post = [[rng.randrange(num_places)] for _ in range(num_transitions)]
+    m0 = [0] * num_places
+    for p in rng.sample(range(num_places), tokens):
+        m0[p] = 1
+    return unit_weight_net(pre, post, m0)
@@ -0,0 +1,40 @@
+import pytest
+
+from conftest import random_conservative_net, unit_weight_net
+from ExplicitComputation import bfs_reachable, bfs_reachable_batched
+
+
+def _as_set(rows):
+    return {tuple(r) for r in rows.tolist()}
+
+
+def test_unit_weight_net_that_is_not_safe(make_net):
+    # t0 moves the token of p1 onto p0, so p0 holds 2 tokens; (2,0,0) and
+    # (1,0,0) must stay distinct although they have the same support
+    pn = make_net(unit_weight_net(pre=[[1], [0], [2]], post=[[0], [2], []], m0=[1, 1, 0]))
+    expected = bfs_reachable(pn)
+    rows = bfs_reachable_batched(pn)
+    assert len(rows) == len(expected)
+    assert _as_set(rows) == expected
+    assert (2, 0, 0) in expected and (1, 0, 0) in expected
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_matches_bfs_on_random_bounded_nets(make_net, seed):
+    pn = make_net(random_conservative_net(seed), name=f"rand{seed}")
+    expected = bfs_reachable(pn)
+    rows = bfs_reachable_batched(pn, batch_size=3)
+    assert len(rows) == len(expected)
+    assert _as_set(rows) == expected
+
+
+def test_asserting_safety_on_a_non_safe_net_raises(make_net):
+    pn = make_net(unit_weight_net(pre=[[1]], post=[[0]], m0=[1, 1]))
+    with pytest.raises(ValueError):
+        bfs_reachable_batched(pn, one_safe=True)
+
+
+def test_safe_net_keeps_bit_keys(make_net):
+    pn = make_net(unit_weight_net(pre=[[0], [1]], post=[[1], [0]], m0=[1, 0]))
+    rows = bfs_reachable_batched(pn)
+    assert _as_set(rows) == bfs_reachable(pn)
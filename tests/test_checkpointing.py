@@ -0,0 +1,52 @@
+import Checkpointing
+from Checkpointing import Budget, Checkpoint
+from ExplicitComputation import bfs_reachable
+from NetFamilies import token_game
+
+
+class _PeakOnly:
+    """current_rss_kb on a system without /proc: only the lifetime peak, which never drops."""
+
+    def __init__(self, peak_kb):
+        self.peak_kb = peak_kb
+
+    def __call__(self, peak_fallback=True):
+        return self.peak_kb if peak_fallback else None
+
+
+def test_earlier_peak_does_not_exhaust_memory_budget(make_net, monkeypatch):
+    pn = make_net(token_game(8, 3))
+    # the process peaked at 4 GB earlier; this run must still get its 10 MB
+    monkeypatch.setattr(Checkpointing, 'current_rss_kb', _PeakOnly(4 * 2 ** 20))
+    budget = Budget(max_memory_mb=10, check_every=1)
+    assert bfs_reachable(pn, budget=budget) == bfs_reachable(pn)
+    assert budget.complete
+
+
+def test_peak_growth_during_the_run_stops_it(make_net, monkeypatch):
+    pn = make_net(token_game(8, 3))
+    fake = _PeakOnly(4 * 2 ** 20)
+    monkeypatch.setattr(Checkpointing, 'current_rss_kb', fake)
+    budget = Budget(max_memory_mb=10, check_every=1)
+
+    class GrowingSet(set):
+        def add(self, m):
+            fake.peak_kb += 1024            # 1 MB per new marking
+            super().add(m)
+
+    visited = bfs_reachable(pn, visited=GrowingSet(), budget=budget)
+    assert not budget.complete
+    assert budget.stopped_by == 'memory'
+    assert len(visited) < len(bfs_reachable(pn))
+
+
+def test_stop_and_resume_gives_the_full_set(make_net, tmp_path):
+    pn = make_net(token_game(10, 4))
+    path = str(tmp_path / 'run.npz')
+    budget = Budget(max_states=50, check_every=1)
+    partial = bfs_reachable(pn, budget=budget, checkpoint=Checkpoint(path))
+    assert budget.stopped_by == 'states' and len(partial) < 210
+
+    budget = Budget()
+    assert bfs_reachable(pn, budget=budget, resume=path) == bfs_reachable(pn)
+    assert budget.complete
@@ -0,0 +1,51 @@
+import pytest
+
+from conftest import random_conservative_net, unit_weight_net
+from DiskStore import MMapMarkingSet, disk_bfs_reachable
+from ExplicitComputation import NotSafeError, bfs_reachable
+
+
+def test_non_safe_unit_weight_net_falls_back(make_net, tmp_path):
+    pn = make_net(unit_weight_net(pre=[[0]], post=[[1]], m0=[1, 1]))
+    visited = disk_bfs_reachable(pn, directory=str(tmp_path / 'run'))
+    try:
+        assert not visited.one_safe
+        assert set(visited) == bfs_reachable(pn) == {(1, 1), (0, 2)}
+    finally:
+        visited.close()
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_matches_bfs_on_random_bounded_nets(make_net, tmp_path, seed):
+    pn = make_net(random_conservative_net(seed), name=f"rand{seed}")
+    visited = disk_bfs_reachable(pn, directory=str(tmp_path / 'run'))
+    try:
+        assert set(visited) == bfs_reachable(pn)
+    finally:
+        visited.close()
+
+
+def test_asserted_safety_still_raises(make_net, tmp_path):
+    pn = make_net(unit_weight_net(pre=[[0]], post=[[1]], m0=[1, 1]))
+    with pytest.raises(NotSafeError):
+        disk_bfs_reachable(pn, directory=str(tmp_path / 'run'), one_safe=True)
+
+
+def test_max_tokens_above_255(make_net, tmp_path):
+    pn = make_net(unit_weight_net(pre=[[0]], post=[[1]], m0=[300, 0]))
+    with pytest.raises(ValueError):
+        disk_bfs_reachable(pn, directory=str(tmp_path / 'small'))
+    visited = disk_bfs_reachable(pn, directory=str(tmp_path / 'big'), max_tokens=300)
+    try:
+        assert len(visited) == 301
+        assert set(visited) == bfs_reachable(pn)
+    finally:
+        visited.close()
+
+
+@pytest.mark.parametrize('max_tokens', [255, 256, 70000])
+def test_records_hold_max_tokens(tmp_path, max_tokens):
+    with MMapMarkingSet(3, max_tokens=max_tokens, path=str(tmp_path / 'set.tbl')) as s:
+        assert s.add((max_tokens, 0, 1))
+        assert not s.add((max_tokens, 0, 1))
+        assert list(s) == [(max_tokens, 0, 1)]
@@ -0,0 +1,54 @@
+import pytest
+
+from conftest import random_conservative_net, unit_weight_net
+from DeadlockDetecting import deadlock_explicit
+from ExplicitComputation import SuccessorGenerator, bfs_reachable, explicit_deadlock_search
+
+
+def _replay(pn, trace):
+    gen = SuccessorGenerator(pn)
+    marking = gen.initial_marking
+    for tid in trace:
+        t = pn.trans_ids.index(tid)
+        assert gen.is_enabled(marking, t)
+        marking = list(marking)
+        for p, d in gen.transitions[t][1]:
+            marking[p] += d
+        marking = tuple(marking)
+    return marking
+
+
+def test_non_safe_unit_weight_net(make_net):
+    # p0 -> t0 -> p1 with M0 = (1, 1): reaches (0, 2), which is dead
+    pn = make_net(unit_weight_net(pre=[[0]], post=[[1]], m0=[1, 1]))
+    mark, trace, stats = explicit_deadlock_search(pn)
+    assert mark == (0, 2)
+    assert trace == ['t0']
+    assert stats['complete']
+
+    mark, msg = deadlock_explicit(pn)
+    assert mark == (0, 2)
+
+
+def test_bitset_engine_refuses_non_safe_net(make_net):
+    pn = make_net(unit_weight_net(pre=[[0]], post=[[1]], m0=[1, 1]))
+    with pytest.raises(ValueError):
+        explicit_deadlock_search(pn, one_safe=True)
+
+
+@pytest.mark.parametrize('order', ['bfs', 'dfs'])
+@pytest.mark.parametrize('seed', range(20))
+def test_collects_every_deadlock_with_valid_traces(make_net, seed, order):
+    pn = make_net(random_conservative_net(seed), name=f"rand{seed}")
+    gen = SuccessorGenerator(pn)
+    dead = {m for m in bfs_reachable(pn) if gen.enabled(m) == 0}
+
+    _, _, stats = explicit_deadlock_search(pn, order, stop_at_first=False)
+    assert set(stats['deadlocks']) == dead
+    for marking, trace in zip(stats['deadlocks'], stats['traces']):
+        assert _replay(pn, trace) == marking
+
+    first, trace, _ = explicit_deadlock_search(pn, order)
+    assert (first is None) == (not dead)
+    if first is not None:
+        assert _replay(pn, trace) == first